@@ -1,52 +1,110 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import os
-import pandas as pd
+import shutil
+from conversion_runner import BackgroundConversion, run_conversions, format_summary
+from column_select import is_number
 
 # Correct ECG 12-lead names
 ecg_leads = ['I', 'II', 'III', 'aVR', 'aVL', 'aVF', 'V1', 'V2', 'V3', 'V4', 'V5', 'V6']
 
-def process_folder(folder_path):
+# Longest first line read when sniffing the column count
+MAX_LINE_BYTES = 1 << 20
+COPY_BUFFER_BYTES = 1 << 20
+
+
+def labeled_path(file_path, output_folder):
+    base = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(output_folder, base + "_labeled.csv")
+
+
+def label_file(file_path, output_folder):
+    """
+    Only the first line is parsed to check for 12 columns; the body is copied byte for byte,
+    so values keep their original text. A non-numeric first line (an existing header) is replaced.
+    Raises ValueError for files that are not 12-lead recordings.
+    """
+    with open(file_path, 'rb') as src:
+        first = src.readline(MAX_LINE_BYTES)
+        fields = first.decode('utf-8-sig', errors='replace').strip().split(',')
+        if len(fields) != len(ecg_leads):
+            raise ValueError(f"expected {len(ecg_leads)} columns, found {len(fields)}")
+        has_header = not all(is_number(f) for f in fields)
+        if not has_header:
+            src.seek(0)
+        newline = b'\r\n' if first.endswith(b'\r\n') else b'\n'
+
+        output_path = labeled_path(file_path, output_folder)
+        with open(output_path, 'wb') as dst:
+            dst.write(','.join(ecg_leads).encode('ascii') + newline)
+            shutil.copyfileobj(src, dst, COPY_BUFFER_BYTES)
+    return f"Labeled {os.path.basename(output_path)}"
+
+
+def find_csv_files(folder_path):
+    return sorted(os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.lower().endswith(".csv"))
+
+
+def prepare_folder(folder_path):
+    """
+    Lists the CSV files of a folder and creates its labeled_output folder; used by the GUI and process_folder.
+    :return: (csv_files, output_folder)
+    """
+    csv_files = find_csv_files(folder_path)
     output_folder = os.path.join(folder_path, "labeled_output")
     os.makedirs(output_folder, exist_ok=True)
-    processed_files = 0
-    skipped_files = 0
-
-    for filename in os.listdir(folder_path):
-        if filename.lower().endswith(".csv"):
-            file_path = os.path.join(folder_path, filename)
-            try:
-                df = pd.read_csv(file_path, header=None)
-                if df.shape[1] == 12:
-                    df.columns = ecg_leads
-                    output_path = os.path.join(output_folder, filename.replace(".csv", "_labeled.csv"))
-                    df.to_csv(output_path, index=False)
-                    processed_files += 1
-                else:
-                    skipped_files += 1
-            except Exception as e:
-                skipped_files += 1
-
-    return processed_files, skipped_files, output_folder
+    return csv_files, output_folder
+
+
+def process_folder(folder_path, workers=None):
+    """
+    :param workers: number of processes, None for the CPU count
+    :return: (processed, skipped, output_folder)
+    """
+    csv_files, output_folder = prepare_folder(folder_path)
+    results = list(run_conversions(label_file, csv_files, (output_folder,), workers))
+    skipped_files = sum(r.error is not None for r in results)
+    return len(results) - skipped_files, skipped_files, output_folder
+
 
 def select_folder():
     folder_path = filedialog.askdirectory()
-    if folder_path:
-        processed, skipped, output_path = process_folder(folder_path)
+    if not folder_path:
+        return
+    csv_files, output_folder = prepare_folder(folder_path)
+
+    def on_done(summary):
+        button.config(state=tk.NORMAL)
+        status.config(text=format_summary(summary))
+        processed = summary['files'] - summary['failed']
         messagebox.showinfo("Batch ECG Labeling Complete",
                             f"✅ Processed: {processed} file(s)\n"
-                            f"⚠️ Skipped: {skipped} file(s)\n\n"
-                            f"Labeled files saved to:\n{output_path}")
+                            f"⚠️ Skipped: {summary['failed']} file(s)\n\n"
+                            f"Labeled files saved to:\n{output_folder}")
+
+    def on_result(result):
+        done[0] += 1
+        status.config(text=f"{done[0]} / {len(csv_files)}")
+
+    done = [0]
+    button.config(state=tk.DISABLED)
+    status.config(text=f"0 / {len(csv_files)}")
+    BackgroundConversion(root, label_file, csv_files, (output_folder,), on_result=on_result, on_done=on_done)
+
+
+if __name__ == "__main__":
+    # GUI setup
+    root = tk.Tk()
+    root.title("ECG 12-Lead CSV Labeler")
+    root.geometry("400x220")
 
-# GUI setup
-root = tk.Tk()
-root.title("ECG 12-Lead CSV Labeler")
-root.geometry("400x200")
+    label = tk.Label(root, text="Select a folder containing raw ECG CSV files:", font=("Arial", 12))
+    label.pack(pady=20)
 
-label = tk.Label(root, text="Select a folder containing raw ECG CSV files:", font=("Arial", 12))
-label.pack(pady=20)
+    button = tk.Button(root, text="Select Folder", command=select_folder, font=("Arial", 12), width=20)
+    button.pack(pady=10)
 
-button = tk.Button(root, text="Select Folder", command=select_folder, font=("Arial", 12), width=20)
-button.pack(pady=10)
+    status = tk.Label(root, text="", font=("Arial", 10))
+    status.pack(pady=5)
 
-root.mainloop()
+    root.mainloop()
@@ -1,20 +1,15 @@
 import os
 import sys
-import subprocess
 
-# 讓工作目錄設為這個檔案所在位置（確保能找到 .py / .xlsx）
+# 讓工作目錄設為這個檔案所在位置（確保能找到 .json / .xlsx）
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.getcwd())
 
-# 依序要執行的腳本（需要就改順序或檔名）
-scripts = ["SR.py", "SB.py", "GSVT.py"]
+from rhythm_sort import load_config, sort_rhythms
 
-for s in scripts:
-    print(f"\n=== Running {s} ===")
-    # 用同一個 Python 來跑，失敗不會中斷後面腳本；想要中斷就把 check=True 打開
-    try:
-        subprocess.run([sys.executable, s], check=False)
-        print(f"--- Finished {s} ---")
-    except Exception as e:
-        print(f"!!! {s} failed: {e}")
+# 分類與清單設定在 rhythm_classes.json；新增分類只要在 "classes" 加一行
+# 想先確認結果就把 dry_run 改成 True，只列出會移動的檔案與找不到 / 重複的檔名
+config = load_config("rhythm_classes.json")
+print(sort_rhythms(config, dry_run=False))
 
 print("\nAll done.")
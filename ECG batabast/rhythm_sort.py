@@ -0,0 +1,173 @@
+"""
+依心律分類清單（Excel / CSV 的 FileName 欄位）把 ECG 檔案分到各分類資料夾。
+所有清單只讀一次，來源資料夾只用一次 os.scandir 建立檔名索引，不再逐檔 os.path.exists；
+可選擇移動、硬連結或符號連結，dry run 時只列出計畫與找不到 / 重複的檔名。
+
+分類由設定檔（JSON）決定，新增分類不需要再複製一份腳本：
+{
+  "source_folder": "D:\\ECGDataDenoised\\labeled_output",   # 要分類的檔案所在資料夾
+  "target_folder": "D:\\ECGDataDenoised\\labeled_output",   # 分類資料夾建立在這裡，省略時同 source_folder
+  "file_column": "FileName",                                # 清單中檔名的欄位
+  "extension": ".csv",                                      # 檔名沒有副檔名時補上
+  "mode": "move",                                           # move / hardlink / symlink
+  "classes": {"SR": "SR.xlsx", "SB": "SB.xlsx", "GSVT": "GSVT.xlsx"}
+}
+清單路徑為相對路徑時，以設定檔所在的資料夾為準。
+
+命令列：python rhythm_sort.py [rhythm_classes.json] [--mode move|hardlink|symlink] [--dry-run]
+"""
+import os
+import json
+import shutil
+import argparse
+from collections import defaultdict
+import pandas as pd
+
+DEFAULT_CONFIG = "rhythm_classes.json"
+MODES = ('move', 'hardlink', 'symlink')
+
+
+def load_config(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    config.setdefault('target_folder', config['source_folder'])
+    config.setdefault('file_column', 'FileName')
+    config.setdefault('extension', '.csv')
+    config.setdefault('mode', 'move')
+    config['classes'] = {name: os.path.join(base, list_path) for name, list_path in config['classes'].items()}
+    return config
+
+
+def read_names(list_path, file_column='FileName', extension='.csv'):
+    """
+    :return: 清單中的檔名（補上副檔名），依清單順序
+    """
+    if list_path.lower().endswith('.csv'):
+        df = pd.read_csv(list_path, usecols=[file_column], dtype=str)
+    else:
+        df = pd.read_excel(list_path, usecols=[file_column], dtype=str)
+    names = []
+    for name in df[file_column].dropna():
+        name = name.strip()
+        if not name:
+            continue
+        # 自動補上副檔名（如果沒有）
+        if not name.lower().endswith(extension.lower()):
+            name += extension
+        names.append(name)
+    return names
+
+
+def scan_folder(folder):
+    """
+    只掃描一次來源資料夾（不含子資料夾）。
+    :return: {檔名.casefold(): 實際檔名}；Windows 的檔名不分大小寫
+    """
+    with os.scandir(folder) as entries:
+        return {entry.name.casefold(): entry.name for entry in entries if entry.is_file()}
+
+
+def build_plan(config):
+    """
+    :return: {'actions': [(分類, 來源路徑, 目的路徑)], 'missing': {分類: [檔名]},
+              'duplicates': {檔名: [分類]}}
+    移動時同一個檔名出現在多個分類只會移到第一個分類，連結時每個分類都會建立。
+    """
+    index = scan_folder(config['source_folder'])
+    actions = []
+    missing = defaultdict(list)
+    classes_of = defaultdict(list)
+    names = {}
+    for class_name, list_path in config['classes'].items():
+        target = os.path.join(config['target_folder'], class_name)
+        for name in read_names(list_path, config['file_column'], config['extension']):
+            key = name.casefold()
+            previous = list(classes_of[key])
+            classes_of[key].append(class_name)
+            names.setdefault(key, name)
+            if class_name in previous or (previous and config['mode'] == 'move'):
+                continue
+            actual = index.get(key)
+            if actual is None:
+                missing[class_name].append(name)
+                continue
+            actions.append((class_name, os.path.join(config['source_folder'], actual), os.path.join(target, actual)))
+    duplicates = {names[key]: classes for key, classes in classes_of.items() if len(classes) > 1}
+    return {'actions': actions, 'missing': dict(missing), 'duplicates': duplicates}
+
+
+def apply_plan(plan, mode='move'):
+    """
+    :return: {分類: 完成的檔案數}
+    """
+    if mode not in MODES:
+        raise ValueError(f"不支援的模式：{mode}")
+    done = defaultdict(int)
+    for folder in {os.path.dirname(dst) for _, _, dst in plan['actions']}:
+        os.makedirs(folder, exist_ok=True)
+    for class_name, src, dst in plan['actions']:
+        if mode == 'move':
+            try:
+                if os.path.exists(dst) and os.path.samefile(src, dst):
+                    # 先前以硬連結分類過，rename 不會移除來源
+                    os.remove(src)
+                else:
+                    # 同一個磁碟上只改目錄項目；目的檔已存在時覆蓋
+                    os.replace(src, dst)
+            except OSError:
+                shutil.move(src, dst)
+        else:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            if mode == 'hardlink':
+                os.link(src, dst)
+            else:
+                os.symlink(os.path.abspath(src), dst)
+        done[class_name] += 1
+    return dict(done)
+
+
+def format_report(config, plan, done=None):
+    lines = []
+    planned = defaultdict(int)
+    for class_name, _, _ in plan['actions']:
+        planned[class_name] += 1
+    for class_name in config['classes']:
+        count = planned[class_name] if done is None else done.get(class_name, 0)
+        missing = plan['missing'].get(class_name, [])
+        verb = "將處理" if done is None else "已處理"
+        lines.append(f"{class_name}：{verb} {count} 個檔案，找不到 {len(missing)} 個")
+    for class_name, names in plan['missing'].items():
+        for name in names:
+            lines.append(f"找不到檔案：[{class_name}] {name}")
+    for name, classes in plan['duplicates'].items():
+        lines.append(f"重複的檔名：{name} 出現在 {', '.join(classes)}")
+    return "\n".join(lines)
+
+
+def sort_rhythms(config, mode=None, dry_run=False):
+    """
+    :param mode: 覆寫設定檔中的 mode
+    :return: 報告文字
+    """
+    mode = mode or config['mode']
+    config = dict(config, mode=mode)
+    plan = build_plan(config)
+    if dry_run:
+        return format_report(config, plan)
+    return format_report(config, plan, apply_plan(plan, mode))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort ECG recordings into rhythm class folders from label lists.")
+    parser.add_argument("config", nargs="?", default=DEFAULT_CONFIG, help="JSON config with source folder and classes")
+    parser.add_argument("--mode", choices=MODES, help="move files or create hard links / symlinks (overrides config)")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be done")
+    args = parser.parse_args()
+    print(sort_rhythms(load_config(args.config), args.mode, args.dry_run))
+    print("分類完成！" if not args.dry_run else "（dry run，未移動任何檔案）")
+
+
+if __name__ == "__main__":
+    main()
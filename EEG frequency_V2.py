@@ -3,8 +3,19 @@ import pandas as pd
 import numpy as np
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from scipy.signal import butter, filtfilt, welch
-from scipy.integrate import simpson
+from scipy.signal import welch
+from scipy.integrate import simpson, trapezoid
+from filter_bank import FilterBank
+from array_store import FORMATS, save_frame
+from spectral_features import compute_spectral_features, band_weight_matrix
+from segmentation import strided_windows, window_starts, to_samples, step_size
+from data_loader import read_table
+from header_index import list_data_files, register_outputs
+
+# 每個紀錄的結果檔名為 <檔名><後綴>，輸出資料夾與輸入相同時掃描輸入會排除
+BAND_POWER_SUFFIX = "_relative_band_power"
+BANDPASSED_SUFFIX = "_bandpassed_eeg"
+register_outputs(suffixes=(BAND_POWER_SUFFIX, BANDPASSED_SUFFIX))
 
 # 頻段設定
 bands = {
@@ -15,16 +26,38 @@ bands = {
     'Gamma': (25, 45)
 }
 
-def bandpass_filter(data, lowcut, highcut, fs, order=4):
-    b, a = butter(order, [lowcut, highcut], btype='band', fs=fs)
-    return filtfilt(b, a, data)
-
 def band_power(freqs, psd, band):
     mask = np.logical_and(freqs >= band[0], freqs <= band[1])
     if np.sum(mask) >= 3:
         return simpson(psd[mask], freqs[mask])
     else:
-        return np.trapz(psd[mask], freqs[mask])
+        return trapezoid(psd[mask], x=freqs[mask])
+
+def multichannel_psd(data, fs, window_size, step_size):
+    """
+    一次計算所有 channel、所有視窗的 Welch PSD。
+    :param data: (channels, samples) 陣列
+    :return: freqs, (channels, windows, freqs) 的 PSD
+    """
+    starts = window_starts(data.shape[-1], window_size, step_size)
+    segments = strided_windows(data, window_size, starts, axis=-1)
+    return welch(segments, fs=fs, nperseg=window_size, axis=-1)
+
+def integrate_bands(freqs, psd):
+    # 最後一軸為頻率，輸出最後一軸為頻段（順序同 bands）
+    return psd @ band_weight_matrix(freqs, bands)
+
+def multichannel_band_power(data, fs, window_size, step_size):
+    """
+    :return: (channels, bands) 的平均頻段功率，頻段順序同 bands
+    """
+    if data.shape[-1] < window_size:
+        return np.full((data.shape[0], len(bands)), np.nan)
+    freqs, psd = multichannel_psd(data, fs, window_size, step_size)
+    return integrate_bands(freqs, psd).mean(axis=1)
+
+def feature_range():
+    return (min(lo for lo, _ in bands.values()), max(hi for _, hi in bands.values()))
 
 class EEGAnalyzerGUI:
     def __init__(self, root):
@@ -36,6 +69,10 @@ class EEGAnalyzerGUI:
         # === 加在 self.create_widgets 下方
         self.use_percentage = tk.BooleanVar(value=True)
         ttk.Checkbutton(self.root, text="相對功率使用百分比 (%)", variable=self.use_percentage).pack(pady=2)
+        self.use_vectorized = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self.root, text="多通道向量化計算 (Welch 批次)", variable=self.use_vectorized).pack(pady=2)
+        self.use_features = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self.root, text="頻譜特徵 (SEF90、PAF、頻譜熵、頻段比值、1/f 斜率)", variable=self.use_features).pack(pady=2)
 
     def create_widgets(self):
         # 輸入資料夾
@@ -69,6 +106,11 @@ class EEGAnalyzerGUI:
         self.ov_entry.insert(0, "0")
         self.ov_entry.grid(row=0, column=5)
 
+        ttk.Label(param_frame, text="輸出格式：").grid(row=1, column=0, sticky="w", pady=(5, 0))
+        self.format_combo = ttk.Combobox(param_frame, width=8, state="readonly", values=list(FORMATS))
+        self.format_combo.set("csv")
+        self.format_combo.grid(row=1, column=1, pady=(5, 0))
+
         # 執行按鈕與進度條
         ttk.Button(self.root, text="▶ 開始分析", command=self.analyze).pack(pady=10)
         self.progress = ttk.Progressbar(self.root, length=500, mode="determinate")
@@ -106,13 +148,20 @@ class EEGAnalyzerGUI:
             messagebox.showerror("錯誤", "請確認參數為數值")
             return
 
-        files = [f for f in os.listdir(input_dir) if f.endswith(".csv")]
+        files = list_data_files(input_dir, log=self.log)
         if not files:
-            messagebox.showwarning("無檔案", "該資料夾內沒有 CSV 檔案！")
+            messagebox.showwarning("無檔案", "該資料夾內沒有可讀取的資料檔案！")
             return
 
-        window_size = int(win_sec * fs)
-        step_size = int(window_size * (1 - overlap_pct / 100))
+        out_fmt = self.format_combo.get()
+        try:
+            window_size = to_samples(win_sec, fs, "seconds")
+            step = step_size(window_size, overlap_pct)
+        except ValueError as e:
+            messagebox.showerror("錯誤", str(e))
+            return
+
+        filter_bank = FilterBank(bands, fs, n_jobs=None)
 
         self.progress["maximum"] = len(files)
         self.progress["value"] = 0
@@ -120,7 +169,7 @@ class EEGAnalyzerGUI:
         for file in files:
             self.log(f"處理：{file}")
             try:
-                df = pd.read_csv(os.path.join(input_dir, file))
+                df = read_table(os.path.join(input_dir, file), log=self.log)
                 time_column = None
                 if df.columns[0].lower() in ["time", "timestamp"]:
                     time_column = df.columns[0]
@@ -130,49 +179,84 @@ class EEGAnalyzerGUI:
                 bandpassed_data = {}
                 relative_power_table = []
 
-                for ch in df.columns:
+                data = df.to_numpy(dtype=float).T
+                with_features = self.use_features.get()
+                if self.use_vectorized.get() and n < window_size:
+                    # 沒有完整視窗時與逐視窗計算相同，頻段功率為 NaN
+                    avg_power_matrix = multichannel_band_power(data, fs, window_size, step)
+                    avg_features = {}
+                elif self.use_vectorized.get():
+                    freqs, psd = multichannel_psd(data, fs, window_size, step)
+                    window_power = integrate_bands(freqs, psd)
+                    avg_power_matrix = window_power.mean(axis=1)
+                    if with_features:
+                        # 特徵沿用同一份 PSD，不再重算 FFT
+                        window_features = compute_spectral_features(
+                            freqs, psd, {b: window_power[..., i] for i, b in enumerate(bands)}, feature_range())
+                        avg_features = {name: np.nanmean(v, axis=1) for name, v in window_features.items()}
+
+                feature_names = []
+                for ch_idx, ch in enumerate(df.columns):
                     x = df[ch].values
-                    band_power_list = {b: [] for b in bands}
-                    for start in range(0, n - window_size + 1, step_size):
-                        segment = x[start:start + window_size]
-                        freqs, psd = welch(segment, fs=fs, nperseg=window_size)
-                        for band, (lo, hi) in bands.items():
-                            band_power_list[band].append(band_power(freqs, psd, (lo, hi)))
-
-                    avg_power = {band: np.mean(band_power_list[band]) for band in bands}
+                    ch_features = {}
+                    if self.use_vectorized.get():
+                        avg_power = dict(zip(bands, avg_power_matrix[ch_idx]))
+                        if with_features:
+                            ch_features = {name: v[ch_idx] for name, v in avg_features.items()}
+                    else:
+                        band_power_list = {b: [] for b in bands}
+                        feature_list = {}
+                        for segment in strided_windows(x, window_size, window_starts(n, window_size, step)):
+                            freqs, psd = welch(segment, fs=fs, nperseg=window_size)
+                            seg_power = {band: band_power(freqs, psd, (lo, hi)) for band, (lo, hi) in bands.items()}
+                            for band in bands:
+                                band_power_list[band].append(seg_power[band])
+                            if with_features:
+                                for name, v in compute_spectral_features(freqs, psd, seg_power, feature_range()).items():
+                                    feature_list.setdefault(name, []).append(float(v))
+
+                        avg_power = {band: np.mean(band_power_list[band]) if band_power_list[band] else np.nan
+                                     for band in bands}
+                        ch_features = {name: np.nanmean(v) for name, v in feature_list.items()}
+                    feature_names = list(ch_features)
                     total_power = sum(avg_power.values())
                     # === 修改 analyze() 中的 rel_power 計算邏輯
-                    if self.use_percentage.get():
+                    if np.isnan(total_power):
+                        rel_power = {band: np.nan for band in avg_power}
+                    elif self.use_percentage.get():
                         rel_power = {band: (p / total_power * 100) if total_power > 0 else 0 for band, p in avg_power.items()}
                     else:
                         rel_power = {band: (p / total_power) if total_power > 0 else 0 for band, p in avg_power.items()}
 
+                    rel_power.update(ch_features)
                     rel_power["Channel"] = ch
                     relative_power_table.append(rel_power)
 
-                    for band, (lo, hi) in bands.items():
-                        filtered = bandpass_filter(x, lo, hi, fs)
-                        bandpassed_data[f"{ch}_{band}"] = filtered
+                # 所有 channel × 頻段一次濾波
+                filtered = filter_bank.apply(data, axis=-1)
+                for ch_idx, ch in enumerate(df.columns):
+                    for band in bands:
+                        bandpassed_data[f"{ch}_{band}"] = filtered[band][ch_idx]
 
                 # 輸出
                 base = os.path.splitext(file)[0]
                 rel_df = pd.DataFrame(relative_power_table)
                 rel_df = pd.DataFrame(relative_power_table)
-                rel_df = rel_df[["Channel"] + list(bands.keys())]
+                rel_df = rel_df[["Channel"] + list(bands.keys()) + feature_names]
                 
                 # 攤平成單列格式（Fp1__Delta, Fp1__Theta, ...）
                 flattened = {}
                 for _, row in rel_df.iterrows():
-                    for band in bands:
+                    for band in list(bands) + feature_names:
                         flattened[f"{row['Channel']}_{band}"] = row[band]
                 flat_df = pd.DataFrame([flattened])
-                flat_df.to_csv(os.path.join(output_dir, f"{base}_relative_band_power.csv"), index=False)
+                save_frame(flat_df, os.path.join(output_dir, base + BAND_POWER_SUFFIX), out_fmt)
 
 
                 bp_df = pd.DataFrame(bandpassed_data)
                 if time_column:
                     bp_df.insert(0, time_column, time_data)
-                bp_df.to_csv(os.path.join(output_dir, f"{base}_bandpassed_eeg.csv"), index=False)
+                save_frame(bp_df, os.path.join(output_dir, base + BANDPASSED_SUFFIX), out_fmt, index_column=time_column)
 
                 self.log("✅ 完成：" + file)
             except Exception as e:
@@ -4,8 +4,17 @@ import numpy as np
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from scipy.integrate import simpson
+from spectral_features import compute_spectral_features
+from segmentation import Segmentation, to_samples, step_size
+from data_loader import read_table
+from header_index import HeaderIndex, list_data_files, register_outputs
+from result_cache import ResultCache, code_version
 import matplotlib.pyplot as plt
 
+# 寫在輸入資料夾中的結果檔，掃描輸入時排除
+OUTPUT_FILE = "EEG_Band_Analysis_Results.xlsx"
+register_outputs(OUTPUT_FILE)
+
 class EEGAnalysisGUI:
     def __init__(self, master):
         self.master = master
@@ -70,9 +79,11 @@ class EEGAnalysisGUI:
 
         self.var_plot = tk.BooleanVar(value=False)
         self.var_sliding = tk.BooleanVar(value=False)
+        self.var_features = tk.BooleanVar(value=True)
 
         ttk.Checkbutton(frame_sampling, text="Use Sliding Window (with Overlap)", variable=self.var_sliding).grid(row=0, column=2, padx=10)
         ttk.Checkbutton(frame_sampling, text="Draw FFT Spectrum", variable=self.var_plot).grid(row=0, column=3, padx=10)
+        ttk.Checkbutton(frame_sampling, text="Spectral Features (SEF, PAF, Entropy, Ratios, 1/f Slope)", variable=self.var_features).grid(row=2, column=0, columnspan=4, sticky='w')
 
         ttk.Label(frame_sampling, text="Window Size (sec):").grid(row=1, column=0, sticky='e', pady=5)
         self.entry_window_size = ttk.Entry(frame_sampling, width=10)
@@ -96,15 +107,14 @@ class EEGAnalysisGUI:
         folder = filedialog.askdirectory()
         if folder:
             self.lbl_folder.config(text=folder)
-            files = [f for f in os.listdir(folder) if f.endswith('.csv')]
-            if files:
-                df = pd.read_csv(os.path.join(folder, files[0]))
-                self.file_columns = df.columns.tolist()
+            index = HeaderIndex(folder)
+            if index.files:
+                self.file_columns = index.columns()
                 for cb in self.combo_cols:
                     cb['values'] = [''] + self.file_columns
                     cb.set('')
             else:
-                messagebox.showwarning("No Files", "No CSV files found in the folder.")
+                messagebox.showwarning("No Files", "No supported data files found in the folder.")
 
     def log_message(self, msg):
         self.log.insert(tk.END, msg + '\n')
@@ -126,11 +136,92 @@ class EEGAnalysisGUI:
         safe_name = ''.join(c if c not in '[]:*?/\\' else '_' for c in str(name))
         return safe_name[:31]
 
+    def band_powers(self, freqs, powers, bands):
+        total_power = simpson(powers, x=freqs)
+        band_power = {}
+        for band, (low, high) in bands.items():
+            band_mask = (freqs >= low) & (freqs <= high)
+            band_power[band] = simpson(powers[band_mask], x=freqs[band_mask])
+        return total_power, band_power
+
+    def fft_power(self, segment, sampling_rate):
+        fft_vals = np.fft.fft(segment)
+        freqs = np.fft.fftfreq(len(segment), d=1 / sampling_rate)
+        pos_mask = (freqs >= 0.5) & (freqs <= 100)
+        return freqs[pos_mask], np.abs(fft_vals[pos_mask]) ** 2
+
+    def compute_sliding_band_power(self, channel_data, bands, sampling_rate, segmentation, with_features=False):
+        power_list = {b: [] for b in bands}
+        rel_power_list = {b: [] for b in bands}
+        total_powers = []
+        feature_list = {}
+
+        for segment in segmentation.view(channel_data):
+            freqs, powers = self.fft_power(segment, sampling_rate)
+            total_power, band_power = self.band_powers(freqs, powers, bands)
+            total_powers.append(total_power)
+
+            for band in bands:
+                power_list[band].append(band_power[band])
+                rel_power_list[band].append(band_power[band] / total_power if total_power > 0 else 0)
+
+            if with_features:
+                for name, value in compute_spectral_features(freqs, powers, band_power).items():
+                    feature_list.setdefault(name, []).append(float(value))
+
+        result = {"Total Power (0.5–100Hz)": np.mean(total_powers)}
+        for band in bands:
+            result[f"{band.capitalize()} Band Power"] = np.mean(power_list[band])
+            result[f"{band.capitalize()} Band Relative Power"] = np.mean(rel_power_list[band])
+        for name, values in feature_list.items():
+            result[name] = np.nanmean(values)
+        return result
+
+    def compute_band_power(self, channel_data, bands, sampling_rate, with_features=False):
+        # 整段處理邏輯
+        freqs, powers = self.fft_power(channel_data, sampling_rate)
+        total_power, band_power = self.band_powers(freqs, powers, bands)
+
+        result = {"Total Power (0.5–100Hz)": total_power}
+        for band in bands:
+            rel_power = band_power[band] / total_power if total_power > 0 else 0
+            result[f"{band.capitalize()} Band Power"] = band_power[band]
+            result[f"{band.capitalize()} Band Relative Power"] = rel_power
+        if with_features:
+            for name, value in compute_spectral_features(freqs, powers, band_power).items():
+                result[name] = float(value)
+        return result
+
+    def analyze_file(self, file_path, present_cols, bands, sampling_rate, use_sliding, window_size, overlap_pct, with_features):
+        """
+        單一檔案所有 channel 的頻段結果，可存入結果快取。
+        :return: ({channel: 頻段結果}, 紀錄訊息)
+        """
+        file_name = os.path.basename(file_path)
+        data = read_table(file_path, present_cols, dtype=np.float32, log=self.log_message)
+        if use_sliding:
+            segmentation = Segmentation(len(data), window_size, overlap_pct, fs=sampling_rate, unit="seconds")
+
+        channel_results = {}
+        messages = []
+        for col in present_cols:
+            try:
+                channel_data = data[col].values
+                if use_sliding:
+                    channel_results[col] = self.compute_sliding_band_power(channel_data, bands, sampling_rate, segmentation, with_features)
+                else:
+                    channel_results[col] = self.compute_band_power(channel_data, bands, sampling_rate, with_features)
+                messages.append(f"Processed {file_name} Column {col}")
+            except Exception as e:
+                messages.append(f"Error processing {file_name}: {e}")
+        return channel_results, messages
+
     def start_processing(self):
         folder = self.lbl_folder.cget("text")
         selected_cols = [cb.get() for cb in self.combo_cols if cb.get()]
         bands = self.get_frequency_bands()
         use_sliding = self.var_sliding.get()
+        with_features = self.var_features.get()
         plot_required = self.var_plot.get()
 
         try:
@@ -145,85 +236,53 @@ class EEGAnalysisGUI:
             messagebox.showerror("Error", "Please check folder, columns and frequency bands.")
             return
 
-        files = [f for f in os.listdir(folder) if f.endswith('.csv')]
-        output_excel_path = os.path.join(folder, "EEG_Band_Analysis_Results.xlsx")
+        if use_sliding:
+            try:
+                step_size(to_samples(window_size, sampling_rate, "seconds"), overlap_pct)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+
+        files = list_data_files(folder, log=self.log_message)
+        output_excel_path = os.path.join(folder, OUTPUT_FILE)
+        results = {col: [] for col in selected_cols}
+        index = HeaderIndex(folder)
+
+        params = {"columns": selected_cols, "bands": bands, "fs": sampling_rate, "sliding": use_sliding,
+                  "window_size": window_size, "overlap": overlap_pct, "features": with_features}
+        cache = ResultCache(folder, "eeg_band_power", params,
+                            code_version(__file__))
+
+        # 每個檔案只讀一次，所有選取的 channel 一起計算
+        for file_name in files:
+            try:
+                file_path = os.path.join(folder, file_name)
+                header = index.columns(file_name)
+                present_cols = [col for col in selected_cols if col in header]
+                for col in selected_cols:
+                    if col not in present_cols:
+                        self.log_message(f"Skipped {file_name} (missing column {col})")
+                if not present_cols:
+                    continue
+
+                channel_results, messages = cache.cached(file_path, lambda: self.analyze_file(
+                    file_path, present_cols, bands, sampling_rate, use_sliding, window_size, overlap_pct, with_features))
+            except Exception as e:
+                self.log_message(f"Error processing {file_name}: {e}")
+                continue
+
+            for msg in messages:
+                self.log_message(msg)
+            for col, band_result in channel_results.items():
+                result = {"File Name": file_name}
+                result.update(band_result)
+                results[col].append(result)
+        self.log_message(f"Result cache: {cache.summary()}")
 
         with pd.ExcelWriter(output_excel_path) as writer:
             for col in selected_cols:
-                results = []
-
-                for file_name in files:
-                    try:
-                        file_path = os.path.join(folder, file_name)
-                        data = pd.read_csv(file_path)
-                        if col not in data.columns:
-                            self.log_message(f"Skipped {file_name} (missing column {col})")
-                            continue
-
-                        channel_data = data[col].values
-                        n = len(channel_data)
-
-                        if use_sliding:
-                            window_len = int(window_size * sampling_rate)
-                            step = int(window_len * (1 - overlap_pct / 100))
-                            if step <= 0:
-                                messagebox.showerror("Error", "Overlap too high, step size is zero.")
-                                return
-
-                            power_list = {b: [] for b in bands}
-                            rel_power_list = {b: [] for b in bands}
-                            total_powers = []
-
-                            for start in range(0, n - window_len + 1, step):
-                                segment = channel_data[start:start + window_len]
-                                fft_vals = np.fft.fft(segment)
-                                freqs = np.fft.fftfreq(len(segment), d=1 / sampling_rate)
-                                pos_mask = (freqs >= 0.5) & (freqs <= 100)
-                                freqs = freqs[pos_mask]
-                                powers = np.abs(fft_vals[pos_mask]) ** 2
-
-                                total_power = simpson(powers, x=freqs)
-                                total_powers.append(total_power)
-
-                                for band, (low, high) in bands.items():
-                                    band_mask = (freqs >= low) & (freqs <= high)
-                                    band_power = simpson(powers[band_mask], x=freqs[band_mask])
-                                    power_list[band].append(band_power)
-                                    rel_power_list[band].append(band_power / total_power if total_power > 0 else 0)
-
-                            result = {"File Name": file_name}
-                            result["Total Power (0.5–100Hz)"] = np.mean(total_powers)
-                            for band in bands:
-                                result[f"{band.capitalize()} Band Power"] = np.mean(power_list[band])
-                                result[f"{band.capitalize()} Band Relative Power"] = np.mean(rel_power_list[band])
-                            results.append(result)
-
-                        else:
-                            # 整段處理邏輯
-                            fft_values = np.fft.fft(channel_data)
-                            freqs = np.fft.fftfreq(n, d=1 / sampling_rate)
-                            pos_mask = (freqs >= 0.5) & (freqs <= 100)
-                            freqs = freqs[pos_mask]
-                            powers = np.abs(fft_values[pos_mask]) ** 2
-
-                            total_power = simpson(powers, x=freqs)
-                            result = {"File Name": file_name}
-                            result["Total Power (0.5–100Hz)"] = total_power
-                            for band, (low, high) in bands.items():
-                                band_mask = (freqs >= low) & (freqs <= high)
-                                band_power = simpson(powers[band_mask], x=freqs[band_mask])
-                                rel_power = band_power / total_power if total_power > 0 else 0
-                                result[f"{band.capitalize()} Band Power"] = band_power
-                                result[f"{band.capitalize()} Band Relative Power"] = rel_power
-                            results.append(result)
-
-                        self.log_message(f"Processed {file_name} Column {col}")
-
-                    except Exception as e:
-                        self.log_message(f"Error processing {file_name}: {e}")
-
-                if results:
-                    df_results = pd.DataFrame(results)
+                if results[col]:
+                    df_results = pd.DataFrame(results[col])
                     df_results.to_excel(writer, sheet_name=self.safe_sheet_name(col), index=False)
 
         messagebox.showinfo("Completed", f"Results saved to {output_excel_path}")
@@ -5,6 +5,14 @@ from tkinter import filedialog, messagebox, ttk, scrolledtext
 import pandas as pd
 import numpy as np
 from NLIDOOP3 import RecurrenceAnalysis
+from segmentation import Segmentation
+from data_loader import read_table
+from header_index import HeaderIndex, list_data_files, register_outputs
+from result_cache import ResultCache, code_version
+
+# 寫在輸入資料夾中的結果檔，掃描輸入時排除
+OUTPUT_FILE = "NLID_Results_Avg.xlsx"
+register_outputs(OUTPUT_FILE)
 
 class NLIDApp:
     def __init__(self, master):
@@ -81,14 +89,13 @@ class NLIDApp:
         if not os.path.isdir(folder):
             messagebox.showerror("Invalid folder", "Please select a valid folder first.")
             return
-        files = [f for f in os.listdir(folder) if f.lower().endswith((".xls", ".xlsx", ".csv"))]
+        index = HeaderIndex(folder)
+        files = index.files
         if not files:
-            messagebox.showwarning("No files found", "No Excel/CSV files in the folder.")
+            messagebox.showwarning("No files found", "No supported data files in the folder.")
             return
         try:
-            path = os.path.join(folder, files[0])
-            df = pd.read_excel(path) if path.endswith(('.xls', '.xlsx')) else pd.read_csv(path)
-            cols = [''] + list(df.columns.str.strip())
+            cols = [''] + [c.strip() for c in index.columns()]
             self.combo_col_x['values'] = cols
             self.combo_col_y['values'] = cols
             messagebox.showinfo("Columns Loaded", f"Loaded columns from {files[0]}")
@@ -119,68 +126,83 @@ class NLIDApp:
             return
         threading.Thread(target=self.process_files, args=(folder, col_x, col_y, m, tau, window_size, overlap), daemon=True).start()
 
+    def analyze_file(self, file, col_x, col_y, m, tau, window_size, overlap):
+        """
+        單一檔案的計算結果，可存入結果快取。
+        :return: (結果列或 None, 紀錄訊息)
+        """
+        basename = os.path.basename(file)
+        cx = col_x.strip().upper()
+        cy = col_y.strip().upper()
+        df = read_table(file, lambda c: c.strip().upper() in (cx, cy), log=self.log_message)
+        df.columns = df.columns.str.strip().str.upper()
+
+        if cx not in df.columns or cy not in df.columns:
+            return None, f"{basename}: missing selected columns."
+
+        x = df[cx].dropna().values
+        y = df[cy].dropna().values
+        min_len = min(len(x), len(y))
+        if min_len < window_size:
+            return None, f"{basename}: data shorter than window size."
+
+        # Sliding window
+        segmentation = Segmentation(min_len, window_size, overlap, overlap_unit="ratio")
+        nlid_xy_list = []
+        nlid_yx_list = []
+        for x_win, y_win in zip(segmentation.view(x[:min_len]), segmentation.view(y[:min_len])):
+            ra_x = RecurrenceAnalysis(x_win, m=m, tau=tau)
+            ps_x = ra_x.reconstruct_phase_space()
+            ra_y = RecurrenceAnalysis(y_win, m=m, tau=tau)
+            ps_y = ra_y.reconstruct_phase_space()
+
+            AR_X = RecurrenceAnalysis.compute_reconstruction_matrix(ps_x, threshold=0.1, threshold_type="dynamic")
+            AR_Y = RecurrenceAnalysis.compute_reconstruction_matrix(ps_y, threshold=0.1, threshold_type="dynamic")
+
+            nlid_xy, nlid_yx = RecurrenceAnalysis.calculate_nlid(AR_X, AR_Y)
+            nlid_xy_list.append(nlid_xy)
+            nlid_yx_list.append(nlid_yx)
+
+        # Compute average NLID
+        avg_xy = np.mean(nlid_xy_list)
+        avg_yx = np.mean(nlid_yx_list)
+
+        row = {
+            "檔名": basename,
+            f"Avg NLID({cx}|{cy})": avg_xy,
+            f"Avg NLID({cy}|{cx})": avg_yx
+        }
+        return row, f"Processed: {basename} (windows: {len(nlid_xy_list)})"
+
     def process_files(self, folder, col_x, col_y, m, tau, window_size, overlap):
-        files = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(('.xlsx', '.csv'))]
+        files = list_data_files(folder, full_path=True, log=self.log_message)
+        # 先用標題索引找出缺少欄位的檔案，不必逐檔讀取才發現
+        missing = HeaderIndex(folder).missing([col_x, col_y], key=lambda c: c.strip().upper())
+        for name, lacking in missing.items():
+            self.log_message(f"{name}: missing selected columns {lacking}")
+        files = [f for f in files if os.path.basename(f) not in missing]
         self.progress['maximum'] = len(files)
         self.progress['value'] = 0
         results = []
 
+        params = {"x": col_x, "y": col_y, "m": m, "tau": tau, "window_size": window_size, "overlap": overlap}
+        cache = ResultCache(folder, "nlid", params, code_version(__file__, RecurrenceAnalysis))
+
         for file in files:
             basename = os.path.basename(file)
             try:
-                df = pd.read_excel(file) if file.endswith(('.xls', '.xlsx')) else pd.read_csv(file)
-                df.columns = df.columns.str.strip().str.upper()
-                cx = col_x.strip().upper()
-                cy = col_y.strip().upper()
-
-                if cx not in df.columns or cy not in df.columns:
-                    self.log_message(f"{basename}: missing selected columns.")
-                    continue
-
-                x = df[cx].dropna().values
-                y = df[cy].dropna().values
-                min_len = min(len(x), len(y))
-                if min_len < window_size:
-                    self.log_message(f"{basename}: data shorter than window size.")
-                    continue
-
-                # Sliding window
-                step = int(window_size * (1 - overlap))
-                nlid_xy_list = []
-                nlid_yx_list = []
-                for start in range(0, min_len - window_size + 1, step):
-                    x_win = x[start:start + window_size]
-                    y_win = y[start:start + window_size]
-
-                    ra_x = RecurrenceAnalysis(x_win, m=m, tau=tau)
-                    ps_x = ra_x.reconstruct_phase_space()
-                    ra_y = RecurrenceAnalysis(y_win, m=m, tau=tau)
-                    ps_y = ra_y.reconstruct_phase_space()
-
-                    AR_X = RecurrenceAnalysis.compute_reconstruction_matrix(ps_x, threshold=0.1, threshold_type="dynamic")
-                    AR_Y = RecurrenceAnalysis.compute_reconstruction_matrix(ps_y, threshold=0.1, threshold_type="dynamic")
-
-                    nlid_xy, nlid_yx = RecurrenceAnalysis.calculate_nlid(AR_X, AR_Y)
-                    nlid_xy_list.append(nlid_xy)
-                    nlid_yx_list.append(nlid_yx)
-
-                # Compute average NLID
-                avg_xy = np.mean(nlid_xy_list)
-                avg_yx = np.mean(nlid_yx_list)
-
-                results.append({
-                    "檔名": basename,
-                    f"Avg NLID({cx}|{cy})": avg_xy,
-                    f"Avg NLID({cy}|{cx})": avg_yx
-                })
-                self.log_message(f"Processed: {basename} (windows: {len(nlid_xy_list)})")
+                row, message = cache.cached(file, lambda: self.analyze_file(file, col_x, col_y, m, tau, window_size, overlap))
+                if row:
+                    results.append(row)
+                self.log_message(message)
             except Exception as e:
                 self.log_message(f"Error {basename}: {e}")
             self.progress['value'] += 1
+        self.log_message(f"Result cache: {cache.summary()}")
 
         if results:
             result_df = pd.DataFrame(results)
-            output_path = os.path.join(folder, "NLID_Results_Avg.xlsx")
+            output_path = os.path.join(folder, OUTPUT_FILE)
             result_df.to_excel(output_path, index=False)
             self.log_message(f"Results saved to {output_path}")
             messagebox.showinfo("Done", f"Analysis completed. Saved to: {output_path}")
@@ -8,6 +8,10 @@ from tkinter import filedialog, messagebox, scrolledtext, simpledialog
 from tkinter import ttk
 import smtplib
 from email.message import EmailMessage
+from data_loader import read_columns
+from header_index import HeaderIndex, list_data_files
+from segmentation import Segmentation
+from result_cache import ResultCache, code_version
 
 class EntropyApp:
     MAX_COLS = 5
@@ -37,7 +41,7 @@ class EntropyApp:
         ttk.Button(container, text="Load Columns", command=self.load_columns).pack(pady=5)
 
         # Column selection
-        col_frame = ttk.Labelframe(container, text="Select Columns (up to 5)", padding=10)
+        col_frame = ttk.Labelframe(container, text="Select Columns (up to 5, or all numeric / regex)", padding=10)
         col_frame.pack(fill='x', pady=5)
         self.combo_cols = []
         for i in range(self.MAX_COLS):
@@ -45,6 +49,11 @@ class EntropyApp:
             combo = ttk.Combobox(col_frame, state="readonly", width=30)
             combo.grid(row=i, column=1, sticky='w', padx=5, pady=2)
             self.combo_cols.append(combo)
+        self.var_all_cols = tk.BooleanVar(value=False)
+        ttk.Checkbutton(col_frame, text="All numeric columns (ignore selections above)", variable=self.var_all_cols).grid(row=self.MAX_COLS, column=0, columnspan=2, sticky='w', pady=(5, 0))
+        ttk.Label(col_frame, text="Column regex:").grid(row=self.MAX_COLS + 1, column=0, sticky='e')
+        self.entry_regex = ttk.Entry(col_frame, width=30)
+        self.entry_regex.grid(row=self.MAX_COLS + 1, column=1, sticky='w', padx=5, pady=2)
         col_frame.columnconfigure(1, weight=1)
 
         # Parameters
@@ -115,14 +124,13 @@ class EntropyApp:
         if not os.path.isdir(folder):
             messagebox.showerror("Invalid folder", "Please select a valid folder first.")
             return
-        files = [f for f in os.listdir(folder) if f.lower().endswith((".xls", ".xlsx", ".csv"))]
+        index = HeaderIndex(folder)
+        files = index.files
         if not files:
-            messagebox.showwarning("No files found", "No Excel/CSV files in the folder.")
+            messagebox.showwarning("No files found", "No supported data files in the folder.")
             return
         try:
-            path = os.path.join(folder, files[0])
-            df = pd.read_excel(path) if path.endswith(('.xls', '.xlsx')) else pd.read_csv(path)
-            cols = [''] + list(df.columns)
+            cols = [''] + index.columns()
             for combo in self.combo_cols:
                 combo['values'] = cols
                 combo.set('')
@@ -149,7 +157,7 @@ class EntropyApp:
             messagebox.showerror("Invalid m", "Embedding dimension must be integer.")
             return
         cols = [c.get() for c in self.combo_cols if c.get()]
-        if not os.path.isdir(folder) or not cols or not output:
+        if not os.path.isdir(folder) or not (cols or self.var_all_cols.get()) or not output:
             messagebox.showerror("Missing info", "Ensure folder, columns, and output are set.")
             return
         use_window = self.use_window.get()
@@ -158,50 +166,64 @@ class EntropyApp:
         out_style = self.output_style.get() if use_window else None
         threading.Thread(target=self.process_files, args=(folder, output, m, cols, use_window, win_size, overlap, out_style), daemon=True).start()
 
+    def analyze_file(self, file, m, cols, use_window, win_size, overlap, out_style):
+        """
+        單一檔案的計算結果，可存入結果快取。
+        :return: (結果列, 紀錄訊息)
+        """
+        df, file_cols = read_columns(file, cols, self.var_all_cols.get(), self.entry_regex.get().strip(),
+                                     self.log_message)
+        row = {'Filename': os.path.basename(file)}
+        logs = []
+        for col in (file_cols if self.var_all_cols.get() else cols):
+            if col not in file_cols:
+                logs.append(f"{col} skipped")
+                continue
+
+            data = df[col].dropna().values
+            if use_window:
+                s_list = []
+                segmentation = Segmentation(len(data), win_size, overlap, overlap_unit="samples")
+                for seg in segmentation.view(data):
+                    if len(seg) < m + 1: continue
+                    try:
+                        s = nolds.sampen(seg, emb_dim=m)
+                        s_list.append(s)
+                    except:
+                        s_list.append(np.nan)
+
+                if out_style == "Average Only":
+                    row[f"{col} SampEn_avg"] = np.nanmean(s_list)
+                else:
+                    for i, val in enumerate(s_list):
+                        row[f"{col}_seg{i+1}"] = val
+                logs.append(f"{col} ({len(s_list)} segments)")
+            else:
+                s = nolds.sampen(data, emb_dim=m)
+                row[f"{col} SampEn"] = s
+                logs.append(f"{col}={s:.4f}")
+        return row, logs
+
     def process_files(self, folder, output, m, cols, use_window, win_size, overlap, out_style):
-        files = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith((".xls", ".xlsx", ".csv"))]
+        files = list_data_files(folder, exclude=(output,), full_path=True)
         self.progress['maximum'] = len(files)
         self.progress['value'] = 0
         results = []
 
+        params = {"m": m, "columns": cols, "all_columns": self.var_all_cols.get(), "regex": self.entry_regex.get().strip(),
+                  "window": use_window, "win_size": win_size, "overlap": overlap, "out_style": out_style}
+        cache = ResultCache(folder, "sampen", params, code_version(__file__, nolds))
+
         for file in files:
             basename = os.path.basename(file)
             try:
-                df = pd.read_excel(file) if file.endswith(('.xls', '.xlsx')) else pd.read_csv(file)
-                row = {'Filename': basename}
-                logs = []
-                for col in cols:
-                    if col not in df.columns:
-                        logs.append(f"{col} skipped")
-                        continue
-
-                    data = df[col].dropna().values
-                    if use_window:
-                        s_list = []
-                        for start in range(0, len(data) - win_size + 1, win_size - overlap):
-                            seg = data[start:start+win_size]
-                            if len(seg) < m + 1: continue
-                            try:
-                                s = nolds.sampen(seg, emb_dim=m)
-                                s_list.append(s)
-                            except:
-                                s_list.append(np.nan)
-
-                        if out_style == "Average Only":
-                            row[f"{col} SampEn_avg"] = np.nanmean(s_list)
-                        else:
-                            for i, val in enumerate(s_list):
-                                row[f"{col}_seg{i+1}"] = val
-                        logs.append(f"{col} ({len(s_list)} segments)")
-                    else:
-                        s = nolds.sampen(data, emb_dim=m)
-                        row[f"{col} SampEn"] = s
-                        logs.append(f"{col}={s:.4f}")
+                row, logs = cache.cached(file, lambda: self.analyze_file(file, m, cols, use_window, win_size, overlap, out_style))
                 results.append(row)
                 self.log_message(f"{basename}: " + ", ".join(logs))
             except Exception as e:
                 self.log_message(f"Error {basename}: {e}")
             self.progress['value'] += 1
+        self.log_message(f"Result cache: {cache.summary()}")
 
         if results:
             pd.DataFrame(results).to_excel(output, index=False)
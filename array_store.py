@@ -0,0 +1,267 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+# 支援的輸出格式與副檔名
+FORMATS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'npy': '.npy',
+    'hdf5': '.h5',
+}
+
+# 欄位式（columnar）格式：原始檔旁的 <檔名>.columnar 資料夾，
+# npy 格式每個 channel 一個 .npy（可 mmap），parquet 格式為單一 data.parquet；
+# meta.json 記錄格式、fs、channel 名稱與單位，以及轉換時來源檔的大小與修改時間
+COLUMNAR_SUFFIX = '.columnar'
+COLUMNAR_FORMATS = ('npy', 'parquet')
+META_FILE = 'meta.json'
+
+# npy 格式的 index 欄位另存為 <檔名>.index.npy
+INDEX_SUFFIX = '.index.npy'
+
+
+def sidecar_path(npy_path):
+    return os.path.splitext(npy_path)[0] + '.json'
+
+
+def index_path(npy_path):
+    return os.path.splitext(npy_path)[0] + INDEX_SUFFIX
+
+
+def is_index_file(path):
+    """
+    :return: 是否為 save_frame 寫出的 index 欄位檔：旁邊需有同名的 .npy 與 .json，
+             其他剛好以 .index.npy 結尾的紀錄不受影響
+    """
+    if not path.lower().endswith(INDEX_SUFFIX):
+        return False
+    npy_path = path[:-len(INDEX_SUFFIX)] + '.npy'
+    return os.path.isfile(npy_path) and os.path.isfile(sidecar_path(npy_path))
+
+
+def index_array(series):
+    """
+    index 欄位的值：數值保留原本精度；字串（例如 "00:00:01"）等其他型別轉為固定長度的 unicode，
+    .npy 不需 allow_pickle 就能讀回。
+    """
+    values = series.to_numpy()
+    if values.dtype.kind in 'biuf':
+        return values
+    return values.astype(str)
+
+
+def save_frame(df, path_base, fmt='csv', index_column=None, dtype=np.float32):
+    """
+    將 DataFrame 以指定格式儲存（路徑不含副檔名），資料欄位轉為 float32。
+    index_column（例如時間欄位）保留原本精度，另外存放。
+    :return: 實際寫出的檔案路徑
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"不支援的輸出格式：{fmt}")
+    path = path_base + FORMATS[fmt]
+
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return path
+
+    index = index_array(df[index_column]) if index_column else None
+    data_cols = [c for c in df.columns if c != index_column]
+    values = df[data_cols].to_numpy(dtype=dtype)
+    meta = {
+        'columns': [str(c) for c in data_cols],
+        'dtype': np.dtype(dtype).name,
+        'index_column': index_column,
+    }
+
+    if fmt == 'parquet':
+        out = pd.DataFrame(values, columns=meta['columns'])
+        if index_column:
+            out.insert(0, index_column, df[index_column].to_numpy())
+        out.to_parquet(path, compression='zstd', index=False)
+    elif fmt == 'npy':
+        # .npy 不壓縮，才能用 np.load(mmap_mode='r') 直接映射
+        np.save(path, values)
+        if index_column:
+            np.save(index_path(path), index)
+        with open(sidecar_path(path), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+    elif fmt == 'hdf5':
+        import h5py
+        with h5py.File(path, 'w') as f:
+            ds = f.create_dataset('data', data=values, compression='gzip', compression_opts=4,
+                                  shuffle=True, chunks=(min(len(values), 65536) or 1, values.shape[1] or 1))
+            ds.attrs['columns'] = json.dumps(meta['columns'], ensure_ascii=False)
+            if index_column:
+                if index.dtype.kind == 'U':
+                    # HDF5 沒有 numpy 的 unicode 型別，以 UTF-8 可變長度字串存放
+                    f.create_dataset('index', data=index.astype(object), dtype=h5py.string_dtype(),
+                                     compression='gzip', compression_opts=4)
+                else:
+                    f.create_dataset('index', data=index, compression='gzip', compression_opts=4)
+                ds.attrs['index_column'] = index_column
+    return path
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def columnar_path(path):
+    return os.path.splitext(path)[0] + COLUMNAR_SUFFIX
+
+
+def read_columnar_meta(folder):
+    with open(os.path.join(folder, META_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def clear_columnar_meta(folder):
+    # 先移除舊的 meta，寫到一半中斷時不會被當成有效的資料
+    os.makedirs(folder, exist_ok=True)
+    meta_path = os.path.join(folder, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+
+def write_columnar_meta(folder, fmt, fs, rows, channels, skipped=(), source=None):
+    meta = {
+        'format': fmt,
+        'fs': fs,
+        'rows': rows,
+        'channels': channels,
+        'skipped': list(skipped),
+        'source': dict(name=os.path.basename(source), **file_signature(source)) if source else None,
+    }
+    with open(os.path.join(folder, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return meta
+
+
+def write_columnar(df, folder, fmt='npy', fs=None, units=None, source=None):
+    """
+    將 DataFrame 以欄位式格式寫入 folder，只保留數值欄位，型別不變。
+    :param units: 所有 channel 共用的單位字串，或 {channel: 單位}
+    :param source: 來源檔路徑，記錄其大小與修改時間，讀取時用來判斷是否過期
+    :return: meta
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"不支援的輸出格式：{fmt}")
+    clear_columnar_meta(folder)
+
+    numeric = df.select_dtypes(include=[np.number])
+    skipped = [str(c) for c in df.columns if c not in numeric.columns]
+    channels = []
+    for i, col in enumerate(numeric.columns):
+        unit = units.get(col) if isinstance(units, dict) else units
+        channel = {'name': str(col), 'dtype': numeric[col].dtype.name, 'unit': unit}
+        if fmt == 'npy':
+            channel['file'] = f'ch{i:04d}.npy'
+            np.save(os.path.join(folder, channel['file']), numeric[col].to_numpy())
+        channels.append(channel)
+    if fmt == 'parquet':
+        out = numeric.copy()
+        out.columns = [c['name'] for c in channels]
+        out.to_parquet(os.path.join(folder, 'data.parquet'), compression='zstd', index=False)
+
+    return write_columnar_meta(folder, fmt, fs, len(df), channels, skipped, source)
+
+
+class ColumnarWriter:
+    """
+    逐塊寫入 npy 格式的欄位式資料，總列數需事先知道（例如 EDF 的樣本數）。
+    每個 channel 以 open_memmap 預先建立，寫入時不需把整個檔案放在記憶體；
+    close() 才寫入 meta，中途失敗不會留下被視為有效的資料。
+    :param units: 所有 channel 共用的單位字串，或 {channel: 單位}
+    """
+
+    def __init__(self, folder, names, rows, dtype=np.float64, fs=None, units=None):
+        clear_columnar_meta(folder)
+        self.folder = folder
+        self.rows = rows
+        self.fs = fs
+        self.position = 0
+        self.channels = []
+        self.arrays = []
+        for i, name in enumerate(names):
+            unit = units.get(name) if isinstance(units, dict) else units
+            channel = {'name': str(name), 'dtype': np.dtype(dtype).name, 'unit': unit, 'file': f'ch{i:04d}.npy'}
+            self.arrays.append(np.lib.format.open_memmap(os.path.join(folder, channel['file']), mode='w+',
+                                                         dtype=dtype, shape=(rows,)))
+            self.channels.append(channel)
+
+    def write(self, block):
+        """
+        :param block: (rows, channels) 陣列，接在已寫入的資料後面
+        """
+        n = len(block)
+        if self.position + n > self.rows:
+            raise ValueError(f"寫入的列數超過預先配置的 {self.rows} 列")
+        for j, array in enumerate(self.arrays):
+            array[self.position:self.position + n] = block[:, j]
+        self.position += n
+
+    def close(self, source=None):
+        """
+        :param source: 來源檔路徑，需在來源檔寫完之後才呼叫
+        :return: meta
+        """
+        for array in self.arrays:
+            array.flush()
+        self.arrays = []
+        if self.position != self.rows:
+            raise ValueError(f"只寫入 {self.position} 列，預期 {self.rows} 列")
+        return write_columnar_meta(self.folder, 'npy', self.fs, self.rows, self.channels, source=source)
+
+    def abort(self):
+        # 放棄寫到一半的資料：先釋放記憶體映射（Windows 上映射中的檔案無法刪除），再刪除整個資料夾
+        self.arrays = []
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+def load_columnar(folder, columns=None, mmap=True):
+    """
+    讀取欄位式資料，只載入需要的 channel；npy 格式預設以 np.load(mmap_mode='r') 映射，不會整個載入。
+    :param columns: channel 名稱 list，None 代表全部
+    """
+    meta = read_columnar_meta(folder)
+    names = [c['name'] for c in meta['channels']]
+    columns = names if columns is None else list(columns)
+    if meta['format'] == 'parquet':
+        return pd.read_parquet(os.path.join(folder, 'data.parquet'), columns=columns)
+    files = {c['name']: c['file'] for c in meta['channels']}
+    arrays = {name: np.load(os.path.join(folder, files[name]), mmap_mode='r' if mmap else None) for name in columns}
+    return pd.DataFrame(arrays, columns=columns, copy=False)
+
+
+def load_frame(path, mmap=True):
+    """
+    讀回 save_frame 寫出的檔案；.npy 預設以記憶體映射開啟，不會整個載入。
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return pd.read_csv(path)
+    if ext == '.parquet':
+        return pd.read_parquet(path)
+    if ext == '.npy':
+        values = np.load(path, mmap_mode='r' if mmap else None)
+        with open(sidecar_path(path), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        df = pd.DataFrame(values, columns=meta['columns'], copy=False)
+        if meta.get('index_column'):
+            df.insert(0, meta['index_column'], np.load(index_path(path)))
+        return df
+    if ext in ('.h5', '.hdf5'):
+        import h5py
+        with h5py.File(path, 'r') as f:
+            ds = f['data']
+            df = pd.DataFrame(ds[()], columns=json.loads(ds.attrs['columns']))
+            if 'index_column' in ds.attrs:
+                index = f['index']
+                values = index.asstr()[()] if h5py.check_string_dtype(index.dtype) else index[()]
+                df.insert(0, ds.attrs['index_column'], values)
+        return df
+    raise ValueError(f"不支援的檔案格式：{path}")
@@ -0,0 +1,233 @@
+"""
+通用的批次轉檔：CSV、任意分隔符的 TXT、Excel、Parquet、NPY、HDF5 互轉。
+讀取與寫出以有上限的 queue 串成生產者 / 消費者管線：背景執行緒先讀下一個檔案，
+主執行緒同時寫出上一個，記憶體中最多只有 prefetch + 2 個檔案的資料。
+文字檔的分隔符與是否有標題列由檔案開頭的位元組樣本自動判斷。
+
+命令列：python bulk_convert.py 輸入資料夾 輸出資料夾 --to csv xlsx [--sep auto] [--header auto|yes|no]
+        [--float-format 6] [--compression gzip|zstd] [--float32] [--prefetch 2]
+"""
+import os
+import re
+import csv
+import time
+import queue
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from array_store import FORMATS, save_frame, load_frame
+from data_loader import read_table, downcast
+from table_writer import CSV_COMPRESSIONS, parse_float_format, write_table
+from conversion_runner import ConversionResult, file_size, summarize, format_summary
+from header_index import list_data_files
+from column_select import is_number
+
+TEXT_EXTENSIONS = ('.csv', '.txt', '.tsv', '.dat')
+INPUT_EXTENSIONS = TEXT_EXTENSIONS + ('.xlsx', '.xls', '.parquet', '.npy', '.h5', '.hdf5')
+# 輸出格式 -> 副檔名（csv 壓縮時另加 .gz / .zst）
+OUTPUT_FORMATS = {'csv': '.csv', 'xlsx': '.xlsx', 'parquet': '.parquet', 'npy': '.npy', 'hdf5': '.h5'}
+
+# 判斷分隔符與標題列時讀取的位元組數
+SNIFF_BYTES = 64 * 1024
+DELIMITERS = ',\t;| '
+DEFAULT_PREFETCH = 2
+
+
+def split_line(line, sep):
+    if sep == r'\s+':
+        return line.split()
+    if len(sep) > 1:
+        return re.split(sep, line)
+    return next(csv.reader([line], delimiter=sep), [])
+
+
+def sniff_text(path, sep=None, sample_bytes=SNIFF_BYTES):
+    """
+    由檔案開頭的位元組樣本判斷分隔符與是否有標題列。
+    :param sep: 已知的分隔符，None 時一併判斷
+    :return: (sep, has_header)；以多個空白對齊的欄位回傳 r'\\s+'
+    """
+    with open(path, 'rb') as f:
+        raw = f.read(sample_bytes)
+    text = raw.decode('utf-8-sig', errors='replace')
+    if len(raw) == sample_bytes and '\n' in text:
+        # 捨棄被截斷的最後一行
+        text = text[:text.rfind('\n')]
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return ',', False
+
+    sample = '\n'.join(lines[:200])
+    sniffer = csv.Sniffer()
+    if sep is None:
+        try:
+            sep = sniffer.sniff(sample, delimiters=DELIMITERS).delimiter
+        except csv.Error:
+            # 以空白對齊的欄位（行首有空白時 Sniffer 無法判斷），否則為只有一個欄位
+            sep = ' ' if len(lines[0].split()) > 1 else ','
+        if sep == ' ':
+            sep = r'\s+'
+
+    first = [f for f in split_line(lines[0], sep) if f.strip()]
+    if len(lines) > 1 and all(is_number(f) for f in split_line(lines[1], sep) if f.strip()):
+        # 資料列都是數值時，第一列有任何非數值欄位即為標題列
+        return sep, any(not is_number(f) for f in first)
+    try:
+        return sep, sniffer.has_header(sample)
+    except csv.Error:
+        return sep, True
+
+
+def read_any(path, sep=None, header=None):
+    """
+    :param sep: 文字檔的分隔符，None 時自動判斷
+    :param header: 文字檔是否有標題列，None 時自動判斷
+    :return: (DataFrame, 是否有標題列)；沒有標題列時欄位名稱為 0、1…
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in TEXT_EXTENSIONS:
+        if sep is None or header is None:
+            sep, sniffed_header = sniff_text(path, sep)
+            header = sniffed_header if header is None else header
+        # 多字元的分隔符（regex）只有 python engine 支援
+        engine = 'c' if len(sep) == 1 or sep == r'\s+' else 'python'
+        return pd.read_csv(path, sep=sep, header=0 if header else None, engine=engine), header
+    if ext in ('.h5', '.hdf5'):
+        return load_frame(path, mmap=False), True
+    return read_table(path, columnar=False), True
+
+
+def output_path(path, output_folder, fmt, compression=None):
+    base = os.path.join(output_folder, os.path.splitext(os.path.basename(path))[0])
+    return base + OUTPUT_FORMATS[fmt] + (CSV_COMPRESSIONS[compression] if fmt == 'csv' else '')
+
+
+def write_output(df, path_base, fmt, header=True, float_format=None, compression=None, dtype=None):
+    """
+    :param dtype: npy / hdf5 / parquet 數值欄位的型別，None 為 float64（parquet 保持原型別）
+    :return: 寫出的檔案路徑
+    """
+    if fmt in ('csv', 'xlsx'):
+        return write_table(df, path_base, fmt, float_format, compression, header)
+    if fmt == 'parquet':
+        df = downcast(df.copy(), dtype) if dtype is not None else df
+        df.columns = [str(c) for c in df.columns]
+        path = path_base + FORMATS['parquet']
+        df.to_parquet(path, compression='zstd', index=False)
+        return path
+    if fmt in ('npy', 'hdf5'):
+        df = df.copy()
+        df.columns = [str(c) for c in df.columns]
+        return save_frame(df, path_base, fmt, dtype=dtype or np.float64)
+    raise ValueError(f"不支援的輸出格式：{fmt}")
+
+
+def convert_files(paths, output_folder, formats, sep=None, header=None, float_format=None, compression=None,
+                  dtype=None, prefetch=DEFAULT_PREFETCH, on_result=None):
+    """
+    :param output_folder: 輸出資料夾，None 時輸出到輸入檔所在的資料夾
+    :param formats: 輸出格式 list，例如 ['csv', 'xlsx']
+    :param prefetch: 讀取執行緒最多先讀好幾個檔案
+    :param on_result: on_result(ConversionResult)，依檔案順序呼叫
+    :return: 處理量摘要（conversion_runner.summarize）
+    """
+    paths = list(paths)
+    frames = queue.Queue(maxsize=max(prefetch, 1))
+    stop = threading.Event()
+
+    def produce():
+        for path in paths:
+            if stop.is_set():
+                break
+            start = time.perf_counter()
+            try:
+                item = (path, read_any(path, sep, header), None, time.perf_counter() - start)
+            except Exception as e:
+                item = (path, None, f"{type(e).__name__}: {e}", time.perf_counter() - start)
+            frames.put(item)
+        frames.put(None)
+
+    reader = threading.Thread(target=produce, daemon=True)
+    t0 = time.perf_counter()
+    reader.start()
+    results = []
+    try:
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            path, frame, error, read_seconds = item
+            start = time.perf_counter()
+            messages = []
+            if error is None:
+                df, has_header = frame
+                folder = output_folder or os.path.dirname(path)
+                for fmt in formats:
+                    target = output_path(path, folder, fmt, compression)
+                    if os.path.abspath(target) == os.path.abspath(path):
+                        messages.append(f"Skipped {os.path.basename(path)} -> {fmt} (same file)")
+                        continue
+                    try:
+                        base = os.path.join(folder, os.path.splitext(os.path.basename(path))[0])
+                        written = write_output(df, base, fmt, has_header, float_format, compression, dtype)
+                        messages.append(f"Converted {os.path.basename(path)} -> {os.path.basename(written)}")
+                    except Exception as e:
+                        error = f"{fmt}: {type(e).__name__}: {e}"
+                del df, frame
+            result = ConversionResult(path, messages, error, read_seconds + time.perf_counter() - start, file_size(path))
+            results.append(result)
+            if on_result:
+                on_result(result)
+    finally:
+        # 中途發生例外時讓讀取執行緒停止，並取出 queue 中的資料讓它結束
+        stop.set()
+        while reader.is_alive():
+            try:
+                frames.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    return summarize(results, time.perf_counter() - t0)
+
+
+def find_inputs(folder, extensions=INPUT_EXTENSIONS, log=None):
+    return list_data_files(folder, extensions, full_path=True, log=log)
+
+
+def parse_sep(text):
+    # 介面 / 命令列輸入的分隔符："auto" 或留白為自動判斷，支援 \t 等跳脫字元
+    if not text or text == 'auto':
+        return None
+    return text.encode('utf-8').decode('unicode_escape')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert every table in a folder between CSV, TXT, Excel, Parquet, NPY and HDF5.")
+    parser.add_argument("input", help="input folder")
+    parser.add_argument("output", help="output folder")
+    parser.add_argument("--to", nargs="+", choices=list(OUTPUT_FORMATS), required=True, help="output formats")
+    parser.add_argument("--sep", default="auto", help="separator of text inputs, e.g. '\\t'; auto-detected by default")
+    parser.add_argument("--header", choices=["auto", "yes", "no"], default="auto", help="whether text inputs have a header row")
+    parser.add_argument("--float-format", default="", help="significant digits (e.g. 6) or printf format (e.g. %%.4f)")
+    parser.add_argument("--compression", choices=[c for c in CSV_COMPRESSIONS if c], help="compress CSV output")
+    parser.add_argument("--float32", action="store_true", help="store NPY/HDF5/Parquet values as float32")
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH, help="files read ahead of the writer")
+    args = parser.parse_args()
+
+    header = {"auto": None, "yes": True, "no": False}[args.header]
+    os.makedirs(args.output, exist_ok=True)
+
+    def report(result):
+        for message in result.messages:
+            print(message)
+        if result.error:
+            print(f"Error {os.path.basename(result.path)}: {result.error}")
+
+    summary = convert_files(find_inputs(args.input, log=print), args.output, args.to, parse_sep(args.sep), header,
+                            parse_float_format(args.float_format), args.compression,
+                            np.float32 if args.float32 else None, args.prefetch, report)
+    print(format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+串流讀取：檔案比記憶體大時分塊讀取，區塊之間保留下一個視窗需要的樣本（carry-over），
+讓滑動視窗特徵可以逐塊計算。記憶體用量只跟 chunk_rows 與視窗長度有關，與檔案長度無關。
+"""
+import numpy as np
+import pandas as pd
+from segmentation import Segmentation
+from data_loader import find_columnar, columnar_selection
+from signal_readers import reader_for, iter_signals
+from array_store import load_columnar
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def read_chunks(path, columns, chunk_rows=DEFAULT_CHUNK_ROWS, dtype=np.float64):
+    """
+    逐塊讀取指定欄位，每塊回傳 (rows, columns) 陣列，任一欄位有缺值的列捨棄。
+    有欄位式資料時直接從記憶體映射的 .npy 分塊取出；EDF 等格式以樣本範圍分塊讀取；
+    Excel 無法分塊讀取，整個檔案當成一塊。
+    """
+    usecols = lambda c: c in columns
+    found = find_columnar(path)
+    if found and found[1]['format'] == 'npy' and columnar_selection(found[1], usecols) is not None:
+        data = load_columnar(found[0], columnar_selection(found[1], usecols))
+        chunks = (data.iloc[i:i + chunk_rows] for i in range(0, len(data), chunk_rows))
+    elif reader_for(path):
+        chunks = iter_signals(path, usecols, chunk_rows)
+    elif path.endswith(('.xls', '.xlsx')):
+        chunks = [pd.read_excel(path, usecols=usecols)]
+    else:
+        chunks = pd.read_csv(path, usecols=usecols, chunksize=chunk_rows)
+    for df in chunks:
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise KeyError(f"missing columns {missing}")
+        yield df[columns].dropna().to_numpy(dtype=dtype)
+
+
+def stream_segments(chunks, size, step, pad_tail=False, pad_value=0.0):
+    """
+    把逐塊讀入的資料切成滑動視窗，切出的視窗與對整個檔案用 Segmentation(n, size, ...) 相同。
+    :param chunks: 產出 (rows, ...) 陣列的 iterable，例如 read_chunks
+    :return: 產出 (block, segments)；segments 為 block 內視窗的 Segmentation（起點相對於 block）
+    """
+    carry = None
+    offset = 0      # carry[0] 在整個檔案中的位置
+    next_start = 0  # 下一個視窗在整個檔案中的起點
+    covered = 0     # 已產出的視窗涵蓋到的位置
+    for chunk in chunks:
+        block = chunk if carry is None else np.concatenate((carry, chunk))
+        rel = next_start - offset
+        if len(block) - rel >= size:
+            n_windows = (len(block) - rel - size) // step + 1
+            starts = rel + np.arange(n_windows) * step
+            yield block, Segmentation.from_starts(len(block), size, starts, step, pad_value)
+            next_start += n_windows * step
+            covered = next_start - step + size
+        # 下一個視窗起點之前的樣本不會再用到，其餘留給下一塊
+        cut = min(next_start - offset, len(block))
+        carry = block[cut:]
+        offset += cut
+
+    if pad_tail and carry is not None and offset + len(carry) > covered and next_start - offset < len(carry):
+        yield carry, Segmentation.from_starts(len(carry), size, [next_start - offset], step, pad_value)
@@ -5,9 +5,18 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
 from scipy import signal
 import matplotlib.pyplot as plt
+from segmentation import Segmentation
+from data_loader import read_table
+from header_index import HeaderIndex, list_data_files, register_outputs
+from result_cache import ResultCache, code_version
 import smtplib
 from email.message import EmailMessage
 
+# 寫在輸入資料夾中的結果檔，掃描輸入時排除
+SUMMARY_FILE = "Coherence_Summary.xlsx"
+SEGMENT_FILE = "Coherence_PerSegment.xlsx"
+register_outputs(SUMMARY_FILE, SEGMENT_FILE)
+
 class CoherenceAnalysisGUI:
     def __init__(self, master):
         self.master = master
@@ -75,16 +84,14 @@ class CoherenceAnalysisGUI:
         folder = filedialog.askdirectory()
         if folder:
             self.lbl_folder.config(text=folder)
-            files = [f for f in os.listdir(folder) if f.endswith(('.xlsx', '.csv'))]
-            if files:
-                path = os.path.join(folder, files[0])
-                df = pd.read_excel(path) if path.endswith(('xlsx', 'xls')) else pd.read_csv(path)
-                cols = df.columns.tolist()
+            index = HeaderIndex(folder)
+            if index.files:
+                cols = index.columns()
                 for cb in self.combo_cols:
                     cb['values'] = [''] + cols
                     cb.set('')
             else:
-                messagebox.showwarning("No Files", "No Excel or CSV files found.")
+                messagebox.showwarning("No Files", "No supported data files found.")
 
     def log_message(self, msg):
         self.log.insert(tk.END, msg + '\n')
@@ -94,6 +101,33 @@ class CoherenceAnalysisGUI:
         f, Cxy = signal.coherence(X, Y, fs=fs, nperseg=nperseg)
         return f, Cxy, np.mean(Cxy)
 
+    def analyze_file(self, folder, file, selected_cols, fs, use_window, window_size, overlap):
+        """
+        單一檔案的計算結果，可存入結果快取。
+        :return: {"summary": 彙總列, "segments": 逐段結果列, "trend": 逐段同調值}
+        """
+        path = os.path.join(folder, file)
+        df = read_table(path, lambda c: c in selected_cols, log=self.log_message)
+        X = df[selected_cols[0]].dropna().reset_index(drop=True)
+        Y = df[selected_cols[1]].dropna().reset_index(drop=True)
+        length = min(len(X), len(Y))
+        X, Y = X[:length], Y[:length]
+
+        if not use_window:
+            f, Cxy, avg = self.calculate_coherence(X, Y, fs)
+            return {"summary": {"File": file, "Coherence": avg}, "segments": [], "trend": []}
+
+        segmentation = Segmentation(length, window_size, overlap)
+        coh_values = []
+        segs = []
+
+        windows = zip(segmentation.view(X.to_numpy()), segmentation.view(Y.to_numpy()))
+        for i, (seg_x, seg_y) in enumerate(windows):
+            f, Cxy, avg = self.calculate_coherence(seg_x, seg_y, fs)
+            coh_values.append(avg)
+            segs.append({"Segment": f"Segment{i+1}", "Coherence": avg, "File": file})
+        return {"summary": {"File": file, "Mean Coherence": np.mean(coh_values)}, "segments": segs, "trend": coh_values}
+
     def start_processing(self):
         folder = self.lbl_folder.cget("text")
         selected_cols = [cb.get() for cb in self.combo_cols if cb.get()]
@@ -115,40 +149,32 @@ class CoherenceAnalysisGUI:
             self.recipient_email = simpledialog.askstring("Email", "Enter recipient email:")
 
         window_size = int(self.entry_window.get()) if use_window else None
-        overlap_ratio = float(self.entry_overlap.get()) / 100.0 if use_window else 0
-
-        files = [f for f in os.listdir(folder) if f.endswith(('.xlsx', '.csv'))]
+        overlap = float(self.entry_overlap.get()) if use_window else 0
+
+        files = list_data_files(folder, log=self.log_message)
+        # 先用標題索引找出缺少欄位的檔案，不必逐檔讀取才發現
+        missing = HeaderIndex(folder).missing(selected_cols)
+        for name, lacking in missing.items():
+            self.log_message(f"{name}: missing selected columns {lacking}")
+        files = [f for f in files if f not in missing]
         summary_results = []
         segment_results = {}
 
+        params = {"columns": selected_cols, "fs": fs, "window": use_window, "window_size": window_size, "overlap": overlap}
+        cache = ResultCache(folder, "coherence", params, code_version(__file__))
+
         for file in files:
             try:
-                path = os.path.join(folder, file)
-                df = pd.read_excel(path) if path.endswith(('xlsx', 'xls')) else pd.read_csv(path)
-                X = df[selected_cols[0]].dropna().reset_index(drop=True)
-                Y = df[selected_cols[1]].dropna().reset_index(drop=True)
-                length = min(len(X), len(Y))
-                X, Y = X[:length], Y[:length]
+                result = cache.cached(os.path.join(folder, file), lambda: self.analyze_file(
+                    folder, file, selected_cols, fs, use_window, window_size, overlap))
+                summary_results.append(result["summary"])
 
                 if use_window:
-                    step = int(window_size * (1 - overlap_ratio))
-                    num_segments = (length - window_size) // step + 1
-                    coh_values = []
-                    segs = []
-
-                    for i in range(num_segments):
-                        s, e = i * step, i * step + window_size
-                        if e > length: break
-                        f, Cxy, avg = self.calculate_coherence(X[s:e], Y[s:e], fs)
-                        coh_values.append(avg)
-                        segs.append({"Segment": f"Segment{i+1}", "Coherence": avg, "File": file})
-
-                    summary_results.append({"File": file, "Mean Coherence": np.mean(coh_values)})
                     if export_segment:
-                        segment_results[file] = segs
+                        segment_results[file] = result["segments"]
                     if plot_segment:
                         plt.figure()
-                        plt.plot(coh_values, marker='o')
+                        plt.plot(result["trend"], marker='o')
                         plt.title(f"{file} - Segment Coherence")
                         plt.xlabel("Segment")
                         plt.ylabel("Coherence")
@@ -156,22 +182,19 @@ class CoherenceAnalysisGUI:
                         plt.tight_layout()
                         plt.show()
 
-                else:
-                    f, Cxy, avg = self.calculate_coherence(X, Y, fs)
-                    summary_results.append({"File": file, "Coherence": avg})
-
                 self.log_message(f"Processed {file}")
 
             except Exception as e:
                 self.log_message(f"Error {file}: {e}")
+        self.log_message(f"Result cache: {cache.summary()}")
 
         # Summary output
-        summary_path = os.path.join(folder, "Coherence_Summary.xlsx")
+        summary_path = os.path.join(folder, SUMMARY_FILE)
         pd.DataFrame(summary_results).to_excel(summary_path, index=False)
 
         # Segment output
         if export_segment and segment_results:
-            seg_path = os.path.join(folder, "Coherence_PerSegment.xlsx")
+            seg_path = os.path.join(folder, SEGMENT_FILE)
             with pd.ExcelWriter(seg_path, engine='openpyxl') as writer:
                 for file, rows in segment_results.items():
                     df_seg = pd.DataFrame(rows)
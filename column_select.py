@@ -0,0 +1,40 @@
+import re
+import pandas as pd
+
+
+def is_number(field):
+    """
+    文字欄位是否為數值，用來判斷第一列是標題列還是資料。
+    """
+    try:
+        float(field)
+        return True
+    except ValueError:
+        return False
+
+
+def column_name(value):
+    """
+    Excel 標題儲存格的值轉成欄位名稱字串，與 CSV 相同；整數值的數字不帶小數點（1.0 -> "1"）。
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def match_columns(columns, pattern=None):
+    """
+    以正規表示式篩選欄位名稱（re.search），pattern 為空時回傳全部欄位。
+    """
+    if not pattern:
+        return list(columns)
+    regex = re.compile(pattern)
+    return [c for c in columns if regex.search(str(c))]
+
+
+def numeric_columns(df, pattern=None):
+    """
+    取出 DataFrame 中所有數值欄位，可再以正規表示式篩選。
+    """
+    numeric = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    return match_columns(numeric, pattern)
@@ -0,0 +1,54 @@
+"""
+把 CSV / Excel 紀錄轉成欄位式格式（只需轉一次），之後各分析工具透過 data_loader 自動改讀轉換後的資料。
+每個檔案輸出到旁邊的 <檔名>.columnar 資料夾，來源檔修改後會自動視為過期並改讀原始檔。
+
+命令列：python columnar_convert.py 資料夾 [--format npy|parquet] [--fs 500] [--units uV] [--force]
+"""
+import os
+import argparse
+from array_store import COLUMNAR_FORMATS, columnar_path, write_columnar
+from data_loader import read_table, find_columnar
+from header_index import list_data_files
+
+
+def convert_file(path, fmt='npy', fs=None, units=None, force=False, log=print):
+    """
+    :return: 輸出資料夾；已有未過期的轉換結果且 force=False 時不重新轉換
+    """
+    folder = columnar_path(path)
+    if not force and find_columnar(path):
+        log(f"Up to date: {os.path.basename(folder)}")
+        return folder
+    df = read_table(path, columnar=False, log=log)
+    meta = write_columnar(df, folder, fmt, fs, units, source=path)
+    if meta['skipped']:
+        log(f"{os.path.basename(path)}: non-numeric columns not converted {meta['skipped']}")
+    log(f"Converted {os.path.basename(path)} -> {os.path.basename(folder)}")
+    return folder
+
+
+def convert_folder(folder, fmt='npy', fs=None, units=None, force=False, log=print):
+    # 與分析工具相同的掃描：不轉換工具自己的結果檔與 Excel 暫存檔
+    files = list_data_files(folder, ('.csv', '.xls', '.xlsx'), log=log)
+    outputs = []
+    for file in files:
+        try:
+            outputs.append(convert_file(os.path.join(folder, file), fmt, fs, units, force, log))
+        except Exception as e:
+            log(f"Error {file}: {e}")
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert CSV/Excel recordings to a memory-mappable columnar format.")
+    parser.add_argument("folder", help="folder of CSV/Excel recordings")
+    parser.add_argument("--format", choices=COLUMNAR_FORMATS, default='npy')
+    parser.add_argument("--fs", type=float, help="sampling rate stored in the sidecar")
+    parser.add_argument("--units", help="physical unit of the channels, e.g. uV")
+    parser.add_argument("--force", action="store_true", help="convert again even if up to date")
+    args = parser.parse_args()
+    convert_folder(args.folder, args.format, args.fs, args.units, args.force)
+
+
+if __name__ == "__main__":
+    main()
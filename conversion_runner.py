@@ -0,0 +1,124 @@
+"""
+批次轉檔共用的 worker pool：每個檔案在子行程中轉換，錯誤逐檔記錄、不會中斷其他檔案；
+結果依檔案順序經由 queue 交給 Tk 主執行緒顯示，最後回報處理量（files/s、MB/s）。
+
+convert(path, *args) 需為可 pickle 的模組層級函式，回傳要顯示的訊息（字串、list 或 None）。
+"""
+import os
+import time
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# error 為錯誤訊息字串（例外物件不一定能在行程之間傳遞），成功時為 None
+ConversionResult = namedtuple('ConversionResult', 'path messages error seconds size')
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def convert_one(convert, path, args=()):
+    # 在子行程中執行，任何例外都轉成結果裡的錯誤訊息
+    start = time.perf_counter()
+    try:
+        messages = convert(path, *args)
+        error = None
+    except Exception as e:
+        messages = None
+        error = f"{type(e).__name__}: {e}"
+    if isinstance(messages, str):
+        messages = [messages]
+    return ConversionResult(path, list(messages or []), error, time.perf_counter() - start, file_size(path))
+
+
+def run_conversions(convert, paths, args=(), workers=None):
+    """
+    :param workers: 同時轉換的行程數，None 為 CPU 核心數；1 時在目前的行程中依序執行
+    :return: 依 paths 順序產出 ConversionResult
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield convert_one(convert, path, args)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = [pool.submit(convert_one, convert, path, args) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # 子行程異常結束（例如記憶體不足）時 pool 無法再使用，其餘檔案也會記錄為失敗
+                yield ConversionResult(path, [], f"{type(e).__name__}: {e}", 0.0, file_size(path))
+
+
+def summarize(results, seconds):
+    """
+    :return: {'files', 'failed', 'seconds', 'bytes', 'files_per_s', 'mb_per_s'}
+    """
+    total_bytes = sum(r.size for r in results)
+    return {
+        'files': len(results),
+        'failed': sum(r.error is not None for r in results),
+        'seconds': seconds,
+        'bytes': total_bytes,
+        'files_per_s': len(results) / seconds if seconds > 0 else 0.0,
+        'mb_per_s': total_bytes / 1e6 / seconds if seconds > 0 else 0.0,
+    }
+
+
+def format_summary(summary):
+    return (f"{summary['files']} files ({summary['failed']} failed) in {summary['seconds']:.1f}s: "
+            f"{summary['files_per_s']:.2f} files/s, {summary['mb_per_s']:.1f} MB/s")
+
+
+class BackgroundConversion:
+    """
+    在背景執行緒中執行 run_conversions，結果放進 queue，由 Tk 主執行緒以 after() 定期取出，
+    介面不會凍結，也不會從背景執行緒直接操作元件。
+    :param widget: 任一 Tk 元件，用來排程 after()
+    :param on_result: on_result(ConversionResult)，依檔案順序呼叫
+    :param on_done: on_done(summary)，全部完成後呼叫
+    """
+
+    def __init__(self, widget, convert, paths, args=(), workers=None, on_result=None, on_done=None, interval=100):
+        self.widget = widget
+        self.on_result = on_result
+        self.on_done = on_done
+        self.interval = interval
+        self.queue = queue.Queue()
+        threading.Thread(target=self.run, args=(convert, list(paths), args, workers), daemon=True).start()
+        widget.after(interval, self.poll)
+
+    def run(self, convert, paths, args, workers):
+        start = time.perf_counter()
+        results = []
+        try:
+            for result in run_conversions(convert, paths, args, workers):
+                results.append(result)
+                self.queue.put(('result', result))
+        except Exception as e:
+            # 無法建立 worker pool 等整批失敗的情況
+            self.queue.put(('result', ConversionResult('', [], f"{type(e).__name__}: {e}", 0.0, 0)))
+        finally:
+            self.queue.put(('done', summarize(results, time.perf_counter() - start)))
+
+    def poll(self):
+        while True:
+            try:
+                kind, value = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'result':
+                if self.on_result:
+                    self.on_result(value)
+            else:
+                if self.on_done:
+                    self.on_done(value)
+                return
+        self.widget.after(self.interval, self.poll)
@@ -5,9 +5,18 @@ from tkinter import filedialog, messagebox, ttk, scrolledtext, simpledialog
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from segmentation import Segmentation
+from data_loader import read_table
+from header_index import HeaderIndex, list_data_files, register_outputs
+from result_cache import ResultCache, code_version
 import smtplib
 from email.message import EmailMessage
 
+# 寫在輸入資料夾中的結果檔，掃描輸入時排除
+AVG_FILE = "Pearson_Avg.xlsx"
+SEGMENT_FILE = "Pearson_PerSegment.xlsx"
+register_outputs(AVG_FILE, SEGMENT_FILE)
+
 class PearsonApp:
     def __init__(self, master):
         self.master = master
@@ -100,14 +109,13 @@ class PearsonApp:
         if not os.path.isdir(folder):
             messagebox.showerror("Invalid folder", "Please select a valid folder first.")
             return
-        files = [f for f in os.listdir(folder) if f.lower().endswith((".xls", ".xlsx", ".csv"))]
+        index = HeaderIndex(folder)
+        files = index.files
         if not files:
-            messagebox.showwarning("No files found", "No Excel/CSV files in the folder.")
+            messagebox.showwarning("No files found", "No supported data files in the folder.")
             return
         try:
-            path = os.path.join(folder, files[0])
-            df = pd.read_excel(path) if path.endswith(('.xls', '.xlsx')) else pd.read_csv(path)
-            cols = [''] + list(df.columns.str.strip())
+            cols = [''] + [c.strip() for c in index.columns()]
             self.combo_col_x['values'] = cols
             self.combo_col_y['values'] = cols
             self.combo_col_x.set('')
@@ -139,8 +147,76 @@ class PearsonApp:
         else:
             raise ValueError("X 與 Y 的長度不相等")
 
+    def analyze_file(self, file, col_x, col_y, use_window, window_size, overlap, per_segment):
+        """
+        單一檔案的計算結果，可存入結果快取。
+        :return: {"avg": 平均結果列或 None, "segments": 逐段結果列, "trend": 逐段相關係數, "messages": 紀錄訊息}
+        """
+        basename = os.path.basename(file)
+        result = {"avg": None, "segments": [], "trend": [], "messages": []}
+        col_x_upper = col_x.strip().upper()
+        col_y_upper = col_y.strip().upper()
+        df = read_table(file, lambda c: c.strip().upper() in (col_x_upper, col_y_upper), log=self.log_message)
+        df.columns = df.columns.str.strip().str.upper()
+
+        if col_x_upper not in df.columns or col_y_upper not in df.columns:
+            result["messages"].append(f"{basename}: missing selected columns.")
+            return result
+
+        X = df[col_x_upper].dropna().reset_index(drop=True)
+        Y = df[col_y_upper].dropna().reset_index(drop=True)
+        min_len = min(len(X), len(Y))
+        if min_len < 1:
+            result["messages"].append(f"{basename}: not enough data.")
+            return result
+
+        X = X[:min_len]
+        Y = Y[:min_len]
+
+        if use_window:
+            segmentation = Segmentation(min_len, window_size, overlap)
+            num_segments = len(segmentation)
+            segment_corrs = result["trend"]
+
+            windows = zip(segmentation.view(X.to_numpy()), segmentation.view(Y.to_numpy()))
+            for i, (segment_X, segment_Y) in enumerate(windows):
+                try:
+                    corr = self.pearson_correlation(segment_X, segment_Y)
+                    segment_corrs.append(corr)
+                    if per_segment:
+                        result["segments"].append({
+                            "File": basename,
+                            "Segment": f"Segment{i+1}",
+                            f"Pearson({col_x},{col_y})": corr
+                        })
+                except Exception as e:
+                    result["messages"].append(f"{basename} 段落 {i+1} 發生錯誤: {e}")
+
+            if segment_corrs:
+                avg_corr = np.mean(segment_corrs)
+                result["avg"] = {
+                    "檔名": basename,
+                    f"Avg Pearson({col_x},{col_y})": avg_corr
+                }
+                result["messages"].append(f"{basename}: {num_segments} 段落，平均相關係數={avg_corr:.4f}")
+            else:
+                result["messages"].append(f"{basename}: 無有效段落")
+        else:
+            corr = self.pearson_correlation(X, Y)
+            result["avg"] = {
+                "檔名": basename,
+                f"Pearson({col_x},{col_y})": corr
+            }
+            result["messages"].append(f"Processed: {basename}")
+        return result
+
     def process_files(self, folder, col_x, col_y):
-        files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(('.xlsx', '.csv'))]
+        files = list_data_files(folder, full_path=True, log=self.log_message)
+        # 先用標題索引找出缺少欄位的檔案，不必逐檔讀取才發現
+        missing = HeaderIndex(folder).missing([col_x, col_y], key=lambda c: c.strip().upper())
+        for name, lacking in missing.items():
+            self.log_message(f"{name}: missing selected columns {lacking}")
+        files = [f for f in files if os.path.basename(f) not in missing]
         self.progress['maximum'] = len(files)
         self.progress['value'] = 0
 
@@ -155,98 +231,53 @@ class PearsonApp:
         if use_window:
             try:
                 window_size = int(self.entry_window_size.get())
-                overlap = float(self.entry_overlap.get()) / 100.0
-                if not (0 <= overlap < 1):
+                overlap = float(self.entry_overlap.get())
+                if not (0 <= overlap < 100):
                     raise ValueError("Overlap 必須介於 0 到 100% 之間")
             except Exception as e:
                 self.log_message(f"參數錯誤: {e}")
                 return
 
+        else:
+            window_size = overlap = None
+
+        params = {"x": col_x, "y": col_y, "window": use_window, "window_size": window_size,
+                  "overlap": overlap, "per_segment": per_segment}
+        cache = ResultCache(folder, "pearson", params, code_version(__file__))
+
         for file in files:
             basename = os.path.basename(file)
             try:
-                df = pd.read_excel(file) if file.endswith(('.xls', '.xlsx')) else pd.read_csv(file)
-                df.columns = df.columns.str.strip().str.upper()
-                col_x_upper = col_x.strip().upper()
-                col_y_upper = col_y.strip().upper()
-
-                if col_x_upper not in df.columns or col_y_upper not in df.columns:
-                    self.log_message(f"{basename}: missing selected columns.")
-                    continue
-
-                X = df[col_x_upper].dropna().reset_index(drop=True)
-                Y = df[col_y_upper].dropna().reset_index(drop=True)
-                min_len = min(len(X), len(Y))
-                if min_len < 1:
-                    self.log_message(f"{basename}: not enough data.")
-                    continue
-
-                X = X[:min_len]
-                Y = Y[:min_len]
-
-                if use_window:
-                    step = int(window_size * (1 - overlap))
-                    num_segments = (min_len - window_size) // step + 1
-                    segment_corrs = []
-
-                    for i in range(num_segments):
-                        start = i * step
-                        end = start + window_size
-                        if end > min_len:
-                            break
-                        segment_X = X[start:end]
-                        segment_Y = Y[start:end]
-                        try:
-                            corr = self.pearson_correlation(segment_X, segment_Y)
-                            segment_corrs.append(corr)
-                            if per_segment:
-                                segment_results.append({
-                                    "File": basename,
-                                    "Segment": f"Segment{i+1}",
-                                    f"Pearson({col_x},{col_y})": corr
-                                })
-                        except Exception as e:
-                            self.log_message(f"{basename} 段落 {i+1} 發生錯誤: {e}")
-
-                    if segment_corrs:
-                        avg_corr = np.mean(segment_corrs)
-                        avg_results.append({
-                            "檔名": basename,
-                            f"Avg Pearson({col_x},{col_y})": avg_corr
-                        })
-                        self.log_message(f"{basename}: {num_segments} 段落，平均相關係數={avg_corr:.4f}")
-
-                        if plot_result:
-                            plt.figure()
-                            plt.plot(segment_corrs, marker='o')
-                            plt.title(f"{basename} - Pearson Correlation (Segments)")
-                            plt.xlabel("Segment Index")
-                            plt.ylabel("Correlation")
-                            plt.grid(True)
-                            plt.show()
-
-                    else:
-                        self.log_message(f"{basename}: 無有效段落")
-                else:
-                    corr = self.pearson_correlation(X, Y)
-                    avg_results.append({
-                        "檔名": basename,
-                        f"Pearson({col_x},{col_y})": corr
-                    })
-                    self.log_message(f"Processed: {basename}")
+                result = cache.cached(file, lambda: self.analyze_file(
+                    file, col_x, col_y, use_window, window_size, overlap, per_segment))
+                for msg in result["messages"]:
+                    self.log_message(msg)
+                if result["avg"]:
+                    avg_results.append(result["avg"])
+                segment_results.extend(result["segments"])
+
+                if plot_result and result["trend"]:
+                    plt.figure()
+                    plt.plot(result["trend"], marker='o')
+                    plt.title(f"{basename} - Pearson Correlation (Segments)")
+                    plt.xlabel("Segment Index")
+                    plt.ylabel("Correlation")
+                    plt.grid(True)
+                    plt.show()
 
             except Exception as e:
                 self.log_message(f"Error {basename}: {e}")
             self.progress['value'] += 1
+        self.log_message(f"Result cache: {cache.summary()}")
 
         # 寫入 Excel
         if avg_results:
             avg_df = pd.DataFrame(avg_results)
-            avg_path = os.path.join(folder, "Pearson_Avg.xlsx")
+            avg_path = os.path.join(folder, AVG_FILE)
             avg_df.to_excel(avg_path, index=False)
 
         if segment_results:
-            seg_path = os.path.join(folder, "Pearson_PerSegment.xlsx")
+            seg_path = os.path.join(folder, SEGMENT_FILE)
             with pd.ExcelWriter(seg_path, engine='openpyxl') as writer:
                 files_grouped = {}
                 for row in segment_results:
@@ -1,18 +1,22 @@
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import pandas as pd
+from table_writer import CSV_COMPRESSIONS, parse_float_format
+from bulk_convert import convert_files, find_inputs
+from conversion_runner import format_summary
 
 class FileConverterApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("CSV ↔ Excel Batch Converter")
-        self.geometry("600x400")
+        self.geometry("600x460")
         self.configure(bg="#f4f4f4")
 
         self.input_path = tk.StringVar()
         self.output_folder = tk.StringVar()
         self.output_format = tk.StringVar(value="both")
+        self.float_format = tk.StringVar(value="")
+        self.compression = tk.StringVar(value="none")
 
         self.create_widgets()
 
@@ -36,6 +40,14 @@ class FileConverterApp(tk.Tk):
         tk.Radiobutton(formats_frame, text="Excel", variable=self.output_format, value="excel", bg="#f4f4f4").pack(side=tk.LEFT, padx=10)
         tk.Radiobutton(formats_frame, text="Both", variable=self.output_format, value="both", bg="#f4f4f4").pack(side=tk.LEFT, padx=10)
 
+        options_frame = tk.Frame(self, bg="#f4f4f4")
+        options_frame.pack(pady=5)
+        tk.Label(options_frame, text="Float format (e.g. 6 or %.4f, blank = full):", bg="#f4f4f4").pack(side=tk.LEFT)
+        tk.Entry(options_frame, textvariable=self.float_format, width=8).pack(side=tk.LEFT, padx=5)
+        tk.Label(options_frame, text="CSV compression:", bg="#f4f4f4").pack(side=tk.LEFT)
+        ttk.Combobox(options_frame, textvariable=self.compression, state="readonly", width=6,
+                     values=["none"] + [c for c in CSV_COMPRESSIONS if c]).pack(side=tk.LEFT)
+
         tk.Button(self, text="Start Conversion", command=self.convert_files, bg="#2196F3", fg="white", font=("Arial", 12)).pack(pady=20)
 
         self.progress = ttk.Progressbar(self, orient="horizontal", length=500, mode="determinate")
@@ -62,34 +74,33 @@ class FileConverterApp(tk.Tk):
         if not input_path or not output_folder:
             messagebox.showerror("Error", "Please select both input and output folders.")
             return
+        try:
+            float_format = parse_float_format(self.float_format.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        compression = None if self.compression.get() == "none" else self.compression.get()
 
-        file_list = []
-        for file in os.listdir(input_path):
-            if file.endswith(".csv") or file.endswith(".xlsx"):
-                file_list.append(os.path.join(input_path, file))
+        # CSV / TXT 的分隔符與標題列自動判斷；讀取下一個檔案與寫出目前的檔案同時進行
+        file_list = find_inputs(input_path)
+        formats = {"csv": ["csv"], "excel": ["xlsx"], "both": ["xlsx", "csv"]}[fmt]
 
         total_files = len(file_list)
         self.progress["maximum"] = total_files
         self.progress["value"] = 0
 
-        for i, file_path in enumerate(file_list, start=1):
-            try:
-                df = pd.read_csv(file_path) if file_path.endswith(".csv") else pd.read_excel(file_path)
-                base_name = os.path.splitext(os.path.basename(file_path))[0]
-
-                if fmt in ("excel", "both"):
-                    df.to_excel(os.path.join(output_folder, base_name + ".xlsx"), index=False)
-                if fmt in ("csv", "both"):
-                    df.to_csv(os.path.join(output_folder, base_name + ".csv"), index=False)
-
+        def show_result(result):
+            base_name = os.path.splitext(os.path.basename(result.path))[0]
+            if result.error:
+                self.status.config(text=f"Error: {base_name}: {result.error}")
+            else:
                 self.status.config(text=f"Converted: {base_name}")
-            except Exception as e:
-                self.status.config(text=f"Error: {e}")
-
-            self.progress["value"] = i
+            self.progress["value"] += 1
             self.update_idletasks()
 
-        messagebox.showinfo("Done", "All files have been converted.")
+        summary = convert_files(file_list, output_folder, formats, float_format=float_format,
+                                compression=compression, on_result=show_result)
+        messagebox.showinfo("Done", f"All files have been converted.\n{format_summary(summary)}")
 
 if __name__ == "__main__":
     app = FileConverterApp()
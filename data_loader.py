@@ -0,0 +1,156 @@
+"""
+共用的資料讀取：只讀需要的欄位、可轉成 float32，有 pyarrow 時用多執行緒的 CSV 解析，並回報解析時間。
+原始檔旁有未過期的欄位式資料（columnar_convert.py 轉出的 <檔名>.columnar）時，直接讀取該資料，不再解析文字。
+EDF、.set、.eea、.npy、Parquet 等格式由 signal_readers 直接讀取，不需先轉成 CSV。
+"""
+import os
+import time
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from array_store import COLUMNAR_SUFFIX, columnar_path, read_columnar_meta, load_columnar, file_signature
+from signal_readers import reader_for, read_signals
+from column_select import column_name, match_columns, numeric_columns
+
+
+@lru_cache(maxsize=None)
+def has_pyarrow():
+    try:
+        import pyarrow.csv  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def find_columnar(path):
+    """
+    :return: (資料夾, meta)；沒有欄位式資料，或來源檔在轉換後被修改過時回傳 None
+    """
+    folder = path if path.endswith(COLUMNAR_SUFFIX) else columnar_path(path)
+    try:
+        meta = read_columnar_meta(folder)
+    except (OSError, ValueError):
+        return None
+    source = meta.get('source')
+    if source and folder != path:
+        try:
+            if file_signature(path) != {'size': source['size'], 'mtime_ns': source['mtime_ns']}:
+                return None
+        except OSError:
+            return None
+    return folder, meta
+
+
+def columnar_selection(meta, columns):
+    # 要讀的 channel（依檔案中的順序）；欄位式資料缺少任何要求的欄位時回傳 None，改讀原始檔
+    names = [c['name'] for c in meta['channels']]
+    if columns is None:
+        return None if meta.get('skipped') else names
+    if callable(columns):
+        if any(columns(c) for c in meta.get('skipped', [])):
+            return None
+        return [c for c in names if columns(c)]
+    if not set(columns) <= set(names):
+        return None
+    return [c for c in names if c in set(columns)]
+
+
+def resolve_columns(path, columns):
+    # pyarrow engine 不接受 callable 的 usecols，且欄位依 usecols 的順序輸出；
+    # 先只讀標題列換成依檔案順序的欄位名稱，結果與 c engine 相同
+    if columns is None:
+        return None
+    header = pd.read_csv(path, nrows=0).columns
+    if callable(columns):
+        return [c for c in header if columns(c)]
+    if not set(columns) <= set(header):
+        # 缺少的欄位交給 read_csv 回報錯誤
+        return columns
+    return [c for c in header if c in set(columns)]
+
+
+def read_excel(path, columns=None, **kwargs):
+    # pandas 把 Excel 的數字標題讀成 int / float，CSV 與 header_index 的欄位名稱都是字串；
+    # 統一成字串，欄位選擇也以字串比對
+    usecols = None
+    if callable(columns):
+        usecols = lambda c: columns(column_name(c))
+    elif columns is not None:
+        wanted = set(columns)
+        usecols = lambda c: column_name(c) in wanted
+    df = pd.read_excel(path, usecols=usecols, **kwargs)
+    df.columns = [column_name(c) for c in df.columns]
+    if columns is not None and not callable(columns):
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+    return df
+
+
+def downcast(df, dtype):
+    # 只轉換浮點數與整數欄位，時間字串等其他欄位保持原樣
+    numeric = df.select_dtypes(include=[np.floating, np.integer]).columns
+    if len(numeric):
+        df[numeric] = df[numeric].astype(dtype)
+    return df
+
+
+def row_range(start, stop):
+    # 第 start 列到 stop 列（不含，不計標題列）的 read_csv / read_excel 參數
+    if not start and stop is None:
+        return {}
+    return {'skiprows': range(1, start + 1), 'nrows': None if stop is None else max(stop - start, 0)}
+
+
+def read_table(path, columns=None, dtype=None, engine="auto", log=None, columnar=True, start=0, stop=None):
+    """
+    讀取 CSV / Excel，或 signal_readers 支援的格式。
+    :param columns: 要讀的欄位（list 或 callable，與 pandas 的 usecols 相同），None 代表全部
+    :param dtype: 數值欄位要轉成的型別，例如 np.float32；None 保持 pandas 預設
+    :param engine: CSV 解析引擎，"auto" 有 pyarrow 時用 pyarrow，否則用 "c"
+    :param log: 回報解析時間的函式，例如 self.log_message
+    :param columnar: 是否優先讀取欄位式資料
+    :param start: 第一個樣本（資料列）
+    :param stop: 結束樣本（不含），None 代表到檔案結尾
+    :return: DataFrame
+    """
+    t0 = time.perf_counter()
+    found = find_columnar(path) if columnar else None
+    selected = columnar_selection(found[1], columns) if found else None
+    if selected is not None:
+        engine = f"columnar {found[1]['format']}"
+        df = load_columnar(found[0], selected)
+        if start or stop is not None:
+            df = df.iloc[start:stop].reset_index(drop=True)
+    elif reader_for(path):
+        engine = os.path.splitext(path)[1].lower()[1:]
+        df = read_signals(path, columns, start, stop)
+    elif path.lower().endswith(('.xls', '.xlsx')):
+        engine = "openpyxl"
+        df = read_excel(path, columns, **row_range(start, stop))
+    else:
+        if engine == "auto":
+            # pyarrow engine 不支援 skiprows 與 nrows
+            engine = "pyarrow" if has_pyarrow() and not row_range(start, stop) else "c"
+        if engine == "pyarrow":
+            columns = resolve_columns(path, columns)
+        df = pd.read_csv(path, usecols=columns, engine=engine, **row_range(start, stop))
+    if dtype is not None:
+        df = downcast(df, dtype)
+    if log:
+        elapsed = time.perf_counter() - t0
+        log(f"Parsed {os.path.basename(path)}: {len(df)} rows x {df.shape[1]} columns in {elapsed:.3f}s ({engine})")
+    return df
+
+def read_columns(path, columns, all_columns=False, pattern=None, log=None):
+    """
+    依工具的欄位設定讀取：只讀指定的欄位；all_columns 時改讀名稱符合 pattern（regex）的所有數值欄位。
+    :return: (DataFrame, 檔案中有的欄位)
+    """
+    if all_columns:
+        usecols = (lambda c: bool(match_columns([c], pattern))) if pattern else None
+    else:
+        usecols = lambda c: c in columns
+    df = read_table(path, usecols, log=log)
+    file_cols = numeric_columns(df) if all_columns else [c for c in columns if c in df.columns]
+    return df, file_cols
@@ -0,0 +1,358 @@
+"""
+把大量 12 導程 ECG CSV（labeled_output/<分類>/*.csv）打包成一個陣列檔，訓練與特徵計算不必逐一開檔。
+
+打包後的資料夾：
+    records.npy 或 records.h5   形狀 (records, samples, 12)，npy 可直接記憶體映射，h5 以 chunk 壓縮儲存
+    index.parquet               每筆紀錄一列：record（在陣列中的位置）、file、class、path，以及合併進來的標註資料
+    meta.json                   格式、導程順序、樣本數、取樣率，以及略過的檔案與原因
+
+讀取用 ECGDataset：以批次取出 (index 的列, (batch, samples, 12) 陣列)，依序讀取時 npy 為零複製的切片。
+
+命令列：python ecg_dataset.py 來源資料夾 輸出資料夾 [--format npy|hdf5] [--samples 5000] [--fs 500]
+        [--metadata SR.xlsx SB.xlsx ...] [--workers N]
+"""
+import io
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+ECG_LEADS = ('I', 'II', 'III', 'aVR', 'aVL', 'aVF', 'V1', 'V2', 'V3', 'V4', 'V5', 'V6')
+STORE_FORMATS = {'npy': 'records.npy', 'hdf5': 'records.h5'}
+INDEX_FILE = 'index.parquet'
+META_FILE = 'meta.json'
+# HDF5 每個 chunk 的紀錄數，也是寫入時累積的筆數
+HDF5_CHUNK_RECORDS = 16
+# 每次交給行程池解析的檔案數，限制已解析但尚未寫入的紀錄佔用的記憶體
+PARSE_WINDOW = 1024
+
+
+def find_records(folder, extension='.csv'):
+    """
+    :return: [(路徑, 分類)]；子資料夾名稱為分類，直接放在 folder 中的檔案分類為空字串
+    """
+    records = []
+    with os.scandir(folder) as entries:
+        entries = sorted(entries, key=lambda e: e.name)
+    for entry in entries:
+        if entry.is_dir():
+            with os.scandir(entry.path) as files:
+                records.extend((f.path, entry.name) for f in sorted(files, key=lambda f: f.name)
+                               if f.is_file() and f.name.lower().endswith(extension))
+        elif entry.is_file() and entry.name.lower().endswith(extension):
+            records.append((entry.path, ''))
+    return records
+
+
+def read_record(path, dtype=np.float32):
+    """
+    讀取一筆 12 導程紀錄，有標題列時依導程名稱排序，沒有時視為標準順序。
+    :return: ((samples, 12) 陣列, None)，失敗時為 (None, 錯誤訊息)；在子行程中執行，不拋出例外
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        first = raw[:raw.find(b'\n')].decode('utf-8-sig', errors='replace').strip().split(',')
+        try:
+            [float(v) for v in first]
+            has_header = False
+        except ValueError:
+            has_header = True
+        df = pd.read_csv(io.BytesIO(raw), header=0 if has_header else None, dtype=dtype, engine='c')
+        if df.shape[1] != len(ECG_LEADS):
+            return None, f"expected {len(ECG_LEADS)} leads, found {df.shape[1]}"
+        if has_header:
+            missing = [lead for lead in ECG_LEADS if lead not in df.columns]
+            if missing:
+                return None, f"missing leads {missing}"
+            df = df[list(ECG_LEADS)]
+        return df.to_numpy(), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def shrink_npy(path, rows):
+    """
+    把 .npy 第一維縮小為 rows 並截斷檔案。標題依 .npy 規格以空白補齊到原本的長度，資料不需搬移。
+    """
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        size_bytes = 2 if version == (1, 0) else 4
+        header_start = f.tell() + size_bytes
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        data_start = f.tell()
+        new_shape = (rows,) + tuple(shape[1:])
+        header = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran_order, 'shape': new_shape})
+        length = data_start - header_start
+        if len(header) + 1 > length:
+            raise ValueError("new .npy header does not fit")
+        f.seek(header_start)
+        f.write((header.ljust(length - 1) + '\n').encode('latin1'))
+        f.truncate(data_start + int(np.prod(new_shape)) * dtype.itemsize)
+
+
+class _RecordWriter:
+    """
+    依序寫入紀錄。npy 先以檔案數預先配置 open_memmap，結束時縮小到實際筆數；
+    hdf5 的資料集可延伸，每累積 HDF5_CHUNK_RECORDS 筆寫入一次。
+    """
+
+    def __init__(self, path, fmt, capacity, dtype, samples=None):
+        self.path = path
+        self.fmt = fmt
+        self.capacity = capacity
+        self.dtype = dtype
+        self.count = 0
+        self.samples = samples
+        self.array = None
+        self.pending = []
+
+    def open(self, samples):
+        self.samples = samples
+        shape = (self.capacity, samples, len(ECG_LEADS))
+        if self.fmt == 'npy':
+            self.array = np.lib.format.open_memmap(self.path, mode='w+', dtype=self.dtype, shape=shape)
+        else:
+            import h5py
+            self.file = h5py.File(self.path, 'w')
+            # 可延伸的資料集必須分 chunk；沒有任何紀錄時 chunk 大小不能為 0
+            options = dict(maxshape=(None,) + shape[1:], chunks=(HDF5_CHUNK_RECORDS,) + shape[1:],
+                           compression='gzip', compression_opts=4, shuffle=True) if samples else {}
+            self.array = self.file.create_dataset('records', shape=(0,) + shape[1:], dtype=self.dtype, **options)
+            self.array.attrs['leads'] = json.dumps(ECG_LEADS)
+
+    def append(self, record):
+        if self.fmt == 'npy':
+            self.array[self.count] = record
+        else:
+            self.pending.append(record)
+            if len(self.pending) == HDF5_CHUNK_RECORDS:
+                self.flush()
+        self.count += 1
+
+    def flush(self):
+        if self.pending:
+            start = self.array.shape[0]
+            self.array.resize(start + len(self.pending), axis=0)
+            self.array[start:] = np.stack(self.pending)
+            self.pending = []
+
+    def close(self):
+        if self.array is None:
+            # 沒有任何有效的紀錄
+            self.open(self.samples or 0)
+        if self.fmt == 'npy':
+            self.array.flush()
+            self.array = None
+            if self.count < self.capacity:
+                shrink_npy(self.path, self.count)
+        else:
+            self.flush()
+            self.file.close()
+        return self.count
+
+    def abort(self):
+        # 打包失敗時釋放記憶體映射 / 關閉 hdf5 檔，再刪除寫到一半的檔案
+        if self.array is not None and self.fmt != 'npy':
+            self.file.close()
+        self.array = None
+        self.pending = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def read_metadata(paths, file_column='FileName'):
+    """
+    讀取標註清單（Excel / CSV），以 file_column 去掉副檔名後的檔名合併到 index。
+    :return: DataFrame，索引為檔名；沒有清單時為 None
+    """
+    tables = []
+    for path in paths:
+        table = pd.read_csv(path) if path.lower().endswith('.csv') else pd.read_excel(path)
+        tables.append(table)
+    if not tables:
+        return None
+    metadata = pd.concat(tables, ignore_index=True)
+    stems = metadata[file_column].astype(str).str.strip().str.replace(r'\.csv$', '', case=False, regex=True)
+    return metadata.drop(columns=[file_column]).set_index(stems).loc[lambda d: ~d.index.duplicated()]
+
+
+def record_stem(path):
+    # 標註清單中的檔名沒有 12-Lead Labeler 加上的 _labeled
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem[:-len('_labeled')] if stem.endswith('_labeled') else stem
+
+
+def remove_outputs(store_folder):
+    for name in list(STORE_FORMATS.values()) + [INDEX_FILE, META_FILE]:
+        if os.path.exists(os.path.join(store_folder, name)):
+            os.remove(os.path.join(store_folder, name))
+
+
+def pack_dataset(source_folder, store_folder, fmt='npy', samples=None, fs=None, metadata=(),
+                 file_column='FileName', workers=None, dtype=np.float32, log=print):
+    """
+    :param samples: 每筆紀錄的樣本數，None 時以第一筆有效紀錄為準；長度不同的紀錄會略過
+    :param metadata: 要合併進 index 的標註清單路徑，例如 SR.xlsx、SB.xlsx
+    :param workers: 解析 CSV 的行程數，None 為 CPU 核心數
+    :return: meta
+    """
+    if fmt not in STORE_FORMATS:
+        raise ValueError(f"不支援的格式：{fmt}")
+    os.makedirs(store_folder, exist_ok=True)
+    remove_outputs(store_folder)
+
+    records = find_records(source_folder)
+    writer = _RecordWriter(os.path.join(store_folder, STORE_FORMATS[fmt]), fmt, len(records), dtype, samples)
+    try:
+        return _pack(writer, records, source_folder, store_folder, fmt, fs, metadata, file_column, workers, dtype, log)
+    except BaseException:
+        # 中途失敗（含 Ctrl+C）時不留下不完整的資料集
+        writer.abort()
+        remove_outputs(store_folder)
+        raise
+
+
+def _pack(writer, records, source_folder, store_folder, fmt, fs, metadata, file_column, workers, dtype, log):
+    rows = []
+    skipped = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(records), PARSE_WINDOW):
+            window = records[start:start + PARSE_WINDOW]
+            parsed = pool.map(read_record, [path for path, _ in window], [dtype] * len(window), chunksize=16)
+            for (path, class_name), (record, error) in zip(window, parsed):
+                if error is None and writer.samples is not None and len(record) != writer.samples:
+                    error = f"expected {writer.samples} samples, found {len(record)}"
+                if error is not None:
+                    skipped.append({'file': os.path.relpath(path, source_folder), 'reason': error})
+                    continue
+                if writer.array is None:
+                    writer.open(len(record))
+                rows.append({'record': writer.count, 'file': record_stem(path), 'class': class_name,
+                             'path': os.path.relpath(path, source_folder)})
+                writer.append(record)
+                if writer.count % 1000 == 0:
+                    log(f"{writer.count} / {len(records)} records packed")
+    count = writer.close()
+
+    index = pd.DataFrame(rows, columns=['record', 'file', 'class', 'path'])
+    table = read_metadata(metadata, file_column)
+    if table is not None:
+        index = index.join(table, on='file', rsuffix='_label')
+    index.to_parquet(os.path.join(store_folder, INDEX_FILE), compression='zstd', index=False)
+
+    meta = {
+        'format': fmt,
+        'file': STORE_FORMATS[fmt],
+        'records': count,
+        'samples': writer.samples,
+        'leads': list(ECG_LEADS),
+        'dtype': np.dtype(dtype).name,
+        'fs': fs,
+        'skipped': skipped,
+    }
+    with open(os.path.join(store_folder, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    log(f"Packed {count} records ({len(skipped)} skipped) into {store_folder}")
+    return meta
+
+
+class ECGDataset:
+    """
+    讀取 pack_dataset 的輸出。
+    dataset.index 為 index.parquet 的 DataFrame；dataset[i] 回傳 (samples, 12) 陣列。
+    npy 以記憶體映射開啟，依序讀取的批次不會複製資料。
+    """
+
+    def __init__(self, store_folder):
+        with open(os.path.join(store_folder, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.index = pd.read_parquet(os.path.join(store_folder, INDEX_FILE))
+        self.leads = self.meta['leads']
+        self.fs = self.meta['fs']
+        path = os.path.join(store_folder, self.meta['file'])
+        if self.meta['format'] == 'npy':
+            self.file = None
+            self.records = np.load(path, mmap_mode='r')
+        else:
+            import h5py
+            self.file = h5py.File(path, 'r')
+            self.records = self.file['records']
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        return self.records[i]
+
+    def frame(self, i):
+        """
+        :return: 第 i 筆紀錄的 DataFrame，欄位為導程名稱，可直接交給特徵計算函式
+        """
+        return pd.DataFrame(np.asarray(self.records[i]), columns=self.leads)
+
+    def select(self, classes=None):
+        """
+        :param classes: 分類名稱 list，None 代表全部
+        :return: 符合的 index 列
+        """
+        if classes is None:
+            return self.index
+        return self.index[self.index['class'].isin(list(classes))]
+
+    def batches(self, batch_size=256, classes=None, shuffle=False, seed=None):
+        """
+        :param classes: 只讀這些分類
+        :param shuffle: 打亂順序；每個批次內依紀錄位置排序讀取，再還原成打亂後的順序
+        :return: 產出 (index 的列, (batch, samples, 12) 陣列)
+        """
+        selected = self.select(classes)
+        if shuffle:
+            selected = selected.sample(frac=1, random_state=seed)
+        positions = selected['record'].to_numpy()
+        contiguous = not shuffle and classes is None
+        for start in range(0, len(selected), batch_size):
+            rows = selected.iloc[start:start + batch_size]
+            if contiguous:
+                # 依序讀取全部紀錄時為連續的切片
+                yield rows, self.records[start:start + len(rows)]
+                continue
+            wanted = positions[start:start + batch_size]
+            order = np.argsort(wanted, kind='stable')
+            data = self.records[np.sort(wanted)] if self.file is None else self.records[list(np.sort(wanted))]
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(len(order))
+            yield rows, data[inverse]
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack labelled 12-lead ECG CSVs into one array store with a Parquet index.")
+    parser.add_argument("source", help="folder with one sub-folder of CSVs per class (e.g. labeled_output)")
+    parser.add_argument("store", help="output folder")
+    parser.add_argument("--format", choices=list(STORE_FORMATS), default="npy", help="array file format")
+    parser.add_argument("--samples", type=int, help="samples per record; records of other lengths are skipped")
+    parser.add_argument("--fs", type=float, help="sampling rate stored in meta.json")
+    parser.add_argument("--metadata", nargs="*", default=[], help="label lists (Excel/CSV with FileName) merged into the index")
+    parser.add_argument("--workers", type=int, help="processes parsing CSVs (default: CPU count)")
+    args = parser.parse_args()
+    meta = pack_dataset(args.source, args.store, args.format, args.samples, args.fs, args.metadata, workers=args.workers)
+    for item in meta['skipped']:
+        print(f"Skipped {item['file']}: {item['reason']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,27 @@
 import os
 import glob
-import pyedflib
-import pandas as pd
-import numpy as np
 import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext
+from tkinter import filedialog, messagebox, scrolledtext, ttk
+from edf_convert import DEFAULT_CHUNK_RECORDS, convert_edf_file
+from conversion_runner import BackgroundConversion, format_summary
 
-def convert_edf_to_csv(edf_folder, csv_folder, log_widget):
-    edf_paths = glob.glob(os.path.join(edf_folder, '*.edf'))
-    if not edf_paths:
-        messagebox.showwarning("警告", "找不到任何 EDF 檔案。")
-        return
+# 介面選項 -> edf_convert 的 mixed_rates 模式
+MIXED_RATE_OPTIONS = {"依取樣率分組輸出": "group", "重取樣至同一取樣率": "resample"}
 
-    os.makedirs(csv_folder, exist_ok=True)
-
-    for edf_path in edf_paths:
-        try:
-            with pyedflib.EdfReader(edf_path) as edf:
-                n_signals = edf.signals_in_file
-                labels = edf.getSignalLabels()
-                n_samples = edf.getNSamples()[0]
-                data = np.zeros((n_signals, n_samples))
-                for i in range(n_signals):
-                    data[i, :] = edf.readSignal(i)
-
-            df = pd.DataFrame(data.T, columns=labels)
-            base = os.path.splitext(os.path.basename(edf_path))[0]
-            csv_path = os.path.join(csv_folder, f'{base}.csv')
-            df.to_csv(csv_path, index=False)
-            log_widget.insert(tk.END, f'✔ 已儲存：{csv_path}\n')
-            log_widget.see(tk.END)
-        except Exception as e:
-            log_widget.insert(tk.END, f'❌ 錯誤：{edf_path} - {str(e)}\n')
-            log_widget.see(tk.END)
+def log_result(result):
+    # 在 Tk 主執行緒中呼叫；result.messages 為寫出的檔案路徑
+    if result.error is None:
+        for output in result.messages:
+            log_area.insert(tk.END, f'✔ 已儲存：{output}\n')
+    else:
+        log_area.insert(tk.END, f'❌ 錯誤：{result.path} - {result.error}\n')
+    log_area.see(tk.END)
+    progress_bar['value'] += 1
 
+def conversion_done(summary):
+    log_area.insert(tk.END, f'{format_summary(summary)}\n')
+    log_area.see(tk.END)
+    start_button.config(state=tk.NORMAL)
     messagebox.showinfo("完成", "全部轉換完成！")
 
 def browse_edf_folder():
@@ -52,25 +40,59 @@ def start_conversion():
     if not edf_folder or not csv_folder:
         messagebox.showwarning("警告", "請選擇 EDF 資料夾與 CSV 輸出資料夾。")
         return
-    convert_edf_to_csv(edf_folder, csv_folder, log_area)
+    mixed_rates = MIXED_RATE_OPTIONS[mixed_rate_var.get()]
+    try:
+        target_fs = float(target_fs_var.get()) if target_fs_var.get().strip() else None
+    except ValueError:
+        messagebox.showwarning("警告", "目標取樣率必須是數字（留白為最高取樣率）。")
+        return
+    edf_paths = glob.glob(os.path.join(edf_folder, '*.edf'))
+    if not edf_paths:
+        messagebox.showwarning("警告", "找不到任何 EDF 檔案。")
+        return
+
+    os.makedirs(csv_folder, exist_ok=True)
+    start_button.config(state=tk.DISABLED)
+    progress_bar['maximum'] = len(edf_paths)
+    progress_bar['value'] = 0
+    # 各 EDF 檔在子行程中分塊轉換，結果經由 queue 依檔案順序回到主執行緒更新介面，視窗不會凍結
+    args = (csv_folder, columnar_var.get(), DEFAULT_CHUNK_RECORDS, mixed_rates, target_fs)
+    BackgroundConversion(root, convert_edf_file, edf_paths, args, on_result=log_result, on_done=conversion_done)
+
+# GUI 建立（process pool 的子行程會重新載入本檔，介面只在主程式建立）
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("EDF 轉 CSV 工具")
+
+    tk.Label(root, text="EDF 資料夾：").grid(row=0, column=0, sticky="e")
+    edf_folder_var = tk.StringVar()
+    tk.Entry(root, textvariable=edf_folder_var, width=50).grid(row=0, column=1)
+    tk.Button(root, text="瀏覽", command=browse_edf_folder).grid(row=0, column=2)
+
+    tk.Label(root, text="CSV 輸出資料夾：").grid(row=1, column=0, sticky="e")
+    csv_folder_var = tk.StringVar()
+    tk.Entry(root, textvariable=csv_folder_var, width=50).grid(row=1, column=1)
+    tk.Button(root, text="瀏覽", command=browse_csv_folder).grid(row=1, column=2)
 
-# GUI 建立
-root = tk.Tk()
-root.title("EDF 轉 CSV 工具")
+    tk.Label(root, text="不同取樣率：").grid(row=2, column=0, sticky="e")
+    mixed_rate_frame = tk.Frame(root)
+    mixed_rate_frame.grid(row=2, column=1, sticky="w")
+    mixed_rate_var = tk.StringVar(value=next(iter(MIXED_RATE_OPTIONS)))
+    tk.OptionMenu(mixed_rate_frame, mixed_rate_var, *MIXED_RATE_OPTIONS).pack(side="left")
+    tk.Label(mixed_rate_frame, text="目標取樣率 (Hz)：").pack(side="left")
+    target_fs_var = tk.StringVar()
+    tk.Entry(mixed_rate_frame, textvariable=target_fs_var, width=8).pack(side="left")
 
-tk.Label(root, text="EDF 資料夾：").grid(row=0, column=0, sticky="e")
-edf_folder_var = tk.StringVar()
-tk.Entry(root, textvariable=edf_folder_var, width=50).grid(row=0, column=1)
-tk.Button(root, text="瀏覽", command=browse_edf_folder).grid(row=0, column=2)
+    columnar_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="同時輸出 columnar (.npy)", variable=columnar_var).grid(row=3, column=1, sticky="w")
 
-tk.Label(root, text="CSV 輸出資料夾：").grid(row=1, column=0, sticky="e")
-csv_folder_var = tk.StringVar()
-tk.Entry(root, textvariable=csv_folder_var, width=50).grid(row=1, column=1)
-tk.Button(root, text="瀏覽", command=browse_csv_folder).grid(row=1, column=2)
+    start_button = tk.Button(root, text="開始轉換", command=start_conversion, bg="lightblue")
+    start_button.grid(row=4, column=1, pady=10)
 
-tk.Button(root, text="開始轉換", command=start_conversion, bg="lightblue").grid(row=2, column=1, pady=10)
+    progress_bar = ttk.Progressbar(root, mode='determinate', length=400)
+    progress_bar.grid(row=5, column=0, columnspan=3, padx=10)
 
-log_area = scrolledtext.ScrolledText(root, width=70, height=20)
-log_area.grid(row=3, column=0, columnspan=3, padx=10, pady=10)
+    log_area = scrolledtext.ScrolledText(root, width=70, height=20)
+    log_area.grid(row=6, column=0, columnspan=3, padx=10, pady=10)
 
-root.mainloop()
+    root.mainloop()
@@ -0,0 +1,224 @@
+"""
+EDF 轉 CSV：以 data record 為單位分塊讀取，每塊直接寫入輸出檔，記憶體用量只與 chunk_records 有關，
+與紀錄長度無關；多個檔案由 conversion_runner 在子行程中平行轉換。
+
+各 channel 取樣率不同時（例如 PSG 的 EEG 256 Hz、EMG 512 Hz、呼吸 32 Hz）有兩種模式，都只讀一次檔案：
+  group     依取樣率分組，每組輸出一個 <檔名>_<fs>Hz.csv
+  resample  以 polyphase 濾波（scipy.signal.resample_poly）重取樣到同一個取樣率，輸出一個 <檔名>.csv
+"""
+import os
+from fractions import Fraction
+import numpy as np
+import pandas as pd
+from scipy.signal import resample_poly
+from array_store import ColumnarWriter, columnar_path
+from table_writer import csv_path, open_csv, write_csv
+
+# 每塊讀取的 data record 數（EDF 的 data record 通常為 1 秒）
+DEFAULT_CHUNK_RECORDS = 60
+
+MIXED_RATE_MODES = ('group', 'resample')
+
+
+def edf_channels(edf):
+    """
+    :return: [{'index', 'label', 'fs', 'unit', 'samples', 'per_record'}]，
+             samples 為整個檔案的樣本數，per_record 為每個 data record 的樣本數
+    """
+    n_samples = edf.getNSamples()
+    n_records = edf.datarecords_in_file
+    if n_records == 0:
+        # 錄製中斷或檔案被截斷時 header 中沒有任何 data record
+        raise ValueError("EDF 檔沒有任何 data record，檔案可能不完整")
+    return [{'index': i,
+             'label': edf.getSignalLabel(i),
+             'fs': edf.getSampleFrequency(i),
+             'unit': edf.getPhysicalDimension(i),
+             'samples': int(n_samples[i]),
+             'per_record': int(n_samples[i]) // n_records}
+            for i in range(edf.signals_in_file)]
+
+
+def group_by_rate(channels):
+    """
+    :return: {取樣率: [channel]}，依第一次出現的順序
+    """
+    groups = {}
+    for channel in channels:
+        groups.setdefault(channel['fs'], []).append(channel)
+    return groups
+
+
+def iter_edf_chunks(edf, channels, chunk_records=DEFAULT_CHUNK_RECORDS):
+    """
+    逐塊讀取，每塊涵蓋相同的 data record，各 channel 的取樣率可以不同。
+    :return: 產出各 channel 樣本（float64）的 list
+    """
+    n_records = edf.datarecords_in_file
+    for record in range(0, n_records, chunk_records):
+        n = min(chunk_records, n_records - record)
+        yield [edf.readSignal(c['index'], record * c['per_record'], n * c['per_record']) for c in channels]
+
+
+def rate_ratio(fs_in, fs_out):
+    # 化為最簡分數的 (up, down)
+    ratio = Fraction(fs_out).limit_denominator(10 ** 6) / Fraction(fs_in).limit_denominator(10 ** 6)
+    return ratio.numerator, ratio.denominator
+
+
+class StreamResampler:
+    """
+    分塊的 polyphase 重取樣：每次計算時前後多取濾波器長度的樣本，輸出與整段訊號一次
+    resample_poly(x, up, down) 相同，只需保留一小段歷史樣本。
+    每塊的長度需讓輸出為整數個樣本（以 data record 為單位分塊時即成立）。
+    """
+
+    def __init__(self, fs_in, fs_out):
+        self.up, self.down = rate_ratio(fs_in, fs_out)
+        # resample_poly 預設的濾波器半長為 10 * max(up, down)（以升取樣後的樣本計），
+        # 換算成輸入樣本並取 down 的倍數，切點才會對齊整數個輸出樣本
+        half_len = 10 * max(self.up, self.down)
+        context = -(-half_len // self.up) + 1
+        self.context = -(-context // self.down) * self.down
+        self.buffer = np.empty(0)
+        self.buffer_start = 0  # buffer[0] 在整段訊號中的位置
+        self.position = 0      # 已輸出的部分對應到的輸入位置
+
+    def output_length(self, n_in):
+        return -(-n_in * self.up // self.down)
+
+    def process(self, x, final=False):
+        """
+        :param final: 最後一塊，輸出剩餘的所有樣本
+        :return: 目前可以確定的輸出樣本
+        """
+        if self.up == self.down == 1:
+            return x
+        self.buffer = np.concatenate((self.buffer, x))
+        end = self.buffer_start + len(self.buffer)
+        if final:
+            stop = end
+        else:
+            # 右側需保留 context 個樣本，輸出才與整段計算相同
+            stop = self.position + (end - self.context - self.position) // self.down * self.down
+            if stop <= self.position:
+                return np.empty(0)
+        start = max(self.position - self.context, 0)
+        segment = self.buffer[start - self.buffer_start:min(stop + self.context, end) - self.buffer_start]
+        y = resample_poly(segment, self.up, self.down)
+        skip = (self.position - start) * self.up // self.down
+        out = y[skip:skip + self.output_length(stop - self.position)]
+        self.position = stop
+        keep = max(self.position - self.context, 0)
+        self.buffer = self.buffer[keep - self.buffer_start:]
+        self.buffer_start = keep
+        return out
+
+
+class _Output:
+    # 一個輸出檔：CSV（分塊附加）與可選的欄位式資料
+    def __init__(self, path_base, channels, rows, fs, columnar, float_format=None, compression=None):
+        self.csv_path = csv_path(path_base, compression)
+        self.labels = [c['label'] for c in channels]
+        self.float_format = float_format
+        self.columnar = None
+        if columnar:
+            self.columnar = ColumnarWriter(columnar_path(self.csv_path), self.labels, rows, fs=fs,
+                                           units={c['label']: c['unit'] for c in channels})
+        self.file = open_csv(self.csv_path, compression)
+        self.compression = compression
+        self.header = True
+
+    def write(self, block):
+        pd.DataFrame(block, columns=self.labels).to_csv(self.file, header=self.header, index=False,
+                                                        float_format=self.float_format)
+        self.header = False
+        if self.columnar:
+            self.columnar.write(block)
+
+    def close(self):
+        self.file.close()
+        if self.header:
+            # 沒有任何資料時仍寫出標題列
+            write_csv(pd.DataFrame(columns=self.labels), self.csv_path, compression=self.compression)
+        if not self.columnar:
+            return [self.csv_path]
+        self.columnar.close(source=self.csv_path)
+        return [self.csv_path, columnar_path(self.csv_path)]
+
+    def remove(self):
+        # 轉換失敗時刪除寫到一半的 CSV 與欄位式資料，不留下看似完整的檔案
+        self.file.close()
+        if os.path.exists(self.csv_path):
+            os.remove(self.csv_path)
+        if self.columnar:
+            self.columnar.abort()
+
+
+def remove_outputs(outputs):
+    for output in outputs:
+        output.remove()
+
+
+def convert_edf_file(edf_path, out_folder, columnar=False, chunk_records=DEFAULT_CHUNK_RECORDS,
+                     mixed_rates='group', target_fs=None, float_format=None, compression=None):
+    """
+    轉換單一 EDF 檔（可在子行程中執行）。
+    :param columnar: 同時輸出 npy 欄位式資料，分析工具會直接以記憶體映射讀取
+    :param mixed_rates: 取樣率不同時的處理方式，'group' 或 'resample'
+    :param target_fs: resample 模式的目標取樣率，None 為最高的取樣率
+    :param float_format: CSV 的浮點數格式，例如 "%.6g"；None 為完整精度
+    :param compression: CSV 壓縮方式，None、'gzip' 或 'zstd'
+    :return: 寫出的檔案 / 資料夾路徑
+    """
+    import pyedflib
+    if mixed_rates not in MIXED_RATE_MODES:
+        raise ValueError(f"不支援的模式：{mixed_rates}")
+    base = os.path.splitext(os.path.basename(edf_path))[0]
+    with pyedflib.EdfReader(edf_path) as edf:
+        channels = edf_channels(edf)
+        groups = group_by_rate(channels)
+        if mixed_rates == 'resample' and (len(groups) > 1 or target_fs):
+            return _convert_resampled(edf, channels, base, out_folder, columnar, chunk_records,
+                                      target_fs or max(groups), float_format, compression)
+
+        outputs = {}
+        try:
+            for fs, group in groups.items():
+                name = base if len(groups) == 1 else f'{base}_{fs:g}Hz'
+                outputs[fs] = _Output(os.path.join(out_folder, name), group, group[0]['samples'], fs, columnar,
+                                      float_format, compression)
+            columns = {fs: [channels.index(c) for c in group] for fs, group in groups.items()}
+            for signals in iter_edf_chunks(edf, channels, chunk_records):
+                for fs, output in outputs.items():
+                    output.write(np.column_stack([signals[j] for j in columns[fs]]))
+            return [path for output in outputs.values() for path in output.close()]
+        except BaseException:
+            remove_outputs(outputs.values())
+            raise
+
+
+def _convert_resampled(edf, channels, base, out_folder, columnar, chunk_records, target_fs,
+                       float_format=None, compression=None):
+    resamplers = [StreamResampler(c['fs'], target_fs) for c in channels]
+    for channel, resampler in zip(channels, resamplers):
+        if channel['per_record'] * resampler.up % resampler.down:
+            raise ValueError(f"{channel['label']}: {channel['fs']:g} Hz cannot be resampled to {target_fs:g} Hz "
+                             f"with a whole number of samples per data record")
+    rows = resamplers[0].output_length(channels[0]['samples'])
+    output = _Output(os.path.join(out_folder, base), channels, rows, target_fs, columnar, float_format, compression)
+    pending = [np.empty(0) for _ in channels]
+    n_records = edf.datarecords_in_file
+    try:
+        for i, signals in enumerate(iter_edf_chunks(edf, channels, chunk_records)):
+            final = (i + 1) * chunk_records >= n_records
+            pending = [np.concatenate((p, r.process(x, final))) for p, r, x in zip(pending, resamplers, signals)]
+            # 各 channel 的濾波延遲不同，只輸出所有 channel 都已算好的列
+            n = min(len(p) for p in pending)
+            if n:
+                output.write(np.column_stack([p[:n] for p in pending]))
+                pending = [p[n:] for p in pending]
+        return output.close()
+    except BaseException:
+        remove_outputs([output])
+        raise
@@ -1,66 +1,81 @@
 import os
 import glob
+import time
 import pandas as pd
-import numpy as np
 import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext
+from tkinter import filedialog, messagebox, scrolledtext, ttk
+from eea_format import EEA_CHANNELS, EEA_SAMPLES_PER_CHANNEL, channel_names, read_eea
+from table_writer import write_csv, write_excel
+from conversion_runner import BackgroundConversion, run_conversions, summarize, format_summary
 
-def process_eea_file(input_file, output_base_name, output_folder, export_csv=True, export_excel=False, num_channels=16, samples_per_channel=7680):
+def process_eea_file(input_file, output_base_name, output_folder, export_csv=True, export_excel=False,
+                     num_channels=len(EEA_CHANNELS), samples_per_channel=EEA_SAMPLES_PER_CHANNEL, names=None,
+                     float_format=None):
     """
     直接讀取 .eea 檔案並處理資料，輸出重組後的 CSV 或 Excel。
+    :param samples_per_channel: 每個 channel 的樣本數，None 時由總筆數推算
+    :param names: channel 名稱，None 時使用預設的 montage
+    :param float_format: 輸出的浮點數格式，例如 "%.6g"；None 為完整精度
     """
-    data_list = []
-    with open(input_file, 'r', encoding='utf-8') as infile:
-        for line in infile:
-            row_values = line.strip().split(',')
-            row_values = [x for x in row_values if x]
-            data_list.extend(row_values)
-    
-    try:
-        data_array = np.array(data_list, dtype=float)
-    except ValueError:
-        raise ValueError("資料無法轉換為數值，請確認 .eea 檔案內容格式")
-    
-    total_samples = num_channels * samples_per_channel
-    if len(data_array) != total_samples:
-        raise ValueError(f"資料筆數不正確，預期 {total_samples} 筆，但實際讀取 {len(data_array)} 筆")
-    
-    reshaped = np.reshape(data_array, (num_channels, samples_per_channel)).T
-    columns = [
-        "F7", "F3", "F4", "F8",
-        "T3", "C3", "Cz", "C4",
-        "T4", "T5", "P3", "Pz",
-        "P4", "T6", "O1", "O2"
-    ]
-    new_df = pd.DataFrame(reshaped, columns=columns)
+    columns = channel_names(num_channels, names)
+    new_df = pd.DataFrame(read_eea(input_file, num_channels, samples_per_channel), columns=columns)
 
     if export_csv:
-        new_df.to_csv(os.path.join(output_folder, output_base_name + ".csv"), index=False)
+        write_csv(new_df, os.path.join(output_folder, output_base_name + ".csv"), float_format)
     if export_excel:
-        new_df.to_excel(os.path.join(output_folder, output_base_name + ".xlsx"), index=False)
+        write_excel(new_df, os.path.join(output_folder, output_base_name + ".xlsx"), float_format)
+
+def convert_eea_file(eea_file, output_folder, export_csv=True, export_excel=False,
+                     num_channels=len(EEA_CHANNELS), samples_per_channel=EEA_SAMPLES_PER_CHANNEL, names=None,
+                     float_format=None):
+    """
+    worker pool 中轉換單一檔案。
+    :return: 完成訊息
+    """
+    base_name = os.path.splitext(os.path.basename(eea_file))[0]
+    process_eea_file(eea_file, base_name, output_folder, export_csv=export_csv, export_excel=export_excel,
+                     num_channels=num_channels, samples_per_channel=samples_per_channel, names=names,
+                     float_format=float_format)
+    formats = []
+    if export_csv: formats.append("CSV")
+    if export_excel: formats.append("Excel")
+    return f"轉換完成（{'、'.join(formats)}）：\n{eea_file}"
 
-def convert_all_files(input_folder, output_folder, log_callback=None, export_csv=True, export_excel=False):
+def log_result(result, log_callback):
+    # 依檔案順序顯示每個檔案的結果
+    for message in result.messages:
+        log_callback(message)
+    if result.error:
+        log_callback(f"轉換 {result.path} 時發生錯誤：{result.error}\n")
+
+def find_eea_files(input_folder):
+    return sorted(glob.glob(os.path.join(input_folder, "*.eea")))
+
+def convert_all_files(input_folder, output_folder, log_callback=None, export_csv=True, export_excel=False,
+                      num_channels=len(EEA_CHANNELS), samples_per_channel=EEA_SAMPLES_PER_CHANNEL, names=None,
+                      workers=None, float_format=None):
+    """
+    :param workers: 同時轉換的行程數，None 為 CPU 核心數
+    :return: 處理量摘要（conversion_runner.summarize）
+    """
+    log_callback = log_callback or (lambda message: None)
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
     
-    eea_files = glob.glob(os.path.join(input_folder, "*.eea"))
+    eea_files = find_eea_files(input_folder)
     if not eea_files:
-        if log_callback:
-            log_callback(f"在 {input_folder} 中找不到任何 .eea 檔案")
+        log_callback(f"在 {input_folder} 中找不到任何 .eea 檔案")
         return
     
-    for eea_file in eea_files:
-        base_name = os.path.splitext(os.path.basename(eea_file))[0]
-        try:
-            process_eea_file(eea_file, base_name, output_folder, export_csv=export_csv, export_excel=export_excel)
-            if log_callback:
-                formats = []
-                if export_csv: formats.append("CSV")
-                if export_excel: formats.append("Excel")
-                log_callback(f"轉換完成（{'、'.join(formats)}）：\n{eea_file}")
-        except Exception as e:
-            if log_callback:
-                log_callback(f"轉換 {eea_file} 時發生錯誤：{e}\n")
+    start = time.perf_counter()
+    results = []
+    args = (output_folder, export_csv, export_excel, num_channels, samples_per_channel, names, float_format)
+    for result in run_conversions(convert_eea_file, eea_files, args, workers):
+        results.append(result)
+        log_result(result, log_callback)
+    summary = summarize(results, time.perf_counter() - start)
+    log_callback(format_summary(summary))
+    return summary
 
 class App(tk.Tk):
     def __init__(self):
@@ -73,6 +88,12 @@ class App(tk.Tk):
         self.output_folder = tk.StringVar()
         self.export_csv = tk.BooleanVar(value=True)
         self.export_excel = tk.BooleanVar(value=False)
+        self.num_channels = tk.StringVar(value=str(len(EEA_CHANNELS)))
+        self.samples_per_channel = tk.StringVar(value=str(EEA_SAMPLES_PER_CHANNEL))
+        self.channel_names = tk.StringVar(value=",".join(EEA_CHANNELS))
+        self.default_names = self.channel_names.get()
+        self.num_channels.trace_add("write", self.update_default_names)
+        self.workers = tk.StringVar(value=str(os.cpu_count() or 1))
         
         tk.Label(self, text="輸入資料夾 (包含 .eea 檔案):", bg="#f0f0f0", font=("Arial", 12)).pack(pady=5)
         frame_input = tk.Frame(self, bg="#f0f0f0")
@@ -93,7 +114,29 @@ class App(tk.Tk):
         tk.Checkbutton(format_frame, text="CSV", variable=self.export_csv, bg="#f0f0f0", font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
         tk.Checkbutton(format_frame, text="Excel", variable=self.export_excel, bg="#f0f0f0", font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
 
-        tk.Button(self, text="開始轉換", command=self.start_conversion, bg="#2196F3", fg="white", font=("Arial", 12)).pack(pady=15)
+        # 檔案格式設定
+        tk.Label(self, text="檔案格式（每 channel 樣本數留白 = 自動推算）：", bg="#f0f0f0", font=("Arial", 12)).pack(pady=5)
+        layout_frame = tk.Frame(self, bg="#f0f0f0")
+        layout_frame.pack()
+        tk.Label(layout_frame, text="channel 數", bg="#f0f0f0").pack(side=tk.LEFT)
+        tk.Entry(layout_frame, textvariable=self.num_channels, width=5).pack(side=tk.LEFT, padx=5)
+        tk.Label(layout_frame, text="每 channel 樣本數", bg="#f0f0f0").pack(side=tk.LEFT)
+        tk.Entry(layout_frame, textvariable=self.samples_per_channel, width=8).pack(side=tk.LEFT, padx=5)
+        names_frame = tk.Frame(self, bg="#f0f0f0")
+        names_frame.pack()
+        tk.Label(names_frame, text="channel 名稱（逗號分隔）", bg="#f0f0f0").pack(side=tk.LEFT)
+        tk.Entry(names_frame, textvariable=self.channel_names, width=50).pack(side=tk.LEFT, padx=5)
+
+        workers_frame = tk.Frame(self, bg="#f0f0f0")
+        workers_frame.pack()
+        tk.Label(workers_frame, text="同時轉換的檔案數", bg="#f0f0f0").pack(side=tk.LEFT)
+        tk.Entry(workers_frame, textvariable=self.workers, width=5).pack(side=tk.LEFT, padx=5)
+
+        self.start_button = tk.Button(self, text="開始轉換", command=self.start_conversion, bg="#2196F3", fg="white", font=("Arial", 12))
+        self.start_button.pack(pady=15)
+
+        self.progress = ttk.Progressbar(self, mode='determinate', length=500)
+        self.progress.pack()
 
         self.log_text = scrolledtext.ScrolledText(self, width=70, height=12, font=("Arial", 10))
         self.log_text.pack(pady=10)
@@ -102,6 +145,17 @@ class App(tk.Tk):
         self.log_text.insert(tk.END, message + "\n")
         self.log_text.see(tk.END)
     
+    def update_default_names(self, *args):
+        # 名稱欄仍是預設名稱時隨 channel 數重新產生，只改 channel 數不會造成數量不符；自訂的名稱保持不變
+        try:
+            num_channels = int(self.num_channels.get())
+        except ValueError:
+            return
+        if num_channels < 1 or self.channel_names.get() != self.default_names:
+            return
+        self.default_names = ",".join(channel_names(num_channels))
+        self.channel_names.set(self.default_names)
+    
     def browse_input(self):
         folder = filedialog.askdirectory(title="選擇包含 .eea 檔案的資料夾")
         if folder:
@@ -121,15 +175,39 @@ class App(tk.Tk):
         if not self.export_csv.get() and not self.export_excel.get():
             messagebox.showwarning("提醒", "請至少選擇一種輸出格式（CSV 或 Excel）")
             return
+        try:
+            num_channels = int(self.num_channels.get())
+            samples = self.samples_per_channel.get().strip()
+            samples_per_channel = int(samples) if samples else None
+            names = [n.strip() for n in self.channel_names.get().split(",") if n.strip()] or None
+            channel_names(num_channels, names)
+            workers = int(self.workers.get())
+        except ValueError as e:
+            messagebox.showerror("錯誤", f"檔案格式設定有誤：{e}")
+            return
+
+        eea_files = find_eea_files(input_folder)
+        if not eea_files:
+            self.log(f"在 {input_folder} 中找不到任何 .eea 檔案")
+            return
+        os.makedirs(output_folder, exist_ok=True)
         self.log("開始轉換...")
-        convert_all_files(
-            input_folder,
-            output_folder,
-            log_callback=self.log,
-            export_csv=self.export_csv.get(),
-            export_excel=self.export_excel.get()
-        )
+        self.start_button.config(state=tk.DISABLED)
+        self.progress["maximum"] = len(eea_files)
+        self.progress["value"] = 0
+        args = (output_folder, self.export_csv.get(), self.export_excel.get(), num_channels, samples_per_channel, names)
+        # 轉換在子行程中進行，結果經由 queue 依檔案順序回到介面
+        BackgroundConversion(self, convert_eea_file, eea_files, args, workers,
+                             on_result=self.on_result, on_done=self.on_done)
+
+    def on_result(self, result):
+        log_result(result, self.log)
+        self.progress["value"] += 1
+
+    def on_done(self, summary):
+        self.log(format_summary(summary))
         self.log("全部轉換完成！")
+        self.start_button.config(state=tk.NORMAL)
 
 def main():
     app = App()
@@ -0,0 +1,79 @@
+"""
+.eea 檔案格式：以逗號分隔的數值，依序為每個 channel 的全部樣本（channel-major），
+預設為 16 channel、每個 channel 7680 個樣本。
+
+解析時先把逗號與空白都換成換行（空欄位變成空行、直接略過），整個檔案一次交給
+pyarrow 的多執行緒 CSV 解析；沒有 pyarrow 時用 np.fromstring，不再逐行建立字串 list。
+"""
+import io
+import warnings
+import numpy as np
+
+EEA_CHANNELS = (
+    "F7", "F3", "F4", "F8",
+    "T3", "C3", "Cz", "C4",
+    "T4", "T5", "P3", "Pz",
+    "P4", "T6", "O1", "O2",
+)
+EEA_SAMPLES_PER_CHANNEL = 7680
+
+# 逗號與空白都視為數值之間的分隔
+_SEPARATORS = bytes.maketrans(b', \t\r', b'\n\n\n\n')
+
+
+def channel_names(num_channels=len(EEA_CHANNELS), names=None):
+    """
+    :param names: 自訂的 channel 名稱；None 時 16 channel 用預設的 montage，其他數量用 Ch1、Ch2…
+    """
+    if names:
+        names = list(names)
+        if len(names) != num_channels:
+            raise ValueError(f"channel 名稱有 {len(names)} 個，但 channel 數為 {num_channels}")
+        return names
+    if num_channels == len(EEA_CHANNELS):
+        return list(EEA_CHANNELS)
+    return [f"Ch{i + 1}" for i in range(num_channels)]
+
+
+def parse_values(raw):
+    """
+    :param raw: 檔案內容（bytes）
+    :return: 所有數值的一維 float64 陣列，順序與檔案相同
+    """
+    text = raw.translate(_SEPARATORS)
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pv
+    except ImportError:
+        # 無法解析到結尾時 numpy 只發出 DeprecationWarning 並回傳前段資料，改為錯誤
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                return np.fromstring(text.decode('ascii', errors='replace'), sep='\n')
+            except (ValueError, DeprecationWarning):
+                raise ValueError("資料無法轉換為數值，請確認 .eea 檔案內容格式")
+    try:
+        table = pv.read_csv(io.BytesIO(text),
+                            read_options=pv.ReadOptions(column_names=['value']),
+                            convert_options=pv.ConvertOptions(column_types={'value': pa.float64()}))
+    except pa.ArrowInvalid:
+        raise ValueError("資料無法轉換為數值，請確認 .eea 檔案內容格式")
+    return table.column('value').to_numpy()
+
+
+def read_eea(path, num_channels=len(EEA_CHANNELS), samples_per_channel=EEA_SAMPLES_PER_CHANNEL):
+    """
+    :param samples_per_channel: 每個 channel 的樣本數；None 時由總筆數推算
+    :return: (samples_per_channel, num_channels) 陣列
+    """
+    with open(path, 'rb') as f:
+        data_array = parse_values(f.read())
+
+    if samples_per_channel is None:
+        if len(data_array) % num_channels:
+            raise ValueError(f"資料筆數 {len(data_array)} 無法平均分成 {num_channels} 個 channel")
+        samples_per_channel = len(data_array) // num_channels
+    total_samples = num_channels * samples_per_channel
+    if len(data_array) != total_samples:
+        raise ValueError(f"資料筆數不正確，預期 {total_samples} 筆，但實際讀取 {len(data_array)} 筆")
+    return np.reshape(data_array, (num_channels, samples_per_channel)).T
@@ -0,0 +1,293 @@
+"""
+統一特徵擷取流程：每個檔案只讀一次、視窗只切一次，
+同一組視窗交給所有要求的特徵擷取器（時域、頻譜、熵、相關、同調、NLID），
+最後輸出一份合併的結果。
+
+Feature plan（JSON）範例：
+{
+    "columns": ["Fp1", "Fp2"],
+    "fs": 500,
+    "window": {"size": 1000, "overlap": 50},
+    "per_segment": false,
+    "extractors": {
+        "time": {"features": ["Mean", "Std", "Skewness"]},
+        "spectral": {"bands": {"Delta": [0.5, 4], "Theta": [4, 8]}},
+        "entropy": {"m": 2},
+        "correlation": {"pairs": [["Fp1", "Fp2"]]},
+        "coherence": {"pairs": [["Fp1", "Fp2"]]},
+        "nlid": {"pairs": [["Fp1", "Fp2"]], "m": 3, "tau": 1}
+    }
+}
+window 省略時整段訊號視為一個視窗。window 的欄位對應 segmentation.Segmentation：
+size、overlap、unit（"samples" / "seconds"）、overlap_unit（"percent" / "samples"）、pad_tail；
+改用 "events": [...]（與 "pre"）則為事件對齊的視窗。
+設定 "dtype": "float32" 時資料以 float32 讀入以節省記憶體。
+設定 "chunk_rows" 時以串流方式分塊讀取（只適用 CSV 與滑動視窗），記憶體用量與檔案長度無關。
+
+命令列：python feature_pipeline.py plan.json 輸入資料夾 輸出.xlsx [--chunk-rows N] [--no-cache]
+檔案與 plan 都沒變的檔案會直接使用資料夾內 .result_cache 的結果。
+"""
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from scipy.signal import welch, coherence
+from segmentation import Segmentation, to_samples, step_size
+from chunked_reader import read_chunks, stream_segments
+from data_loader import read_table
+from header_index import list_data_files
+from result_cache import ResultCache, code_version
+from time_features import compute_time_features, DEFAULT_FEATURES
+from spectral_features import compute_spectral_features, band_weight_matrix
+
+DEFAULT_BANDS = {
+    'Delta': (0.5, 4),
+    'Theta': (4, 8),
+    'Alpha': (8, 13),
+    'Beta': (13, 30),
+    'Gamma': (30, 45)
+}
+
+# 特徵擷取器註冊表：名稱 -> func(signals, segments, params, columns, fs)，segments 為 Segmentation
+# 回傳 {輸出欄位名稱: 每個視窗一個值的陣列}
+EXTRACTORS = {}
+
+
+def register_extractor(name):
+    def decorator(func):
+        EXTRACTORS[name] = func
+        return func
+    return decorator
+
+
+def stack(signals, columns):
+    return np.column_stack([signals[c] for c in columns])
+
+
+def pair_columns(params):
+    return [tuple(pair) for pair in params.get("pairs", [])]
+
+
+@register_extractor("time")
+def extract_time(signals, segments, params, columns, fs):
+    names = params.get("features", DEFAULT_FEATURES)
+    if not columns:
+        return {}
+    stats = compute_time_features(segments.padded(stack(signals, columns)), segments.size, segments.step,
+                                  names, starts=segments.starts)
+    return {f"{col} {name}": stats[name][:, j] for j, col in enumerate(columns) for name in names}
+
+
+@register_extractor("spectral")
+def extract_spectral(signals, segments, params, columns, fs):
+    bands = {name: tuple(rng) for name, rng in params.get("bands", DEFAULT_BANDS).items()}
+    if not columns:
+        return {}
+    windows = segments.view(stack(signals, columns))
+    freqs, psd = welch(windows, fs=fs, nperseg=params.get("nperseg", segments.size), axis=-1)
+    power = psd @ band_weight_matrix(freqs, bands)
+    total = power.sum(axis=-1)
+    out = {}
+    for j, col in enumerate(columns):
+        for i, band in enumerate(bands):
+            out[f"{col} {band} Power"] = power[:, j, i]
+            out[f"{col} {band} Relative Power"] = np.divide(power[:, j, i], total[:, j],
+                                                            out=np.zeros(len(segments)), where=total[:, j] > 0)
+    if params.get("features", True):
+        freq_range = (min(lo for lo, _ in bands.values()), max(hi for _, hi in bands.values()))
+        feats = compute_spectral_features(freqs, psd, {b: power[..., i] for i, b in enumerate(bands)}, freq_range)
+        for j, col in enumerate(columns):
+            for name, values in feats.items():
+                out[f"{col} {name}"] = values[:, j]
+    return out
+
+
+@register_extractor("entropy")
+def extract_entropy(signals, segments, params, columns, fs):
+    import nolds
+    m = params.get("m", 1)
+    out = {}
+    for col in columns:
+        values = []
+        for seg in segments.view(signals[col]):
+            try:
+                values.append(nolds.sampen(seg, emb_dim=m))
+            except Exception:
+                values.append(np.nan)
+        out[f"{col} SampEn"] = np.array(values, dtype=float)
+    return out
+
+
+@register_extractor("correlation")
+def extract_correlation(signals, segments, params, columns, fs):
+    out = {}
+    for x, y in pair_columns(params):
+        X, Y = segments.view(signals[x]), segments.view(signals[y])
+        Xc = X - X.mean(axis=1, keepdims=True)
+        Yc = Y - Y.mean(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[f"Pearson({x},{y})"] = np.sum(Xc * Yc, axis=1) / np.sqrt(np.sum(Xc ** 2, axis=1) * np.sum(Yc ** 2, axis=1))
+    return out
+
+
+@register_extractor("coherence")
+def extract_coherence(signals, segments, params, columns, fs):
+    out = {}
+    for x, y in pair_columns(params):
+        _, Cxy = coherence(segments.view(signals[x]), segments.view(signals[y]), fs=fs,
+                           nperseg=params.get("nperseg"), axis=-1)
+        out[f"Coherence({x},{y})"] = Cxy.mean(axis=-1)
+    return out
+
+
+@register_extractor("nlid")
+def extract_nlid(signals, segments, params, columns, fs):
+    from NLIDOOP3 import RecurrenceAnalysis
+    m, tau = params.get("m", 3), params.get("tau", 1)
+    threshold = params.get("threshold", 0.1)
+    out = {}
+    for x, y in pair_columns(params):
+        xy, yx = [], []
+        for x_win, y_win in zip(segments.view(signals[x]), segments.view(signals[y])):
+            ps_x = RecurrenceAnalysis(x_win, m=m, tau=tau).reconstruct_phase_space()
+            ps_y = RecurrenceAnalysis(y_win, m=m, tau=tau).reconstruct_phase_space()
+            AR_X = RecurrenceAnalysis.compute_reconstruction_matrix(ps_x, threshold=threshold, threshold_type="dynamic")
+            AR_Y = RecurrenceAnalysis.compute_reconstruction_matrix(ps_y, threshold=threshold, threshold_type="dynamic")
+            nlid_xy, nlid_yx = RecurrenceAnalysis.calculate_nlid(AR_X, AR_Y)
+            xy.append(nlid_xy)
+            yx.append(nlid_yx)
+        out[f"NLID({x}|{y})"] = np.array(xy, dtype=float)
+        out[f"NLID({y}|{x})"] = np.array(yx, dtype=float)
+    return out
+
+
+def load_plan(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def plan_columns(plan):
+    # plan 中所有會用到的欄位（單欄與成對欄位），保持出現順序
+    needed = list(plan.get("columns", []))
+    for params in plan.get("extractors", {}).values():
+        params = params or {}
+        needed.extend(params.get("columns", []))
+        for pair in params.get("pairs", []):
+            needed.extend(pair)
+    return list(dict.fromkeys(needed))
+
+
+def read_plan_signals(path, columns, dtype=None):
+    df = read_table(path, lambda c: c in columns, dtype=dtype)
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise KeyError(f"missing columns {missing}")
+    # 任一欄位有缺值的列一起捨棄，讓所有欄位的視窗對齊
+    df = df[columns].dropna()
+    return {c: df[c].to_numpy(dtype=dtype or float) for c in columns}, len(df)
+
+
+def plan_segmentation(plan, n_samples):
+    window = dict(plan.get("window") or {})
+    fs = plan.get("fs", 1000)
+    if "events" in window:
+        return Segmentation.from_events(n_samples, window.pop("events"), fs=fs, **window)
+    return Segmentation(n_samples, fs=fs, **window)
+
+
+def run_extractors(signals, segments, plan):
+    columns = plan.get("columns", [])
+    fs = plan.get("fs", 1000)
+    results = {}
+    for name, params in plan.get("extractors", {}).items():
+        params = params or {}
+        results.update(EXTRACTORS[name](signals, segments, params, params.get("columns", columns), fs))
+    return results
+
+
+def process_file(path, plan):
+    """
+    :return: {輸出欄位名稱: 每個視窗一個值的陣列}
+    """
+    if plan.get("chunk_rows"):
+        return process_file_streaming(path, plan)
+    signals, n_samples = read_plan_signals(path, plan_columns(plan), plan.get("dtype"))
+    return run_extractors(signals, plan_segmentation(plan, n_samples), plan)
+
+
+def process_file_streaming(path, plan):
+    """
+    分塊讀取並逐塊計算，結果與 process_file 一次讀完相同。
+    """
+    window = plan.get("window") or {}
+    if not window.get("size") or "events" in window:
+        raise ValueError("chunk_rows requires a sliding window size")
+    size = to_samples(window["size"], plan.get("fs", 1000), window.get("unit", "samples"))
+    step = step_size(size, window.get("overlap", 0), window.get("overlap_unit", "percent"))
+    columns = plan_columns(plan)
+    chunks = read_chunks(path, columns, plan["chunk_rows"], plan.get("dtype", np.float64))
+
+    parts = {}
+    for block, segments in stream_segments(chunks, size, step, window.get("pad_tail", False), window.get("pad_value", 0.0)):
+        signals = {c: block[:, j] for j, c in enumerate(columns)}
+        for key, values in run_extractors(signals, segments, plan).items():
+            parts.setdefault(key, []).append(values)
+    return {key: np.concatenate(values) for key, values in parts.items()}
+
+
+def run_pipeline(folder, plan, output=None, log=print, use_cache=True):
+    """
+    :param output: 結果檔路徑；存在輸入資料夾時不會被當成紀錄讀取
+    :return: (summary_rows, segment_rows)
+    """
+    files = list_data_files(folder, exclude=(output,) if output else (), log=log)
+    version = code_version(__file__)
+    cache = ResultCache(folder, "feature_pipeline", plan, version, enabled=use_cache)
+    summary_rows = []
+    segment_rows = []
+    for file in files:
+        try:
+            path = os.path.join(folder, file)
+            results = cache.cached(path, lambda: process_file(path, plan))
+        except Exception as e:
+            log(f"Error {file}: {e}")
+            continue
+
+        with np.errstate(all='ignore'):
+            summary_rows.append({"File": file, **{k: np.nanmean(v) if len(v) else np.nan for k, v in results.items()}})
+        if plan.get("per_segment"):
+            n_segments = len(next(iter(results.values()), []))
+            for i in range(n_segments):
+                segment_rows.append({"File": file, "Segment": f"Segment{i+1}", **{k: v[i] for k, v in results.items()}})
+        log(f"Processed {file}")
+    log(f"Result cache: {cache.summary()}")
+    return summary_rows, segment_rows
+
+
+def write_results(output, summary_rows, segment_rows):
+    with pd.ExcelWriter(output) as writer:
+        pd.DataFrame(summary_rows).to_excel(writer, sheet_name="Summary", index=False)
+        if segment_rows:
+            pd.DataFrame(segment_rows).to_excel(writer, sheet_name="Per Segment", index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one feature plan over every file in a folder.")
+    parser.add_argument("plan", help="feature plan JSON file")
+    parser.add_argument("folder", help="folder of recordings (CSV, Excel, EDF, SET, EEA, NPY, Parquet)")
+    parser.add_argument("output", help="output Excel file")
+    parser.add_argument("--chunk-rows", type=int, help="stream CSV files in chunks of this many rows")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every file instead of reusing cached results")
+    args = parser.parse_args()
+
+    plan = load_plan(args.plan)
+    if args.chunk_rows:
+        plan["chunk_rows"] = args.chunk_rows
+    summary_rows, segment_rows = run_pipeline(args.folder, plan, args.output, use_cache=not args.no_cache)
+    write_results(args.output, summary_rows, segment_rows)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
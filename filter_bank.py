@@ -0,0 +1,65 @@
+import os
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfiltfilt
+
+
+@lru_cache(maxsize=None)
+def design_bandpass_sos(lowcut, highcut, fs, order=4):
+    """
+    設計 Butterworth 帶通濾波器（second-order sections），同一組 (band, fs, order) 只設計一次。
+    """
+    return butter(order, [lowcut, highcut], btype='band', fs=fs, output='sos')
+
+
+class FilterBank:
+    def __init__(self, bands, fs, order=4, n_jobs=1):
+        """
+        :param bands: {頻段名稱: (low, high)}
+        :param fs: 取樣率 (Hz)
+        :param order: 濾波器階數
+        :param n_jobs: >1 時以執行緒池平行處理各頻段；None 代表使用全部 CPU
+        """
+        self.bands = dict(bands)
+        self.fs = fs
+        self.order = order
+        self.n_jobs = n_jobs if n_jobs is not None else (os.cpu_count() or 1)
+        self.sos = {name: design_bandpass_sos(float(lo), float(hi), fs, order)
+                    for name, (lo, hi) in self.bands.items()}
+
+    def _filter_band(self, name, data, axis):
+        return name, sosfiltfilt(self.sos[name], data, axis=axis)
+
+    def apply(self, data, axis=-1):
+        """
+        零相位濾波整個陣列（例如 (channels, samples)），一次輸出所有頻段。
+        :return: {頻段名稱: 與 data 同形狀的濾波結果}
+        """
+        data = np.asarray(data, dtype=float)
+        if self.n_jobs > 1 and len(self.sos) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.n_jobs, len(self.sos))) as pool:
+                results = pool.map(lambda name: self._filter_band(name, data, axis), self.sos)
+                return dict(results)
+        return dict(self._filter_band(name, data, axis) for name in self.sos)
+
+    def stream(self, chunks):
+        """
+        分段（串流）濾波：逐塊處理 (channels, samples) 資料並延續濾波器狀態，
+        記憶體用量只與區塊大小有關。
+        注意：串流模式為單向 (sosfilt) 因果濾波，會有相位延遲，與 apply() 的零相位結果不同。
+        :param chunks: 可迭代的 (channels, samples) 區塊
+        :return: 逐塊產生 {頻段名稱: 濾波後區塊}
+        """
+        state = None
+        for chunk in chunks:
+            chunk = np.atleast_2d(np.asarray(chunk, dtype=float))
+            if state is None:
+                # 以第一個樣本初始化，避免開頭的暫態
+                state = {name: sosfilt_zi(sos)[:, None, :] * chunk[None, :, :1]
+                         for name, sos in self.sos.items()}
+            out = {}
+            for name, sos in self.sos.items():
+                out[name], state[name] = sosfilt(sos, chunk, axis=-1, zi=state[name])
+            yield out
+
@@ -0,0 +1,200 @@
+"""
+資料夾的欄位標題索引：只讀標題列（CSV 用 nrows=0，Excel 用 openpyxl read-only 只讀第一列，
+EDF 等原始紀錄格式用 signal_readers 只讀 channel 名稱），
+依 路徑 + 修改時間 + 大小 快取在記憶體與資料夾內的 .header_index.json，重複掃描時只重讀有變動的檔案。
+"""
+import os
+import json
+import pandas as pd
+from array_store import is_index_file
+from column_select import column_name
+from signal_readers import SIGNAL_EXTENSIONS, reader_for
+
+DATA_EXTENSIONS = ('.csv', '.xls', '.xlsx') + SIGNAL_EXTENSIONS
+INDEX_FILE = '.header_index.json'
+
+# 分析工具寫在輸入資料夾中的結果檔（小寫），由各工具以寫出時用的檔名常數登記（register_outputs），
+# 掃描輸入時排除並回報，不會默默略過真正的紀錄
+_output_files = set()
+# 檔名（不含副檔名）以此結尾的結果檔，例如 EEG frequency_V2 以 save_frame 寫出的任何格式
+_output_suffixes = set()
+
+# 絕對路徑 -> (大小, 修改時間, 欄位)
+_cache = {}
+
+
+def dedupe(columns):
+    # 與 pandas 相同：空白標題為 "Unnamed: i"，重複的標題加上 .1、.2
+    seen = {}
+    out = []
+    for i, col in enumerate(columns):
+        col = f"Unnamed: {i}" if col is None or col == '' else str(col)
+        name = col
+        while name in seen:
+            seen[col] += 1
+            name = f"{col}.{seen[col]}"
+        seen[name] = 0
+        out.append(name)
+    return out
+
+
+def register_outputs(*names, suffixes=()):
+    """
+    登記分析工具寫出的結果檔，在定義檔名常數的地方呼叫。
+    :param names: 完整檔名，例如 "NLID_Results_Avg.xlsx"
+    :param suffixes: 檔名（不含副檔名）的結尾，例如 "_relative_band_power"
+    """
+    _output_files.update(n.lower() for n in names)
+    _output_suffixes.update(s.lower() for s in suffixes)
+
+
+def is_data_file(name, extensions=DATA_EXTENSIONS):
+    lower = name.lower()
+    # ~$ 開頭為 Excel 開啟中的暫存檔
+    return lower.endswith(extensions) and not lower.startswith('~$')
+
+
+def is_output_file(path):
+    """
+    :return: 是否為已登記的分析工具結果檔，或 save_frame 寫出的 index 欄位檔
+    """
+    lower = os.path.basename(path).lower()
+    if lower in _output_files or os.path.splitext(lower)[0].endswith(tuple(_output_suffixes)):
+        return True
+    return is_index_file(path)
+
+
+def scan_data_files(folder, extensions=DATA_EXTENSIONS, log=None):
+    """
+    :param log: 回報略過的結果檔，例如 self.log_message
+    :return: 資料夾中輸入資料檔的 os.DirEntry（依檔名排序）
+    """
+    with os.scandir(folder) as it:
+        entries = sorted((e for e in it if e.is_file() and is_data_file(e.name, extensions)), key=lambda e: e.name)
+    files = []
+    for entry in entries:
+        if is_output_file(entry.path):
+            if log:
+                log(f"Skipped {entry.name} (output of an analysis tool)")
+        else:
+            files.append(entry)
+    return files
+
+
+def list_data_files(folder, extensions=DATA_EXTENSIONS, exclude=(), full_path=False, log=None):
+    """
+    :param exclude: 另外要排除的檔案路徑（例如使用者選的輸出檔）
+    :param log: 回報略過的結果檔，例如 self.log_message
+    :return: 資料夾中的輸入資料檔（依檔名排序），不含分析工具自己的輸出與輔助檔
+    """
+    excluded = {os.path.normcase(os.path.abspath(e)) for e in exclude if e}
+    names = [e.name for e in scan_data_files(folder, extensions, log)
+             if os.path.normcase(os.path.abspath(e.path)) not in excluded]
+    return [os.path.join(folder, n) for n in names] if full_path else names
+
+
+def read_header(path):
+    reader = reader_for(path)
+    if reader:
+        return dedupe(reader[0](path))
+    if path.lower().endswith('.xlsx'):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True)
+        try:
+            row = next(wb.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+        finally:
+            wb.close()
+        # read-only 模式下尾端的空白儲存格也會讀到
+        row = list(row)
+        while row and row[-1] is None:
+            row.pop()
+        # 數字標題與 data_loader 讀出的欄位名稱相同（1.0 -> "1"）
+        return dedupe([None if c is None else column_name(c) for c in row])
+    if path.lower().endswith('.xls'):
+        return [str(c) for c in pd.read_excel(path, nrows=0).columns]
+    return [str(c) for c in pd.read_csv(path, nrows=0).columns]
+
+
+class HeaderIndex:
+    """
+    一個資料夾內所有資料檔的欄位名稱。
+    """
+
+    def __init__(self, folder, extensions=DATA_EXTENSIONS, persist=True, log=None):
+        self.folder = folder
+        self.extensions = extensions
+        self.persist = persist
+        self.log = log
+        self.headers = {}
+        self.errors = {}
+        self.scan()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.folder, INDEX_FILE)
+
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self, entries):
+        try:
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+        except OSError:
+            # 唯讀資料夾時只用記憶體快取
+            pass
+
+    def scan(self):
+        stored = self.load_index() if self.persist else {}
+        entries = {}
+        changed = False
+        for entry in scan_data_files(self.folder, self.extensions, self.log):
+            st = entry.stat()
+            key = os.path.abspath(entry.path)
+            signature = (st.st_size, st.st_mtime_ns)
+            cached = _cache.get(key)
+            if cached is None and entry.name in stored and tuple(stored[entry.name][:2]) == signature:
+                cached = (*signature, stored[entry.name][2])
+            if cached is None or cached[:2] != signature:
+                try:
+                    cached = (*signature, read_header(entry.path))
+                except Exception as e:
+                    self.errors[entry.name] = str(e)
+                    continue
+                changed = True
+            _cache[key] = cached
+            self.headers[entry.name] = cached[2]
+            entries[entry.name] = list(cached)
+        if self.persist and (changed or entries.keys() != stored.keys()):
+            self.save_index(entries)
+        return self.headers
+
+    @property
+    def files(self):
+        return list(self.headers)
+
+    def columns(self, file=None):
+        """
+        :return: 指定檔案（預設第一個檔案）的欄位名稱
+        """
+        if not self.headers:
+            return []
+        return self.headers[file or self.files[0]]
+
+    def missing(self, required, key=None):
+        """
+        :param key: 比對前套用在欄位名稱上的函式，例如 lambda c: c.strip().upper()
+        :return: {檔名: 缺少的欄位}，只列出有缺欄位的檔案
+        """
+        key = key or (lambda c: c)
+        report = {}
+        for file, columns in self.headers.items():
+            present = {key(c) for c in columns}
+            lacking = [c for c in required if key(c) not in present]
+            if lacking:
+                report[file] = lacking
+        return report
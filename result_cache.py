@@ -0,0 +1,134 @@
+"""
+逐檔結果快取：以 (檔案大小 + 修改時間 或內容雜湊, 分析名稱, 參數, 程式版本) 為鍵，
+批次工具重跑時只計算新增或變動的檔案，其餘直接用快取的結果組合出彙總表。
+快取存在資料夾內的 .result_cache/<分析名稱>/，每個檔案一筆。
+"""
+import os
+import sys
+import json
+import pickle
+import hashlib
+import inspect
+
+CACHE_DIR = '.result_cache'
+
+# get() 找不到快取時的回傳值（快取的結果本身可能是 None）
+MISS = object()
+
+# 分析工具經由 data_loader、time_features 等間接使用的本地模組，一律納入程式版本
+SHARED_MODULES = (
+    'array_store', 'chunked_reader', 'column_select', 'data_loader', 'eea_format', 'filter_bank',
+    'rolling_moments', 'segmentation', 'signal_readers', 'spectral_features', 'time_features',
+)
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def code_version(*sources):
+    """
+    程式版本：各原始碼檔案與 SHARED_MODULES 內容的雜湊，程式有修改時快取自動失效。
+    :param sources: 原始碼路徑，或函式、類別、模組（取其所在檔案）；
+                    第三方套件（例如 nolds）以套件的 __version__ 代表
+    """
+    h = hashlib.sha1()
+    paths = [os.path.join(_HERE, name + '.py') for name in SHARED_MODULES]
+    for source in sources:
+        if isinstance(source, str):
+            paths.append(os.path.abspath(source))
+            continue
+        try:
+            path = inspect.getsourcefile(source)
+        except TypeError:
+            path = None
+        if path and os.path.dirname(os.path.abspath(path)) == _HERE:
+            paths.append(os.path.abspath(path))
+            continue
+        # 第三方套件的 __init__.py 不含演算法本身，改用版本號
+        name = source.__name__ if inspect.ismodule(source) else getattr(source, '__module__', None) or ''
+        package = name.split('.')[0]
+        version = getattr(sys.modules.get(package), '__version__', 'unknown')
+        h.update(f"{package}=={version}".encode('utf-8'))
+    for path in dict.fromkeys(paths):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def content_hash(path, block_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    :param params: 影響結果的參數（可 JSON 序列化），任何一個不同都視為不同的結果
+    :param version: 程式版本，通常為 code_version(__file__, ...)
+    :param hash_contents: True 時以內容雜湊判斷檔案是否變動，否則用大小 + 修改時間
+    :param enabled: False 時 get 一律回傳 MISS、put 不寫入
+    """
+
+    def __init__(self, folder, analysis, params, version, hash_contents=False, enabled=True):
+        self.folder = os.path.join(folder, CACHE_DIR, analysis)
+        self.analysis = analysis
+        self.params = json.dumps(params, sort_keys=True, default=str, ensure_ascii=False)
+        self.version = version
+        self.hash_contents = hash_contents
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def signature(self, path):
+        st = os.stat(path)
+        if self.hash_contents:
+            return {'sha1': content_hash(path)}
+        return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    def entry_path(self, path):
+        key = json.dumps([os.path.basename(path), self.analysis, self.params, self.version], ensure_ascii=False)
+        return os.path.join(self.folder, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pkl')
+
+    def get(self, path):
+        if not self.enabled:
+            self.misses += 1
+            return MISS
+        try:
+            with open(self.entry_path(path), 'rb') as f:
+                entry = pickle.load(f)
+            if entry['signature'] == self.signature(path):
+                self.hits += 1
+                return entry['value']
+        except Exception:
+            # 沒有快取，或快取檔損壞、格式不符時一律重算
+            pass
+        self.misses += 1
+        return MISS
+
+    def put(self, path, value):
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            target = self.entry_path(path)
+            tmp = target + '.tmp'
+            with open(tmp, 'wb') as f:
+                pickle.dump({'signature': self.signature(path), 'value': value}, f)
+            os.replace(tmp, target)
+        except OSError:
+            # 無法寫入快取時照常輸出結果，只是下次需要重算
+            pass
+
+    def cached(self, path, compute):
+        """
+        有快取時回傳快取結果，否則呼叫 compute() 計算並存入快取（例外不會被快取）。
+        檔案、參數與程式版本都沒變時直接用上次的結果，批次重跑時只計算新增或變動的檔案。
+        """
+        value = self.get(path)
+        if value is MISS:
+            value = compute()
+            self.put(path, value)
+        return value
+
+    def summary(self):
+        return f"{self.hits} cached, {self.misses} computed"
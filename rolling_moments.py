@@ -0,0 +1,83 @@
+import numpy as np
+from segmentation import window_starts, strided_windows
+
+# 視窗平均與區塊平均相差超過幾個標準差時，視為累加和精度不足
+MAX_MEAN_OFFSET = 10
+
+
+def prefix_moments(x, starts, window_size, block_windows=64):
+    # 以區塊為單位做 x、x²、x³、x⁴ 的累加和，每個區塊先扣掉區塊平均，
+    # 讓累加值的數量級維持在局部範圍，減少相減時的精度損失
+    n = len(starts)
+    sums = np.empty((4, n) + x.shape[1:])
+    shifts = np.empty((n,) + x.shape[1:])
+    for b in range(0, n, block_windows):
+        idx = slice(b, b + block_windows)
+        lo, hi = starts[idx][0], starts[idx][-1] + window_size
+        seg = x[lo:hi]
+        shift = seg.mean(axis=0)
+        y = seg - shift
+        rel = starts[idx] - lo
+        zero = np.zeros((1,) + x.shape[1:])
+        for k in range(4):
+            c = np.concatenate((zero, np.cumsum(y ** (k + 1), axis=0)))
+            sums[k, idx] = (c[rel + window_size] - c[rel]) / window_size
+        shifts[idx] = shift
+    return sums, shifts
+
+
+def direct_moments(x, starts, window_size):
+    # 兩段式計算（先減平均再求動差），用於數值不穩定的視窗
+    windows = strided_windows(x, window_size, starts)
+    mean = windows.mean(axis=-1)
+    dev = windows - mean[..., None]
+    dev2 = dev ** 2
+    return mean, dev2.mean(axis=-1), np.mean(dev2 * dev, axis=-1), np.mean(dev2 ** 2, axis=-1)
+
+
+def rolling_central_moments(x, window_size, step, method="prefix", rtol=1e-8, starts=None):
+    """
+    一次算出所有視窗的平均與 2~4 階中央動差（除以 N 的有偏估計）。
+    x 可為 (samples,) 或 (samples, columns)，多欄位時所有欄位一起計算。
+    :param method: "prefix" 用 x、x²、x³、x⁴ 的累加和；"direct" 對每個視窗做兩段式計算
+    :param rtol: prefix 模式下，變異數相對於 E[x²] 小於此值的視窗視為常數，改用 direct 重算
+    :param starts: 指定視窗起點（例如 Segmentation.starts），None 時依 step 切
+    :return: (mean, m2, m3, m4)，形狀為 (視窗數,) 或 (視窗數, columns)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if starts is None:
+        starts = window_starts(len(x), window_size, step)
+    if len(starts) == 0:
+        return tuple(np.empty((0,) + x.shape[1:]) for _ in range(4))
+
+    if method == "direct":
+        mean, m2, m3, m4 = direct_moments(x, starts, window_size)
+    else:
+        (s1, s2, s3, s4), shifts = prefix_moments(x, starts, window_size)
+        m2 = s2 - s1 ** 2
+        m3 = s3 - 3 * s1 * s2 + 2 * s1 ** 3
+        m4 = s4 - 4 * s1 * s3 + 6 * s1 ** 2 * s2 - 3 * s1 ** 4
+        mean = s1 + shifts
+
+        # 視窗平均離區塊平均太遠（相對於視窗標準差）或幾乎為常數時，改用兩段式重算
+        unstable = (m2 <= rtol * s2) | (s1 ** 2 > MAX_MEAN_OFFSET ** 2 * m2)
+        rows = np.any(unstable.reshape(len(starts), -1), axis=1)
+        if np.any(rows):
+            exact = direct_moments(x, starts[rows], window_size)
+            for arr, value in zip((mean, m2, m3, m4), exact):
+                arr[rows] = np.where(unstable[rows], value, arr[rows])
+
+    return mean, np.maximum(m2, 0), m3, np.maximum(m4, 0)
+
+
+def rolling_moments(x, window_size, step, method="prefix", rtol=1e-8):
+    """
+    一次算出所有視窗的 mean、std、skewness。
+    std 與 pandas 相同 (ddof=1)，skewness 與 scipy.stats.skew 預設相同（有偏估計）。
+    :return: (means, stds, skews)，長度等於視窗數
+    """
+    mean, m2, m3, _ = rolling_central_moments(x, window_size, step, method, rtol)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(m2 * window_size / (window_size - 1)) if window_size > 1 else np.full_like(m2, np.nan)
+        skews = np.where(m2 > 0, m3 / m2 ** 1.5, np.nan)
+    return mean, std, skews
@@ -0,0 +1,174 @@
+"""
+共用的視窗切割。所有工具的滑動視窗都由這裡產生，切法如下：
+
+- 視窗長度 size：unit="samples" 時為樣本數；unit="seconds" 時為秒，乘上 fs 後四捨五入成整數樣本
+- 視窗移動量 step：overlap_unit="percent" 時 step = int(size * (1 - overlap / 100))（無條件捨去）；
+  "ratio"（0~1）時 step = int(size * (1 - overlap))；"samples" 時 step = size - overlap。
+  step <= 0 時丟出 ValueError
+- 第 i 個視窗為 [i * step, i * step + size)，只保留完整落在訊號內的視窗，
+  視窗數 = (n - size) // step + 1，n < size 時為 0
+- pad_tail=True 時，若尾端還有樣本沒有被任何視窗涵蓋，再多一個從下一個起點開始的視窗，
+  超出訊號的部分補 pad_value（n < size 時即為從 0 開始的一個視窗）；最多只補一個視窗，
+  且該視窗的起點必須在訊號內
+- 事件對齊（Segmentation.from_events）：每個事件一個視窗，起點為事件位置減去 pre，
+  超出訊號範圍的事件捨棄（pad_tail=True 時尾端超出者補齊），視窗依起點排序
+
+view(x) 回傳 (視窗數, ..., size) 的 strided view：起點等距時不複製資料；
+事件對齊等不等距的起點，以及需要補齊尾端時，才會複製。
+"""
+import numpy as np
+
+
+def to_samples(value, fs=None, unit="samples"):
+    """
+    :param unit: "samples" 或 "seconds"（需要 fs）
+    """
+    if unit == "samples":
+        return int(value)
+    if unit == "seconds":
+        if not fs:
+            raise ValueError("fs is required when unit is seconds")
+        return int(round(value * fs))
+    raise ValueError(f"unknown unit: {unit}")
+
+
+def step_size(size, overlap=0, overlap_unit="percent"):
+    """
+    :param overlap_unit: "percent"（0~100）、"ratio"（0~1）或 "samples"
+    """
+    if overlap_unit == "percent":
+        step = int(size * (1 - overlap / 100))
+    elif overlap_unit == "ratio":
+        step = int(size * (1 - overlap))
+    elif overlap_unit == "samples":
+        step = size - int(overlap)
+    else:
+        raise ValueError(f"unknown overlap unit: {overlap_unit}")
+    if step <= 0:
+        raise ValueError("Overlap too high, step size is zero.")
+    return step
+
+
+def window_starts(length, window_size, step):
+    """
+    滑動視窗起點，與原本 range((length - window_size) // step + 1) 的切法相同。
+    """
+    if step <= 0:
+        raise ValueError("step must be positive")
+    n_windows = max((length - window_size) // step + 1, 0)
+    return np.arange(n_windows) * step
+
+
+def strided_windows(x, size, starts, axis=0):
+    """
+    取出從 starts 開始、長度 size 的視窗，視窗軸放在 axis，樣本放在最後一軸。
+    起點等距時用切片取 strided view，不複製資料。
+    """
+    x = np.asarray(x)
+    axis = axis % x.ndim
+    starts = np.asarray(starts, dtype=np.intp)
+    if len(starts) == 0:
+        # 訊號可能比視窗短，無法建立 sliding_window_view
+        return np.empty(x.shape[:axis] + (0,) + x.shape[axis + 1:] + (size,), dtype=x.dtype)
+    windows = np.lib.stride_tricks.sliding_window_view(x, size, axis=axis)
+    index = [slice(None)] * windows.ndim
+    if len(starts) == 1:
+        index[axis] = slice(starts[0], starts[0] + 1)
+    else:
+        diffs = np.diff(starts)
+        if diffs[0] > 0 and np.all(diffs == diffs[0]):
+            index[axis] = slice(starts[0], starts[-1] + 1, diffs[0])
+        else:
+            index[axis] = starts
+    return windows[tuple(index)]
+
+
+class Segmentation:
+    """
+    一段長度 n_samples 的訊號的視窗切法，同一個檔案的所有特徵共用。
+    size 為 None 時整段訊號視為一個視窗。
+    """
+
+    def __init__(self, n_samples, size=None, overlap=0, fs=None, unit="samples",
+                 overlap_unit="percent", pad_tail=False, pad_value=0.0):
+        self.n_samples = n_samples
+        self.pad_value = pad_value
+        if size is None:
+            self.size = n_samples
+            self.step = max(n_samples, 1)
+            self.starts = np.zeros(1, dtype=np.intp)
+            return
+
+        self.size = to_samples(size, fs, unit)
+        if self.size <= 0:
+            raise ValueError("window size must be positive")
+        self.step = step_size(self.size, overlap, overlap_unit)
+        starts = window_starts(n_samples, self.size, self.step)
+        if pad_tail:
+            covered = starts[-1] + self.size if len(starts) else 0
+            if covered < n_samples and len(starts) * self.step < n_samples:
+                starts = np.append(starts, len(starts) * self.step)
+        self.starts = starts
+
+    @classmethod
+    def from_starts(cls, n_samples, size, starts, step=None, pad_value=0.0):
+        """
+        直接指定視窗起點（樣本），例如串流讀取時每個區塊內的視窗。
+        """
+        self = cls.__new__(cls)
+        self.n_samples = n_samples
+        self.pad_value = pad_value
+        self.size = size
+        self.step = step
+        self.starts = np.asarray(starts, dtype=np.intp)
+        return self
+
+    @classmethod
+    def from_events(cls, n_samples, events, size, pre=0, fs=None, unit="samples",
+                    pad_tail=False, pad_value=0.0):
+        """
+        事件對齊的視窗：每個事件一個視窗，從事件前 pre 開始。
+        events、size、pre 的單位都由 unit 決定。
+        """
+        size = to_samples(size, fs, unit)
+        if size <= 0:
+            raise ValueError("window size must be positive")
+        starts = np.array([to_samples(e, fs, unit) for e in events], dtype=np.intp) - to_samples(pre, fs, unit)
+        end = n_samples if pad_tail else n_samples - size + 1
+        keep = (starts >= 0) & (starts < end)
+        self = cls.from_starts(n_samples, size, np.sort(starts[keep]), pad_value=pad_value)
+        self.dropped = int(np.sum(~keep))
+        return self
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def pad_length(self):
+        # 最後一個視窗超出訊號的樣本數
+        if len(self.starts) == 0:
+            return 0
+        return max(int(self.starts.max()) + self.size - self.n_samples, 0)
+
+    @property
+    def valid_lengths(self):
+        # 每個視窗實際包含的訊號樣本數（補齊的不算）
+        return np.minimum(self.size, self.n_samples - self.starts)
+
+    def padded(self, x, axis=0):
+        """
+        需要補齊尾端時回傳補齊後的訊號（會複製），否則原樣回傳。
+        """
+        x = np.asarray(x)
+        if not self.pad_length:
+            return x
+        pad = [(0, 0)] * x.ndim
+        pad[axis % x.ndim] = (0, self.pad_length)
+        return np.pad(x, pad, constant_values=self.pad_value)
+
+    def view(self, x, axis=0):
+        """
+        (samples,) -> (視窗數, size)；(samples, columns) -> (視窗數, columns, size)。
+        axis 為樣本所在的軸，例如 (channels, samples) 用 axis=-1 得到 (channels, 視窗數, size)。
+        """
+        return strided_windows(self.padded(x, axis), self.size, self.starts, axis)
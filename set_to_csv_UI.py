@@ -1,4 +1,5 @@
 import os
+import sys
 import mne
 import pandas as pd
 import tkinter as tk
@@ -6,6 +7,22 @@ import ttkbootstrap as ttk
 from tkinter import filedialog, messagebox
 from ttkbootstrap.constants import *
 import subprocess
+from conversion_runner import BackgroundConversion, format_summary
+from table_writer import write_csv
+
+def convert_set_file(file_path, output_folder, float_format=None):
+    """
+    worker pool 中轉換單一 .set 檔。
+    :param float_format: 輸出的浮點數格式，例如 "%.6g"；None 為完整精度
+    :return: 完成訊息
+    """
+    raw = mne.io.read_raw_eeglab(file_path, preload=True)
+    data = raw.get_data()
+    df = pd.DataFrame(data.T, columns=raw.info['ch_names'])
+
+    output_path = os.path.join(output_folder, os.path.basename(file_path).replace(".set", ".csv"))
+    write_csv(df, output_path, float_format)
+    return f"✅ 已輸出至：{output_path}"
 
 class EEGConverterApp:
     def __init__(self, master):
@@ -16,6 +33,7 @@ class EEGConverterApp:
 
         self.input_path = tk.StringVar()
         self.output_path = tk.StringVar()
+        self.workers = tk.IntVar(value=os.cpu_count() or 1)
 
         self.create_widgets()
 
@@ -34,8 +52,14 @@ class EEGConverterApp:
         ttk.Entry(frame2, textvariable=self.output_path, width=80).pack(side='left', padx=5)
         ttk.Button(frame2, text="瀏覽", command=self.browse_output).pack(side='right')
 
-        # 開始轉換按鈕與進度條
-        ttk.Button(self.master, text="開始轉換", bootstyle=SUCCESS, command=self.convert_files).pack(pady=10)
+        # 同時轉換數、開始轉換按鈕與進度條
+        frame3 = ttk.Frame(self.master)
+        frame3.pack(pady=5)
+        ttk.Label(frame3, text="同時轉換的檔案數").pack(side='left', padx=5)
+        ttk.Spinbox(frame3, from_=1, to=64, textvariable=self.workers, width=5).pack(side='left')
+
+        self.start_button = ttk.Button(self.master, text="開始轉換", bootstyle=SUCCESS, command=self.convert_files)
+        self.start_button.pack(pady=10)
         self.progress = ttk.Progressbar(self.master, mode='determinate', length=700)
         self.progress.pack(pady=5)
 
@@ -56,7 +80,6 @@ class EEGConverterApp:
     def log(self, message):
         self.log_box.insert("end", message + "\n")
         self.log_box.see("end")
-        self.master.update()
 
     def convert_files(self):
         input_folder = self.input_path.get()
@@ -71,28 +94,38 @@ class EEGConverterApp:
             self.log("⚠️ 找不到 .set 檔案")
             return
 
+        try:
+            workers = int(self.workers.get())
+        except (ValueError, tk.TclError):
+            messagebox.showerror("錯誤", "同時轉換的檔案數必須是整數")
+            return
+
         total = len(files)
         self.progress["maximum"] = total
         self.progress["value"] = 0
-
-        for idx, file_name in enumerate(files, start=1):
-            try:
-                self.log(f"🔄 處理中：{file_name}")
-                raw = mne.io.read_raw_eeglab(os.path.join(input_folder, file_name), preload=True)
-                data = raw.get_data()
-                df = pd.DataFrame(data.T, columns=raw.info['ch_names'])
-
-                output_path = os.path.join(output_folder, file_name.replace(".set", ".csv"))
-                df.to_csv(output_path, index=False)
-                self.log(f"✅ 已輸出至：{output_path}")
-            except Exception as e:
-                self.log(f"❌ 轉換失敗：{file_name}\n   錯誤：{str(e)}")
-
-            self.progress["value"] = idx
-            self.master.update_idletasks()
-
+        self.output_folder = output_folder
+        self.start_button.config(state=DISABLED)
+        self.log(f"🔄 處理中：{total} 個檔案（同時 {workers} 個）")
+
+        # 轉換在子行程中進行，結果經由 queue 依檔案順序回到介面，視窗不會凍結
+        paths = [os.path.join(input_folder, f) for f in files]
+        BackgroundConversion(self.master, convert_set_file, paths, (output_folder,), workers,
+                             on_result=self.on_result, on_done=self.on_done)
+
+    def on_result(self, result):
+        file_name = os.path.basename(result.path)
+        if result.error:
+            self.log(f"❌ 轉換失敗：{file_name}\n   錯誤：{result.error}")
+        else:
+            for message in result.messages:
+                self.log(message)
+        self.progress["value"] += 1
+
+    def on_done(self, summary):
+        self.log(format_summary(summary))
         self.log("🎉 所有檔案已完成轉換！")
-        self.open_folder(output_folder)
+        self.start_button.config(state=NORMAL)
+        self.open_folder(self.output_folder)
 
     def open_folder(self, path):
         try:
@@ -0,0 +1,230 @@
+"""
+原始紀錄格式的讀取器（EDF、EEGLAB .set、.eea、.npy、Parquet），分析工具不需先轉成 CSV。
+每個格式提供兩個函式：只讀 channel 名稱，以及只讀指定 channel 與樣本範圍 [start, stop) 的資料。
+data_loader.read_table 與 header_index 依副檔名自動使用這裡的讀取器。
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+from array_store import index_path, sidecar_path
+from eea_format import EEA_CHANNELS, EEA_SAMPLES_PER_CHANNEL, channel_names, read_eea
+
+# .eea 檔沒有記錄 channel 配置，讀取時使用這裡的設定（見 set_eea_layout）
+EEA_LAYOUT = {'num_channels': len(EEA_CHANNELS), 'samples_per_channel': EEA_SAMPLES_PER_CHANNEL, 'names': None}
+
+
+def edf_columns(path):
+    import pyedflib
+    with pyedflib.EdfReader(path) as edf:
+        return [edf.getSignalLabel(i) for i in range(edf.signals_in_file)]
+
+
+def read_edf(path, columns, start, stop):
+    import pyedflib
+    from edf_convert import edf_channels
+    with pyedflib.EdfReader(path) as edf:
+        channels = edf_channels(edf)
+        by_label = {c['label']: c for c in channels}
+        selected = channels if columns is None else [by_label[c] for c in columns]
+        rates = {c['fs'] for c in selected}
+        if len(rates) > 1:
+            raise ValueError(f"selected channels have different sampling rates {sorted(rates)}; "
+                             f"select channels of one rate or convert with 'edf to csv.py'")
+        n_samples = selected[0]['samples'] if selected else 0
+        stop = n_samples if stop is None else min(stop, n_samples)
+        start = min(start, stop)
+        df = pd.DataFrame({c['label']: edf.readSignal(c['index'], start, stop - start) if stop > start else np.empty(0)
+                           for c in selected})
+    if rates:
+        df.attrs['fs'] = rates.pop()
+    return df
+
+
+def set_columns(path):
+    import mne
+    return list(mne.io.read_raw_eeglab(path, preload=False, verbose='error').ch_names)
+
+
+def read_set(path, columns, start, stop):
+    import mne
+    raw = mne.io.read_raw_eeglab(path, preload=False, verbose='error')
+    picks = list(raw.ch_names) if columns is None else list(columns)
+    if picks:
+        data = raw.get_data(picks=picks, start=start, stop=stop)
+    else:
+        data = np.empty((0, 0))
+    df = pd.DataFrame(data.T, columns=picks)
+    df.attrs['fs'] = raw.info['sfreq']
+    return df
+
+
+def set_eea_layout(num_channels=len(EEA_CHANNELS), samples_per_channel=EEA_SAMPLES_PER_CHANNEL, names=None):
+    """
+    設定 .eea 檔的 channel 數、每個 channel 的樣本數（None 為由總筆數推算）與 channel 名稱。
+    """
+    channel_names(num_channels, names)
+    EEA_LAYOUT.update(num_channels=num_channels, samples_per_channel=samples_per_channel, names=names)
+
+
+def eea_columns(path):
+    return channel_names(EEA_LAYOUT['num_channels'], EEA_LAYOUT['names'])
+
+
+def eea_frame(path, columns):
+    # .eea 為 channel-major 的文字檔，無法只讀一段樣本，整個檔案解析一次
+    data = read_eea(path, EEA_LAYOUT['num_channels'], EEA_LAYOUT['samples_per_channel'])
+    names = eea_columns(path)
+    columns = names if columns is None else columns
+    return pd.DataFrame(data[:, [names.index(c) for c in columns]], columns=columns)
+
+
+def read_eea_frame(path, columns, start, stop):
+    return eea_frame(path, columns).iloc[start:stop].reset_index(drop=True)
+
+
+def iter_eea(path, columns, chunk_rows):
+    df = eea_frame(path, columns)
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].reset_index(drop=True)
+
+
+def npy_meta(path):
+    # save_frame 寫出的 .npy 旁有記錄欄位名稱的 .json；沒有時欄位名稱為 "0"、"1"…
+    try:
+        with open(sidecar_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        values = np.load(path, mmap_mode='r')
+        n_columns = values.shape[1] if values.ndim == 2 else 1
+        return {'columns': [str(i) for i in range(n_columns)], 'index_column': None}
+
+
+def npy_columns(path):
+    meta = npy_meta(path)
+    return ([meta['index_column']] if meta.get('index_column') else []) + meta['columns']
+
+
+def read_npy(path, columns, start, stop):
+    meta = npy_meta(path)
+    columns = npy_columns(path) if columns is None else columns
+    # 以記憶體映射開啟，只複製需要的列與欄位
+    values = np.load(path, mmap_mode='r')
+    if values.ndim == 1:
+        values = values[:, None]
+    df = pd.DataFrame({c: np.asarray(values[start:stop, meta['columns'].index(c)])
+                       for c in columns if c != meta.get('index_column')})
+    if meta.get('index_column') in columns:
+        index = np.load(index_path(path), mmap_mode='r')
+        df.insert(0, meta['index_column'], np.asarray(index[start:stop]))
+    return df[list(columns)]
+
+
+def parquet_columns(path):
+    import pyarrow.parquet as pq
+    schema = pq.read_schema(path)
+    # pandas 寫出的 index 欄位不是資料
+    pandas_meta = json.loads(schema.metadata.get(b'pandas', b'{}')) if schema.metadata else {}
+    index = {c for c in pandas_meta.get('index_columns', []) if isinstance(c, str)}
+    return [name for name in schema.names if name not in index]
+
+
+def read_parquet(path, columns, start, stop):
+    # 只讀與 [start, stop) 重疊的 row group
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(path)
+    columns = parquet_columns(path) if columns is None else columns
+    n_rows = parquet.metadata.num_rows
+    stop = n_rows if stop is None else min(stop, n_rows)
+    start = min(start, stop)
+    groups = []
+    first = offset = 0
+    for i in range(parquet.num_row_groups):
+        rows = parquet.metadata.row_group(i).num_rows
+        if offset < stop and offset + rows > start:
+            if not groups:
+                first = offset
+            groups.append(i)
+        offset += rows
+    if not groups:
+        return parquet.schema_arrow.empty_table().select(columns).to_pandas()
+    table = parquet.read_row_groups(groups, columns=columns)
+    return table.slice(start - first, stop - start).to_pandas()
+
+
+def iter_parquet(path, columns, chunk_rows):
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(path)
+    columns = parquet_columns(path) if columns is None else columns
+    empty = True
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        empty = False
+        yield batch.to_pandas()
+    if empty:
+        yield parquet.schema_arrow.empty_table().select(columns).to_pandas()
+
+
+# 副檔名 -> (讀取 channel 名稱的函式, 讀取資料的函式)
+READERS = {
+    '.edf': (edf_columns, read_edf),
+    '.set': (set_columns, read_set),
+    '.eea': (eea_columns, read_eea_frame),
+    '.npy': (npy_columns, read_npy),
+    '.parquet': (parquet_columns, read_parquet),
+}
+SIGNAL_EXTENSIONS = tuple(READERS)
+
+# 副檔名 -> 依序分塊讀取的函式 iter(path, columns, chunk_rows)；沒有註冊的格式以樣本範圍逐塊讀取
+CHUNK_READERS = {
+    '.eea': iter_eea,
+    '.parquet': iter_parquet,
+}
+
+
+def reader_for(path):
+    """
+    :return: (讀取 channel 名稱的函式, 讀取資料的函式)，不是已註冊的格式時回傳 None
+    """
+    return READERS.get(os.path.splitext(path)[1].lower())
+
+
+def read_signals(path, columns=None, start=0, stop=None):
+    """
+    以已註冊的讀取器讀取紀錄。
+    :param columns: 要讀的 channel（list 或 callable，與 pandas 的 usecols 相同），None 代表全部
+    :param start: 第一個樣本
+    :param stop: 結束樣本（不含），None 代表到檔案結尾
+    :return: DataFrame，欄位依檔案中的順序；已知取樣率時存放在 df.attrs['fs']
+    """
+    return reader_for(path)[1](path, resolve_columns(path, columns), start, stop)
+
+
+def resolve_columns(path, columns):
+    # callable 或 list 轉成依檔案中順序排列的 channel 名稱 list
+    if columns is None:
+        return None
+    names = reader_for(path)[0](path)
+    wanted = [c for c in names if columns(c)] if callable(columns) else columns
+    missing = [c for c in wanted if c not in names]
+    if missing:
+        raise ValueError(f"columns expected but not found: {missing}")
+    return [c for c in names if c in set(wanted)]
+
+
+def iter_signals(path, columns=None, chunk_rows=100_000):
+    """
+    依序分塊讀取整個紀錄，每塊最多 chunk_rows 列；Parquet 逐 batch 讀取，.eea 只解析一次。
+    """
+    columns = resolve_columns(path, columns)
+    chunk_reader = CHUNK_READERS.get(os.path.splitext(path)[1].lower())
+    if chunk_reader:
+        yield from chunk_reader(path, columns, chunk_rows)
+        return
+    read = reader_for(path)[1]
+    start = 0
+    while True:
+        df = read(path, columns, start, start + chunk_rows)
+        yield df
+        if len(df) < chunk_rows:
+            return
+        start += chunk_rows
@@ -0,0 +1,119 @@
+import numpy as np
+from scipy.integrate import simpson, trapezoid
+
+# 頻譜特徵註冊表：名稱 -> func(freqs, psd, band_powers)
+# psd 形狀為 (..., n_freqs)，band_powers 為 {頻段名稱: 形狀 (...) 的功率}
+# 所有特徵共用同一次計算好的 PSD，新增特徵不會多做 FFT
+SPECTRAL_FEATURES = {}
+
+
+def band_weights(freqs, band):
+    # 頻段積分（>=3 點用 simpson，否則 trapezoid）是線性的，
+    # 把它套在單位矩陣上就得到每個頻率點的積分權重
+    mask = np.logical_and(freqs >= band[0], freqs <= band[1])
+    weights = np.zeros(len(freqs))
+    eye = np.eye(np.sum(mask))
+    if np.sum(mask) >= 3:
+        weights[mask] = simpson(eye, x=freqs[mask], axis=-1)
+    elif np.sum(mask) > 0:
+        weights[mask] = trapezoid(eye, x=freqs[mask], axis=-1)
+    return weights
+
+
+def band_weight_matrix(freqs, bands):
+    """
+    :return: (n_freqs, n_bands) 權重矩陣，psd @ 權重 即得各頻段功率（順序同 bands）
+    """
+    return np.stack([band_weights(freqs, band) for band in bands.values()], axis=-1)
+
+
+def register_feature(name):
+    def decorator(func):
+        SPECTRAL_FEATURES[name] = func
+        return func
+    return decorator
+
+
+def get_band(band_powers, name):
+    # 兩支 EEG 程式的頻段名稱大小寫不同（delta / Delta），這裡不分大小寫
+    for key, value in band_powers.items():
+        if key.lower() == name.lower():
+            return np.asarray(value, dtype=float)
+    raise KeyError(name)
+
+
+@register_feature("SEF90")
+def spectral_edge_frequency(freqs, psd, band_powers, edge=0.9):
+    cumulative = np.cumsum(psd, axis=-1)
+    idx = np.argmax(cumulative >= edge * cumulative[..., -1:], axis=-1)
+    return freqs[idx]
+
+
+@register_feature("Peak Alpha Frequency")
+def peak_alpha_frequency(freqs, psd, band_powers, band=(8, 13)):
+    mask = (freqs >= band[0]) & (freqs <= band[1])
+    if not np.any(mask):
+        return np.full(psd.shape[:-1], np.nan)
+    return freqs[mask][np.argmax(psd[..., mask], axis=-1)]
+
+
+@register_feature("Spectral Entropy")
+def spectral_entropy(freqs, psd, band_powers):
+    if psd.shape[-1] <= 1:
+        # 只有一個頻率點時無法正規化（log2(1) = 0）
+        return np.full(psd.shape[:-1], np.nan)
+    total = np.sum(psd, axis=-1, keepdims=True)
+    p = np.divide(psd, total, out=np.zeros_like(psd, dtype=float), where=total > 0)
+    plogp = np.where(p > 0, p * np.log2(np.where(p > 0, p, 1)), 0)
+    # 正規化到 0~1
+    return -np.sum(plogp, axis=-1) / np.log2(psd.shape[-1])
+
+
+@register_feature("Aperiodic Slope")
+def aperiodic_slope(freqs, psd, band_powers, fit_range=(2, 40)):
+    # log10(PSD) 對 log10(f) 的最小平方斜率（1/f 指數的負值）
+    mask = (freqs >= fit_range[0]) & (freqs <= fit_range[1]) & (freqs > 0)
+    if np.sum(mask) < 2:
+        return np.full(psd.shape[:-1], np.nan)
+    x = np.log10(freqs[mask])
+    y = np.log10(np.maximum(psd[..., mask], np.finfo(float).tiny))
+    xc = x - x.mean()
+    return (y - y.mean(axis=-1, keepdims=True)) @ xc / (xc @ xc)
+
+
+def register_ratio(name, numerator, denominator):
+    def ratio(freqs, psd, band_powers):
+        num = sum(get_band(band_powers, b) for b in numerator)
+        den = sum(get_band(band_powers, b) for b in denominator)
+        return np.divide(num, den, out=np.full(np.shape(num), np.nan), where=den > 0)
+    SPECTRAL_FEATURES[name] = ratio
+    return ratio
+
+
+register_ratio("Theta/Beta", ("theta",), ("beta",))
+register_ratio("Theta/Alpha", ("theta",), ("alpha",))
+register_ratio("Alpha/Beta", ("alpha",), ("beta",))
+register_ratio("(Theta+Alpha)/Beta", ("theta", "alpha"), ("beta",))
+
+
+def compute_spectral_features(freqs, psd, band_powers, freq_range=None, names=None):
+    """
+    計算已註冊的頻譜特徵。
+    :param freq_range: (low, high)，只用此範圍內的 PSD 計算（頻段比值仍用 band_powers）
+    :param names: 要計算的特徵名稱，None 代表全部
+    :return: {特徵名稱: 形狀 (...) 的陣列}；缺少所需頻段的特徵回傳 NaN
+    """
+    freqs = np.asarray(freqs)
+    psd = np.asarray(psd, dtype=float)
+    if freq_range is not None:
+        mask = (freqs >= freq_range[0]) & (freqs <= freq_range[1])
+        freqs, psd = freqs[mask], psd[..., mask]
+
+    features = {}
+    for name in (names or SPECTRAL_FEATURES):
+        func = SPECTRAL_FEATURES[name]
+        try:
+            features[name] = func(freqs, psd, band_powers)
+        except KeyError:
+            features[name] = np.full(psd.shape[:-1], np.nan)
+    return features
@@ -0,0 +1,155 @@
+"""
+轉檔工具共用的輸出：可控制浮點數格式（例如 "%.6g"），CSV 可壓縮（gzip / zstd）；
+Excel 有 xlsxwriter 時以 constant_memory 模式逐列寫出，記憶體用量固定，
+超過 Excel 的列數上限時自動分成多個工作表，不會被截斷。
+xlsxwriter 為選用套件（pip install xlsxwriter）；沒有安裝時改用 openpyxl 寫出，結果相同但較慢、較耗記憶體。
+"""
+import re
+import gzip
+import numpy as np
+import pandas as pd
+
+EXCEL_MAX_ROWS = 1_048_576
+# 逐列寫入 Excel 時每次轉換的列數
+EXCEL_CHUNK_ROWS = 10_000
+
+# CSV 壓縮方式 -> 附加的副檔名
+CSV_COMPRESSIONS = {
+    None: '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+# 固定小數位數的格式，例如 "%.4f"
+_FIXED_FORMAT = re.compile(r'%\.(\d+)f')
+
+
+def parse_float_format(text):
+    """
+    介面輸入的浮點數格式：留白為 None（完整精度），整數 n 代表 n 位有效數字（"%.ng"），
+    其他為 printf 格式，例如 "%.4f"。
+    """
+    text = text.strip()
+    if not text:
+        return None
+    if text.isdigit():
+        return f"%.{int(text)}g"
+    try:
+        text % 1.0
+    except (TypeError, ValueError):
+        raise ValueError(f"浮點數格式不正確：{text}")
+    return text
+
+
+def csv_path(path_base, compression=None):
+    if compression not in CSV_COMPRESSIONS:
+        raise ValueError(f"不支援的壓縮方式：{compression}")
+    return path_base + '.csv' + CSV_COMPRESSIONS[compression]
+
+
+def open_csv(path, compression=None):
+    """
+    以文字模式開啟 CSV 輸出檔，可分塊呼叫 to_csv 寫入同一個檔案。
+    """
+    if compression is None:
+        # pandas 寫入檔案物件時需以 newline='' 開啟，否則 Windows 上會多出空行
+        return open(path, 'w', newline='', encoding='utf-8')
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', newline='', encoding='utf-8')
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.open(path, 'wt', newline='', encoding='utf-8')
+    raise ValueError(f"不支援的壓縮方式：{compression}")
+
+
+def write_csv(df, path, float_format=None, compression=None, header=True):
+    """
+    :param float_format: printf 格式，例如 "%.6g"；None 為完整精度
+    :return: path
+    """
+    with open_csv(path, compression) as f:
+        df.to_csv(f, float_format=float_format, header=header, index=False)
+    return path
+
+
+def format_floats(df, float_format):
+    # Excel 儲存的是數值，依 float_format 先四捨五入，檔案中的數字字串也會變短
+    if float_format is None:
+        return df
+    columns = df.select_dtypes(include=[np.floating]).columns
+    df = df.copy()
+    fixed = _FIXED_FORMAT.fullmatch(float_format)
+    if fixed:
+        # "%.Nf" 直接以數值四捨五入到 N 位小數，不必轉成字串再解析
+        df[columns] = df[columns].round(int(fixed.group(1)))
+        return df
+    # 有效位數（"%.6g"）等其他格式沒有對應的數值運算，仍經由字串轉換
+    for col in columns:
+        df[col] = np.char.mod(float_format, df[col].to_numpy()).astype(df[col].dtype)
+    return df
+
+
+def excel_sheets(n_rows, sheet_name='Sheet1', header=True, max_rows=EXCEL_MAX_ROWS):
+    """
+    :return: [(工作表名稱, 起始列, 結束列)]，每個工作表不超過 max_rows 列（含標題列）
+    """
+    per_sheet = max_rows - (1 if header else 0)
+    starts = range(0, n_rows, per_sheet) if n_rows else [0]
+    sheets = []
+    for i, start in enumerate(starts):
+        # 工作表名稱最多 31 個字元
+        name = sheet_name[:31] if i == 0 else f"{sheet_name[:31 - len(str(i + 1)) - 1]}_{i + 1}"
+        sheets.append((name, start, min(start + per_sheet, n_rows)))
+    return sheets
+
+
+def write_excel(df, path, float_format=None, header=True, sheet_name='Sheet1', max_rows=EXCEL_MAX_ROWS):
+    """
+    :param float_format: printf 格式，數值先依此四捨五入
+    :return: 寫出的工作表名稱
+    """
+    sheets = excel_sheets(len(df), sheet_name, header, max_rows)
+    try:
+        import xlsxwriter
+    except ImportError:
+        xlsxwriter = None
+
+    if xlsxwriter is None:
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            for name, start, stop in sheets:
+                format_floats(df.iloc[start:stop], float_format).to_excel(writer, sheet_name=name, index=False, header=header)
+        return [name for name, _, _ in sheets]
+
+    # constant_memory 模式每寫完一列就寫入暫存檔，必須依列順序寫出
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+    try:
+        for name, start, stop in sheets:
+            worksheet = workbook.add_worksheet(name)
+            row = 0
+            if header:
+                worksheet.write_row(0, 0, [str(c) for c in df.columns])
+                row = 1
+            for chunk_start in range(start, stop, EXCEL_CHUNK_ROWS):
+                block = format_floats(df.iloc[chunk_start:min(chunk_start + EXCEL_CHUNK_ROWS, stop)], float_format)
+                # 轉成 Python 型別，缺值寫成空白儲存格（與 pandas 相同）
+                block = block.astype(object).where(block.notna(), None)
+                for values in block.itertuples(index=False, name=None):
+                    worksheet.write_row(row, 0, values)
+                    row += 1
+    finally:
+        workbook.close()
+    return [name for name, _, _ in sheets]
+
+
+def write_table(df, path_base, fmt, float_format=None, compression=None, header=True):
+    """
+    :param fmt: 'csv' 或 'xlsx'
+    :param path_base: 不含副檔名的輸出路徑
+    :return: 寫出的檔案路徑
+    """
+    if fmt == 'csv':
+        return write_csv(df, csv_path(path_base, compression), float_format, compression, header)
+    if fmt == 'xlsx':
+        write_excel(df, path_base + '.xlsx', float_format, header)
+        return path_base + '.xlsx'
+    raise ValueError(f"不支援的輸出格式：{fmt}")
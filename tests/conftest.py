@@ -0,0 +1,20 @@
+import os
+import sys
+import importlib.util
+
+# 工具都是頂層模組（不是套件），測試直接從專案資料夾匯入
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'ECG batabast')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def load_script(name):
+    """
+    匯入檔名有空白的 GUI 腳本（例如 "EEG frequency_V2.py"），只執行 import 與函式定義。
+    """
+    spec = importlib.util.spec_from_file_location(os.path.splitext(name)[0].replace(' ', '_'),
+                                                  os.path.join(ROOT, name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
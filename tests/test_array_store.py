@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from array_store import FORMATS, load_frame, save_frame
+
+INDEXES = {
+    'numeric': np.arange(5) / 500.0,
+    'string': ['00:00:00', '00:00:01', '00:00:02', '00:00:03', '00:00:04'],
+}
+
+
+def frame(index=None):
+    df = pd.DataFrame({'Fp1_Alpha': np.linspace(-1, 1, 5), 'Fp2_Alpha': np.arange(5.0)})
+    if index is not None:
+        df.insert(0, 'Time', INDEXES[index])
+    return df
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+@pytest.mark.parametrize("index", [None, 'numeric', 'string'])
+def test_round_trip(tmp_path, fmt, index):
+    df = frame(index)
+    path = save_frame(df, str(tmp_path / "out"), fmt, index_column='Time' if index else None)
+    assert path.endswith(FORMATS[fmt])
+    back = load_frame(path, mmap=False)
+    assert list(back.columns) == list(df.columns)
+    np.testing.assert_allclose(back[['Fp1_Alpha', 'Fp2_Alpha']].to_numpy(dtype=float),
+                               df[['Fp1_Alpha', 'Fp2_Alpha']].to_numpy(), rtol=1e-6)
+    if index == 'numeric':
+        # index 欄位保留 float64，不跟著資料轉成 float32
+        np.testing.assert_array_equal(back['Time'].to_numpy(dtype=float), INDEXES['numeric'])
+    elif index == 'string':
+        assert [str(v) for v in back['Time']] == INDEXES['string']
+        assert all(isinstance(v, str) for v in back['Time'])
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        save_frame(frame(), str(tmp_path / "out"), 'xlsx')
@@ -0,0 +1,51 @@
+import pytest
+from bulk_convert import parse_sep, read_any, sniff_text
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize("text, sep, header", [
+    ("a,b,c\n1,2,3\n4,5,6\n", ",", True),
+    ("1,2,3\n4,5,6\n", ",", False),
+    ("x\ty\n0.1\t0.2\n0.3\t0.4\n", "\t", True),
+    ("1;2\n3;4\n", ";", False),
+])
+def test_sniff_delimiter_and_header(tmp_path, text, sep, header):
+    assert sniff_text(write(tmp_path, "a.txt", text)) == (sep, header)
+
+
+def test_sniff_whitespace_aligned_columns(tmp_path):
+    path = write(tmp_path, "a.txt", "   1.0    2.0   3.0\n  10.5   20.5  30.5\n")
+    assert sniff_text(path) == (r'\s+', False)
+    df, has_header = read_any(path)
+    assert not has_header
+    assert df.shape == (2, 3)
+    assert df.iloc[1].tolist() == [10.5, 20.5, 30.5]
+
+
+def test_sniff_single_column_and_empty(tmp_path):
+    assert sniff_text(write(tmp_path, "a.txt", "1\n2\n3\n")) == (",", False)
+    assert sniff_text(write(tmp_path, "b.txt", "")) == (",", False)
+
+
+def test_explicit_separator_keeps_first_row(tmp_path):
+    path = write(tmp_path, "a.txt", "a\tb\n1\t2\n")
+    df, has_header = read_any(path, sep="\t", header=False)
+    assert not has_header
+    assert df.iloc[0].tolist() == ["a", "b"]
+
+
+def test_sniff_ignores_truncated_last_line(tmp_path):
+    path = write(tmp_path, "a.txt", "t,v\n" + "0.5,1.5\n" * 100)
+    assert sniff_text(path, sample_bytes=30) == (",", True)
+
+
+def test_parse_sep():
+    assert parse_sep("") is None
+    assert parse_sep("auto") is None
+    assert parse_sep("\\t") == "\t"
+    assert parse_sep(";") == ";"
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from chunked_reader import read_chunks, stream_segments
+from segmentation import Segmentation
+
+
+def chunked(x, chunk_rows):
+    return (x[i:i + chunk_rows] for i in range(0, len(x), chunk_rows))
+
+
+def streamed_windows(x, chunk_rows, size, step, pad_tail=False):
+    windows = []
+    for block, segments in stream_segments(chunked(x, chunk_rows), size, step, pad_tail, pad_value=-1.0):
+        windows.extend(segments.view(block))
+    return np.array(windows).reshape((-1,) + x.shape[1:] + (size,))
+
+
+@pytest.mark.parametrize("n", [0, 5, 100, 1003])
+@pytest.mark.parametrize("chunk_rows", [1, 7, 64, 5000])
+@pytest.mark.parametrize("size, step", [(10, 10), (10, 3), (16, 20)])
+@pytest.mark.parametrize("pad_tail", [False, True])
+def test_stream_segments_match_whole_file(n, chunk_rows, size, step, pad_tail):
+    x = np.arange(n * 2, dtype=float).reshape(n, 2)
+    expected = Segmentation(n, size, overlap=size - step, overlap_unit="samples", pad_tail=pad_tail,
+                            pad_value=-1.0).view(x)
+    np.testing.assert_array_equal(streamed_windows(x, chunk_rows, size, step, pad_tail), expected)
+
+
+def test_read_chunks_csv(tmp_path):
+    df = pd.DataFrame({'a': np.arange(10.0), 'b': np.arange(10.0) * 2, 'c': 0})
+    df.loc[3, 'a'] = np.nan
+    path = str(tmp_path / "x.csv")
+    df.to_csv(path, index=False)
+    chunks = list(read_chunks(path, ['b', 'a'], chunk_rows=4))
+    assert [len(c) for c in chunks] == [3, 4, 2]
+    data = np.concatenate(chunks)
+    np.testing.assert_array_equal(data, df[['b', 'a']].dropna().to_numpy())
+    with pytest.raises(KeyError):
+        list(read_chunks(path, ['missing']))
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from column_select import match_columns, numeric_columns
+from rolling_moments import rolling_central_moments
+
+
+def test_match_columns():
+    columns = ['EEG Fp1', 'EEG Fp2', 'ECG', 3]
+    assert match_columns(columns) == columns
+    assert match_columns(columns, '') == columns
+    assert match_columns(columns, 'Fp') == ['EEG Fp1', 'EEG Fp2']
+    assert match_columns(columns, '^E.G$') == ['ECG']
+    # 數字欄位名稱以字串比對
+    assert match_columns(columns, '^3$') == [3]
+
+
+def test_numeric_columns():
+    df = pd.DataFrame({'Time': ['00:00', '00:01'], 'Fp1': [1.0, 2.0], 'Fp2': [1, 2], 'Flag': [True, False]})
+    assert numeric_columns(df) == ['Fp1', 'Fp2', 'Flag']
+    assert numeric_columns(df, '^Fp') == ['Fp1', 'Fp2']
+
+
+def test_moments_with_explicit_starts():
+    x = np.random.default_rng(0).standard_normal((400, 2))
+    starts = np.array([0, 50, 51, 300])
+    mean, m2, _, _ = rolling_central_moments(x, 100, None, starts=starts)
+    for i, s in enumerate(starts):
+        np.testing.assert_allclose(mean[i], x[s:s + 100].mean(axis=0))
+        np.testing.assert_allclose(m2[i], x[s:s + 100].var(axis=0))
@@ -0,0 +1,63 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import header_index
+from array_store import COLUMNAR_SUFFIX, load_columnar
+from columnar_convert import convert_file, convert_folder
+from data_loader import find_columnar, read_table
+
+
+@pytest.fixture
+def recording(tmp_path):
+    df = pd.DataFrame({'Time': ['a', 'b', 'c', 'd'], 'Fp1': [1.0, 2.0, 3.0, 4.0], 'Fp2': np.arange(4)})
+    path = str(tmp_path / "rec.csv")
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["npy", "parquet"])
+def test_convert_and_read_back(recording, fmt):
+    folder = convert_file(recording, fmt, fs=250, units='uV', log=lambda m: None)
+    assert folder.endswith(COLUMNAR_SUFFIX)
+    found = find_columnar(recording)
+    assert found and found[1]['fs'] == 250 and found[1]['skipped'] == ['Time']
+    df = load_columnar(folder, ['Fp2'])
+    assert df['Fp2'].tolist() == [0, 1, 2, 3]
+    # 型別與讀入時相同，不轉成浮點數
+    assert df['Fp2'].dtype == np.int64
+
+
+def test_read_table_prefers_fresh_columnar_twin(recording):
+    convert_file(recording, log=lambda m: None)
+    messages = []
+    assert read_table(recording, ['Fp1'], log=messages.append)['Fp1'].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert "columnar npy" in messages[0]
+    # 欄位式資料沒有非數值欄位，需要時改讀原始檔
+    assert read_table(recording, ['Time', 'Fp1'])['Time'].tolist() == ['a', 'b', 'c', 'd']
+
+
+def test_modified_source_makes_twin_stale(recording):
+    convert_file(recording, log=lambda m: None)
+    time.sleep(0.01)
+    pd.DataFrame({'Fp1': [9.0]}).to_csv(recording, index=False)
+    assert find_columnar(recording) is None
+    messages = []
+    assert read_table(recording, ['Fp1'], log=messages.append)['Fp1'].tolist() == [9.0]
+    assert "columnar" not in messages[0]
+    convert_file(recording, log=messages.append)
+    assert messages[-1].startswith("Converted")
+    convert_file(recording, log=messages.append)
+    assert messages[-1].startswith("Up to date")
+
+
+def test_convert_folder_skips_tool_outputs(recording, tmp_path, monkeypatch):
+    monkeypatch.setattr(header_index, "_output_files", set())
+    header_index.register_outputs("EEG_Band_Analysis_Results.xlsx")
+    pd.DataFrame({'x': [1.0]}).to_excel(tmp_path / "EEG_Band_Analysis_Results.xlsx", index=False)
+    (tmp_path / "~$rec.xlsx").write_bytes(b"lock")
+    logs = []
+    outputs = convert_folder(str(tmp_path), log=logs.append)
+    assert [os.path.basename(o) for o in outputs] == ["rec" + COLUMNAR_SUFFIX]
+    assert "Skipped EEG_Band_Analysis_Results.xlsx (output of an analysis tool)" in logs
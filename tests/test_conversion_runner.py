@@ -0,0 +1,51 @@
+import time
+import pytest
+from conversion_runner import BackgroundConversion, ConversionResult, format_summary, run_conversions, summarize
+
+
+def convert(path, suffix=""):
+    # 子行程會以 pickle 取得此函式，需在模組層級定義
+    if path.endswith("bad"):
+        raise ValueError("broken file")
+    time.sleep(0.05 if path == "a" else 0)
+    return f"{path}{suffix}"
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_results_in_input_order_and_errors_per_file(workers):
+    results = list(run_conversions(convert, ["a", "bad", "c"], ("!",), workers))
+    assert [r.path for r in results] == ["a", "bad", "c"]
+    assert [r.messages for r in results] == [["a!"], [], ["c!"]]
+    assert [r.error for r in results] == [None, "ValueError: broken file", None]
+
+
+def test_summary_counts_failures_and_throughput():
+    results = [ConversionResult("a", [], None, 0.1, 2_000_000), ConversionResult("b", [], "x", 0.1, 0)]
+    summary = summarize(results, 2.0)
+    assert summary == {'files': 2, 'failed': 1, 'seconds': 2.0, 'bytes': 2_000_000, 'files_per_s': 1.0,
+                       'mb_per_s': 1.0}
+    assert format_summary(summary) == "2 files (1 failed) in 2.0s: 1.00 files/s, 1.0 MB/s"
+    assert summarize([], 0)['files_per_s'] == 0.0
+
+
+class Widget:
+    # 代替 Tk 元件：after() 只記錄排程，由測試依序執行
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, interval, callback):
+        self.scheduled.append(callback)
+
+
+def test_background_conversion_reports_on_main_thread():
+    widget = Widget()
+    seen, done = [], []
+    BackgroundConversion(widget, convert, ["a", "bad"], workers=1, on_result=seen.append, on_done=done.append,
+                         interval=1)
+    deadline = time.monotonic() + 10
+    while not done and time.monotonic() < deadline:
+        widget.scheduled.pop(0)()
+        time.sleep(0.01)
+    assert [r.path for r in seen] == ["a", "bad"]
+    assert done[0]['files'] == 2 and done[0]['failed'] == 1
+    assert widget.scheduled == []
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_loader import read_columns, read_table
+
+
+@pytest.fixture
+def table(tmp_path):
+    df = pd.DataFrame({'Time': ['0', '1', '2'], 'EEG Fp1': [1.0, 2.0, 3.0], 'EEG Fp2': [4.0, 5.0, 6.0],
+                       'ECG': [7, 8, 9], 'Note': ['a', 'b', 'c']})
+    path = str(tmp_path / "rec.csv")
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_read_columns_selected(table):
+    df, cols = read_columns(table, ['EEG Fp2', 'Missing', 'ECG'])
+    assert sorted(df.columns) == ['ECG', 'EEG Fp2']
+    assert cols == ['EEG Fp2', 'ECG']
+
+
+@pytest.mark.parametrize("pattern, expected", [("", ['Time', 'EEG Fp1', 'EEG Fp2', 'ECG']), ("^EEG", ['EEG Fp1', 'EEG Fp2'])])
+def test_read_columns_all_numeric(table, pattern, expected):
+    df, cols = read_columns(table, [], all_columns=True, pattern=pattern)
+    assert cols == expected
+    np.testing.assert_array_equal(df['EEG Fp1'], [1.0, 2.0, 3.0])
+
+
+@pytest.mark.parametrize("engine", ["auto", "c", "pyarrow"])
+@pytest.mark.parametrize("columns", [['EEG Fp2', 'EEG Fp1'], lambda c: c.startswith('EEG')])
+def test_read_table_usecols(table, engine, columns):
+    df = read_table(table, columns, engine=engine)
+    assert list(df.columns) == ['EEG Fp1', 'EEG Fp2']
+    np.testing.assert_array_equal(df['EEG Fp2'], [4.0, 5.0, 6.0])
+
+
+def test_read_table_float32_keeps_text_columns(table):
+    df = read_table(table, dtype=np.float32)
+    assert df['EEG Fp1'].dtype == np.float32
+    assert df['ECG'].dtype == np.float32
+    assert df['Note'].tolist() == ['a', 'b', 'c']
+
+
+@pytest.mark.parametrize("start, stop, expected", [(0, None, [1, 2, 3]), (1, None, [2, 3]), (0, 2, [1, 2]), (1, 2, [2])])
+def test_read_table_row_range(table, start, stop, expected):
+    assert read_table(table, ['EEG Fp1'], start=start, stop=stop)['EEG Fp1'].tolist() == expected
+
+
+def test_read_table_logs_parse_time(table):
+    messages = []
+    read_table(table, ['ECG'], log=messages.append)
+    assert len(messages) == 1 and messages[0].startswith("Parsed rec.csv: 3 rows x 1 columns")
+
+
+def test_read_table_excel(tmp_path):
+    path = str(tmp_path / "rec.xlsx")
+    pd.DataFrame({'a': [1.0, 2.0], 'b': [3.0, 4.0]}).to_excel(path, index=False)
+    assert read_table(path, ['b'], dtype=np.float32)['b'].tolist() == [3.0, 4.0]
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from ecg_dataset import shrink_npy
+
+
+@pytest.mark.parametrize("shape, rows", [((10, 4, 12), 3), ((10, 4, 12), 10), ((5, 3), 0)])
+def test_shrink_npy_rewrites_header_in_place(tmp_path, shape, rows):
+    path = str(tmp_path / "records.npy")
+    data = np.arange(np.prod(shape), dtype=np.float32).reshape(shape)
+    array = np.lib.format.open_memmap(path, mode='w+', dtype=data.dtype, shape=shape)
+    array[:] = data
+    array.flush()
+    del array
+    with open(path, 'rb') as f:
+        np.lib.format.read_magic(f)
+        np.lib.format.read_array_header_1_0(f)
+        data_start = f.tell()
+
+    shrink_npy(path, rows)
+    shrunk = np.load(path)
+    assert shrunk.shape == (rows,) + shape[1:]
+    np.testing.assert_array_equal(shrunk, data[:rows])
+    with open(path, 'rb') as f:
+        np.lib.format.read_magic(f)
+        np.lib.format.read_array_header_1_0(f)
+        assert f.tell() == data_start
+        assert len(f.read()) == data[:rows].nbytes
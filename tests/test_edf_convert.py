@@ -0,0 +1,105 @@
+import os
+import sys
+import types
+import numpy as np
+import pandas as pd
+import pytest
+from array_store import columnar_path, load_columnar
+from edf_convert import convert_edf_file, edf_channels, iter_edf_chunks
+
+RECORDS = 5
+
+
+class FakeEdf:
+    # 只實作 edf_convert 用到的 pyedflib.EdfReader 介面，每個 data record 為 1 秒
+    files = {}
+
+    def __init__(self, path):
+        self.signals, self.fail_after = self.files[path]
+        self.datarecords_in_file = RECORDS if self.signals else 0
+        self.signals_in_file = len(self.signals)
+        self.reads = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def getNSamples(self):
+        return np.array([len(x) for _, _, x in self.signals])
+
+    def getSignalLabel(self, i):
+        return self.signals[i][0]
+
+    def getSampleFrequency(self, i):
+        return self.signals[i][1]
+
+    def getPhysicalDimension(self, i):
+        return 'uV'
+
+    def readSignal(self, i, start, n):
+        self.reads += 1
+        if self.fail_after is not None and self.reads > self.fail_after:
+            raise OSError("read error")
+        return self.signals[i][2][start:start + n]
+
+
+@pytest.fixture
+def fake_edf(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, 'pyedflib', types.SimpleNamespace(EdfReader=FakeEdf))
+    rng = np.random.default_rng(0)
+    signals = [('EEG', 256.0, rng.standard_normal(256 * RECORDS)),
+               ('EMG', 512.0, rng.standard_normal(512 * RECORDS)),
+               ('Resp', 32.0, rng.standard_normal(32 * RECORDS))]
+
+    def make(name, fail_after=None, channels=signals):
+        path = str(tmp_path / name)
+        FakeEdf.files[path] = (channels, fail_after)
+        return path
+    yield make, signals
+    FakeEdf.files.clear()
+
+
+def test_channels_and_chunks(fake_edf):
+    make, signals = fake_edf
+    edf = FakeEdf(make('rec.edf'))
+    channels = edf_channels(edf)
+    assert [(c['label'], c['fs'], c['per_record']) for c in channels] == [('EEG', 256.0, 256), ('EMG', 512.0, 512),
+                                                                          ('Resp', 32.0, 32)]
+    chunks = list(iter_edf_chunks(edf, channels, chunk_records=2))
+    assert [len(chunk[2]) for chunk in chunks] == [64, 64, 32]
+    for i, (_, _, x) in enumerate(signals):
+        np.testing.assert_array_equal(np.concatenate([chunk[i] for chunk in chunks]), x)
+
+
+def test_empty_edf_is_rejected(fake_edf):
+    make, _ = fake_edf
+    with pytest.raises(ValueError):
+        edf_channels(FakeEdf(make('empty.edf', channels=[])))
+
+
+def test_group_mode_writes_one_file_per_rate(fake_edf, tmp_path):
+    make, signals = fake_edf
+    out = tmp_path / "out"
+    out.mkdir()
+    paths = convert_edf_file(make('rec.edf'), str(out), columnar=True, chunk_records=2)
+    assert sorted(os.path.basename(p) for p in paths) == sorted(
+        ['rec_256Hz.csv', 'rec_256Hz.columnar', 'rec_512Hz.csv', 'rec_512Hz.columnar', 'rec_32Hz.csv',
+         'rec_32Hz.columnar'])
+    for label, fs, x in signals:
+        csv = out / f'rec_{fs:g}Hz.csv'
+        np.testing.assert_allclose(pd.read_csv(csv)[label].to_numpy(), x)
+        np.testing.assert_array_equal(load_columnar(columnar_path(str(csv)))[label].to_numpy(), x)
+
+
+@pytest.mark.parametrize("mixed_rates", ['group', 'resample'])
+def test_failed_conversion_removes_partial_outputs(fake_edf, tmp_path, mixed_rates):
+    make, _ = fake_edf
+    out = tmp_path / "out"
+    out.mkdir()
+    # 第二塊讀到一半失敗，各輸出檔都已寫入第一塊
+    with pytest.raises(OSError):
+        convert_edf_file(make('rec.edf', fail_after=4), str(out), columnar=True, chunk_records=2,
+                         mixed_rates=mixed_rates)
+    assert os.listdir(out) == []
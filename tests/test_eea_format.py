@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from conftest import load_script
+from eea_format import EEA_CHANNELS, channel_names, parse_values, read_eea
+
+
+def test_channel_names():
+    assert channel_names() == list(EEA_CHANNELS)
+    assert channel_names(3) == ["Ch1", "Ch2", "Ch3"]
+    assert channel_names(2, ["a", "b"]) == ["a", "b"]
+    with pytest.raises(ValueError):
+        channel_names(3, ["a", "b"])
+
+
+def test_parse_values_accepts_any_separator():
+    raw = b"1,2, 3\r\n4\t5,,6\n"
+    np.testing.assert_array_equal(parse_values(raw), [1, 2, 3, 4, 5, 6])
+    with pytest.raises(ValueError):
+        parse_values(b"1,abc,3")
+
+
+def test_read_eea_is_channel_major(tmp_path):
+    values = np.arange(12, dtype=float)
+    path = tmp_path / "rec.eea"
+    path.write_text(",".join(f"{v:g}" for v in values))
+    data = read_eea(str(path), num_channels=3, samples_per_channel=4)
+    np.testing.assert_array_equal(data, values.reshape(3, 4).T)
+    # 每個 channel 的樣本數由總筆數推算
+    np.testing.assert_array_equal(read_eea(str(path), num_channels=3, samples_per_channel=None), data)
+    with pytest.raises(ValueError):
+        read_eea(str(path), num_channels=5, samples_per_channel=None)
+    with pytest.raises(ValueError):
+        read_eea(str(path), num_channels=3, samples_per_channel=5)
+
+
+class Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+@pytest.fixture
+def app():
+    gui = load_script("eea to csv or excel_gui.py.py")
+    app = gui.App.__new__(gui.App)
+    app.num_channels = Var(str(len(EEA_CHANNELS)))
+    app.channel_names = Var(",".join(EEA_CHANNELS))
+    app.default_names = app.channel_names.get()
+    return app
+
+
+def change_count(app, value):
+    app.num_channels.set(value)
+    app.update_default_names()
+
+
+def test_default_names_follow_channel_count(app):
+    change_count(app, "")
+    change_count(app, "8")
+    assert app.channel_names.get() == ",".join(channel_names(8))
+    change_count(app, "16")
+    assert app.channel_names.get() == ",".join(EEA_CHANNELS)
+
+
+def test_edited_names_are_kept(app):
+    app.channel_names.set("a,b,c")
+    change_count(app, "3")
+    assert app.channel_names.get() == "a,b,c"
@@ -0,0 +1,29 @@
+import numpy as np
+from scipy.signal import welch
+from conftest import load_script
+
+eeg = load_script("EEG frequency_V2.py")
+
+
+def test_vectorised_band_power_matches_window_loop():
+    fs, size, step = 250, 500, 250
+    data = np.random.default_rng(0).standard_normal((3, 10 * fs))
+    power = eeg.multichannel_band_power(data, fs, size, step)
+    for ch in range(3):
+        per_window = []
+        for start in range(0, data.shape[1] - size + 1, step):
+            freqs, psd = welch(data[ch, start:start + size], fs=fs, nperseg=size)
+            per_window.append([eeg.band_power(freqs, psd, band) for band in eeg.bands.values()])
+        np.testing.assert_allclose(power[ch], np.mean(per_window, axis=0))
+
+
+def test_band_power_with_fewer_than_three_bins():
+    freqs = np.array([0.0, 1.0, 2.0, 3.0])
+    psd = np.array([1.0, 2.0, 4.0, 8.0])
+    assert eeg.band_power(freqs, psd, (1, 2)) == 3.0
+
+
+def test_short_recording_gives_nan():
+    power = eeg.multichannel_band_power(np.ones((2, 100)), 250, 500, 250)
+    assert power.shape == (2, len(eeg.bands))
+    assert np.isnan(power).all()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import load_script
+
+windon = load_script("EEG frequency_windon.py")
+BANDS = {'delta': (0.5, 4), 'theta': (4, 8), 'alpha': (8, 13), 'beta': (13, 30)}
+
+
+@pytest.fixture
+def app():
+    # 不建立 Tk 視窗，只測試計算的部分
+    app = windon.EEGAnalysisGUI.__new__(windon.EEGAnalysisGUI)
+    app.messages = []
+    app.log_message = app.messages.append
+    return app
+
+
+@pytest.fixture
+def recording(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.standard_normal((2000, 3)), columns=['Fp1', 'Fp2', 'Cz'])
+    path = str(tmp_path / "rec.csv")
+    df.to_csv(path, index=False)
+    return path, df
+
+
+@pytest.mark.parametrize("sliding", [False, True])
+def test_file_is_read_once_for_all_channels(app, recording, monkeypatch, sliding):
+    path, df = recording
+    calls = []
+    read_table = windon.read_table
+    monkeypatch.setattr(windon, "read_table", lambda *a, **k: calls.append(a) or read_table(*a, **k))
+    results, messages = app.analyze_file(path, ['Fp1', 'Cz'], BANDS, 250, sliding, 2, 50, False)
+    assert len(calls) == 1
+    assert list(results) == ['Fp1', 'Cz']
+    assert messages == ["Processed rec.csv Column Fp1", "Processed rec.csv Column Cz"]
+    for col in results:
+        x = df[col].to_numpy(dtype=np.float32)
+        if sliding:
+            expected = app.compute_sliding_band_power(x, BANDS, 250, windon.Segmentation(len(x), 500, 50), False)
+        else:
+            expected = app.compute_band_power(x, BANDS, 250)
+        assert results[col].keys() == expected.keys()
+        np.testing.assert_allclose(list(results[col].values()), list(expected.values()))
+
+
+def test_relative_power_of_a_pure_alpha_tone(app):
+    t = np.arange(2500) / 250
+    result = app.compute_band_power(np.sin(2 * np.pi * 10 * t), BANDS, 250)
+    relative = {band: result[f"{band.capitalize()} Band Relative Power"] for band in BANDS}
+    assert max(relative, key=relative.get) == 'alpha'
+    assert relative['delta'] < 1e-3 * relative['alpha']
@@ -0,0 +1,58 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from feature_pipeline import plan_columns, process_file, run_pipeline, write_results
+
+PLAN = {
+    "columns": ["Fp1", "Fp2"],
+    "fs": 250,
+    "window": {"size": 500, "overlap": 50},
+    "extractors": {
+        "time": {"features": ["Mean", "Std", "RMS"]},
+        "spectral": {"bands": {"Theta": [4, 8], "Alpha": [8, 13]}},
+        "correlation": {"pairs": [["Fp1", "Cz"]]},
+    },
+}
+
+
+@pytest.fixture
+def folder(tmp_path):
+    rng = np.random.default_rng(0)
+    for name in ("a.csv", "b.csv"):
+        df = pd.DataFrame(rng.standard_normal((3000, 3)), columns=["Fp1", "Fp2", "Cz"])
+        df.to_csv(tmp_path / name, index=False)
+    return tmp_path
+
+
+def test_plan_columns_keeps_order():
+    assert plan_columns(PLAN) == ["Fp1", "Fp2", "Cz"]
+
+
+@pytest.mark.parametrize("chunk_rows", [128, 1000, 10000])
+def test_streaming_matches_whole_file(folder, chunk_rows):
+    path = str(folder / "a.csv")
+    whole = process_file(path, PLAN)
+    streamed = process_file(path, dict(PLAN, chunk_rows=chunk_rows))
+    assert whole.keys() == streamed.keys()
+    for key in whole:
+        np.testing.assert_allclose(streamed[key], whole[key], rtol=1e-9, atol=1e-12)
+
+
+def test_time_features_match_direct_computation(folder):
+    results = process_file(str(folder / "a.csv"), PLAN)
+    x = pd.read_csv(folder / "a.csv")["Fp1"].to_numpy()
+    windows = np.array([x[s:s + 500] for s in range(0, len(x) - 500 + 1, 250)])
+    np.testing.assert_allclose(results["Fp1 Mean"], windows.mean(axis=1))
+    np.testing.assert_allclose(results["Fp1 Std"], windows.std(axis=1, ddof=1))
+
+
+def test_output_in_input_folder_is_not_read(folder):
+    output = str(folder / "features.xlsx")
+    messages = []
+    for _ in range(2):
+        summary, segments = run_pipeline(str(folder), PLAN, output, log=messages.append, use_cache=False)
+        write_results(output, summary, segments)
+    assert [row["File"] for row in summary] == ["a.csv", "b.csv"]
+    assert not any("features.xlsx" in m for m in messages)
+    assert os.path.exists(output)
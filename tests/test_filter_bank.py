@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfiltfilt
+from filter_bank import FilterBank, design_bandpass_sos
+
+BANDS = {'Delta': (0.5, 4), 'Alpha': (8, 13), 'Beta': (13, 25)}
+
+
+def test_design_is_cached():
+    assert design_bandpass_sos(8.0, 13.0, 250) is design_bandpass_sos(8.0, 13.0, 250)
+    np.testing.assert_array_equal(design_bandpass_sos(8.0, 13.0, 250),
+                                  butter(4, [8, 13], btype='band', fs=250, output='sos'))
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+def test_apply_matches_sosfiltfilt(n_jobs):
+    data = np.random.default_rng(0).standard_normal((4, 2000))
+    bank = FilterBank(BANDS, 250, n_jobs=n_jobs)
+    out = bank.apply(data)
+    assert list(out) == list(BANDS)
+    for name, (lo, hi) in BANDS.items():
+        np.testing.assert_allclose(out[name], sosfiltfilt(design_bandpass_sos(lo, hi, 250), data, axis=-1))
+
+
+def test_apply_along_first_axis():
+    data = np.random.default_rng(1).standard_normal((2000, 2))
+    out = FilterBank(BANDS, 250).apply(data, axis=0)
+    np.testing.assert_allclose(out['Alpha'], FilterBank(BANDS, 250).apply(data.T)['Alpha'].T)
+
+
+@pytest.mark.parametrize("chunk", [1, 37, 500, 5000])
+def test_stream_matches_one_shot_sosfilt(chunk):
+    data = np.random.default_rng(2).standard_normal((3, 3000)) + 5.0
+    bank = FilterBank(BANDS, 250)
+    blocks = list(bank.stream(data[:, i:i + chunk] for i in range(0, data.shape[1], chunk)))
+    for name, sos in bank.sos.items():
+        zi = sosfilt_zi(sos)[:, None, :] * data[None, :, :1]
+        expected, _ = sosfilt(sos, data, axis=-1, zi=zi)
+        np.testing.assert_allclose(np.concatenate([b[name] for b in blocks], axis=-1), expected, atol=1e-12)
+
+
+def test_stream_single_channel_chunks():
+    x = np.random.default_rng(3).standard_normal(1000)
+    bank = FilterBank({'Alpha': (8, 13)}, 250)
+    out = np.concatenate([b['Alpha'] for b in bank.stream([x[:400], x[400:]])], axis=-1)
+    assert out.shape == (1, 1000)
@@ -0,0 +1,117 @@
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import header_index
+from array_store import save_frame
+from data_loader import read_table
+from header_index import INDEX_FILE, HeaderIndex, dedupe, list_data_files, read_header
+
+
+@pytest.fixture
+def folder(tmp_path):
+    pd.DataFrame({'Fp1': [1.0], 'Fp2': [2.0]}).to_csv(tmp_path / "a.csv", index=False)
+    pd.DataFrame({'Fp1': [1.0], 'Cz': [2.0]}).to_excel(tmp_path / "b.xlsx", index=False)
+    (tmp_path / "notes.txt").write_text("not data")
+    return tmp_path
+
+
+def test_dedupe_matches_pandas(tmp_path):
+    header = ['x', 'x', '', 'x', None]
+    path = tmp_path / "d.csv"
+    path.write_text("x,x,,x,\n1,2,3,4,5\n")
+    assert dedupe(header) == list(pd.read_csv(path).columns)
+
+
+@pytest.mark.parametrize("name", ["a.csv", "b.xlsx"])
+def test_read_header_matches_pandas(folder, name):
+    path = str(folder / name)
+    df = pd.read_csv(path) if name.endswith('.csv') else pd.read_excel(path)
+    assert read_header(path) == list(df.columns)
+
+
+def test_scan_and_missing(folder):
+    index = HeaderIndex(str(folder))
+    assert index.files == ["a.csv", "b.xlsx"]
+    assert index.columns() == ["Fp1", "Fp2"]
+    assert index.columns("b.xlsx") == ["Fp1", "Cz"]
+    assert index.missing(["fp1", "CZ"], key=str.upper) == {"a.csv": ["CZ"]}
+
+
+def test_persisted_index_is_reused_until_file_changes(folder, monkeypatch):
+    HeaderIndex(str(folder))
+    with open(folder / INDEX_FILE, encoding='utf-8') as f:
+        assert set(json.load(f)) == {"a.csv", "b.xlsx"}
+
+    # 新的行程（記憶體快取清空）只讀索引檔，不重讀標題列
+    monkeypatch.setattr(header_index, "_cache", {})
+    reads = []
+    original = header_index.read_header
+    monkeypatch.setattr(header_index, "read_header", lambda p: reads.append(os.path.basename(p)) or original(p))
+    HeaderIndex(str(folder))
+    assert reads == []
+
+    time.sleep(0.01)
+    pd.DataFrame({'Pz': [1.0]}).to_csv(folder / "a.csv", index=False)
+    index = HeaderIndex(str(folder))
+    assert reads == ["a.csv"]
+    assert index.columns("a.csv") == ["Pz"]
+
+
+def test_unreadable_file_is_reported(folder):
+    (folder / "broken.xlsx").write_bytes(b"not a workbook")
+    index = HeaderIndex(str(folder), persist=False)
+    assert "broken.xlsx" in index.errors
+    assert "broken.xlsx" not in index.files
+
+
+@pytest.fixture
+def outputs(monkeypatch):
+    monkeypatch.setattr(header_index, "_output_files", set())
+    monkeypatch.setattr(header_index, "_output_suffixes", set())
+    return header_index.register_outputs
+
+
+def test_registered_outputs_are_skipped_and_logged(folder, outputs):
+    pd.DataFrame({'x': [1.0]}).to_excel(folder / "NLID_Results_Avg.xlsx", index=False)
+    pd.DataFrame({'x': [1.0]}).to_csv(folder / "a_relative_band_power.csv", index=False)
+    # 沒有登記時是一般的紀錄
+    assert "a_relative_band_power.csv" in list_data_files(str(folder))
+
+    outputs("NLID_Results_Avg.xlsx", suffixes=("_relative_band_power",))
+    logs = []
+    assert list_data_files(str(folder), log=logs.append) == ["a.csv", "b.xlsx"]
+    assert logs == ["Skipped NLID_Results_Avg.xlsx (output of an analysis tool)",
+                    "Skipped a_relative_band_power.csv (output of an analysis tool)"]
+    logs.clear()
+    assert HeaderIndex(str(folder), persist=False, log=logs.append).files == ["a.csv", "b.xlsx"]
+    assert len(logs) == 2
+
+
+def test_exclude_and_lock_files(folder, outputs):
+    (folder / "~$b.xlsx").write_bytes(b"lock")
+    assert list_data_files(str(folder), exclude=(str(folder / "a.csv"),), full_path=True) == [str(folder / "b.xlsx")]
+
+
+def test_only_save_frame_index_files_are_skipped(folder, outputs):
+    df = pd.DataFrame({'time': [0.0, 0.5], 'Fp1': [1.0, 2.0]})
+    save_frame(df, str(folder / "rec"), 'npy', index_column='time')
+    # 名稱剛好以 .index.npy 結尾、但不是 save_frame 輔助檔的紀錄照常列出
+    np.save(folder / "session.index.npy", np.zeros((2, 2)))
+    files = list_data_files(str(folder))
+    assert "rec.npy" in files and "rec.index.npy" not in files
+    assert "session.index.npy" in files
+
+
+def test_numeric_excel_headers_match_read_table(tmp_path):
+    path = str(tmp_path / "n.xlsx")
+    pd.DataFrame([[1.0, 2.0, 3.0]], columns=[1, 'Fp1', 2.5]).to_excel(path, index=False)
+    header = read_header(path)
+    assert header == ['1', 'Fp1', '2.5']
+    assert list(read_table(path).columns) == header
+    assert list(read_table(path, ['2.5', '1']).columns) == ['1', '2.5']
+    assert list(read_table(path, lambda c: c == '1').columns) == ['1']
+    with pytest.raises(ValueError):
+        read_table(path, ['3'])
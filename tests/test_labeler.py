@@ -0,0 +1,50 @@
+import os
+import pytest
+from conftest import load_script
+
+labeler = load_script("ECG 12-Lead CSV Labeler.py")
+HEADER = ",".join(labeler.ecg_leads)
+ROW = ",".join(str(i) for i in range(12))
+
+
+def label(tmp_path, content):
+    path = tmp_path / "rec.csv"
+    path.write_bytes(content)
+    out = tmp_path / "out"
+    out.mkdir(exist_ok=True)
+    message = labeler.label_file(str(path), str(out))
+    return message, (out / "rec_labeled.csv").read_bytes()
+
+
+def test_headerless_file_gets_lead_names(tmp_path):
+    body = f"{ROW}\n1.50,-2,{','.join(['0'] * 10)}\n".encode()
+    message, data = label(tmp_path, body)
+    assert message == "Labeled rec_labeled.csv"
+    # 資料原樣複製，數值字串不會被改寫
+    assert data == (HEADER + "\n").encode() + body
+
+
+def test_existing_header_is_replaced(tmp_path):
+    old = ",".join(f"lead{i}" for i in range(12))
+    _, data = label(tmp_path, f"\ufeff{old}\n{ROW}\n".encode())
+    assert data == f"{HEADER}\n{ROW}\n".encode()
+
+
+def test_crlf_line_endings_are_kept(tmp_path):
+    _, data = label(tmp_path, f"{ROW}\r\n{ROW}\r\n".encode())
+    assert data == f"{HEADER}\r\n{ROW}\r\n{ROW}\r\n".encode()
+
+
+def test_wrong_column_count_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="expected 12 columns, found 3"):
+        label(tmp_path, b"1,2,3\n4,5,6\n")
+    assert not (tmp_path / "out" / "rec_labeled.csv").exists()
+
+
+def test_process_folder_counts_skipped_files(tmp_path):
+    (tmp_path / "a.csv").write_text(f"{ROW}\n")
+    (tmp_path / "b.csv").write_text("1,2\n")
+    (tmp_path / "notes.txt").write_text("x")
+    processed, skipped, output = labeler.process_folder(str(tmp_path), workers=1)
+    assert (processed, skipped) == (1, 1)
+    assert os.listdir(output) == ["a_labeled.csv"]
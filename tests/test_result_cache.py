@@ -0,0 +1,88 @@
+import os
+import time
+import numpy as np
+import pytest
+import segmentation
+from result_cache import CACHE_DIR, ResultCache, code_version
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "rec.csv"
+    path.write_text("a\n1\n")
+    return str(path)
+
+
+def counting(value):
+    calls = []
+    return calls, lambda: calls.append(1) or value
+
+
+def test_second_run_uses_cache(data_file, tmp_path):
+    calls, compute = counting({'x': 1})
+    for _ in range(2):
+        cache = ResultCache(str(tmp_path), "test", {"m": 2}, "v1")
+        assert cache.cached(data_file, compute) == {'x': 1}
+    assert len(calls) == 1
+    assert cache.summary() == "1 cached, 0 computed"
+    assert os.path.isdir(tmp_path / CACHE_DIR / "test")
+
+
+@pytest.mark.parametrize("change", ["params", "version", "analysis"])
+def test_params_version_or_analysis_change_invalidates(data_file, tmp_path, change):
+    calls, compute = counting(1)
+    ResultCache(str(tmp_path), "test", {"m": 2}, "v1").cached(data_file, compute)
+    args = {"analysis": "test", "params": {"m": 2}, "version": "v1"}
+    args[change] = {"params": {"m": 3}, "version": "v2", "analysis": "other"}[change]
+    ResultCache(str(tmp_path), args["analysis"], args["params"], args["version"]).cached(data_file, compute)
+    assert len(calls) == 2
+
+
+def test_modified_file_invalidates(data_file, tmp_path):
+    calls, compute = counting(1)
+    ResultCache(str(tmp_path), "test", {}, "v1").cached(data_file, compute)
+    time.sleep(0.01)
+    with open(data_file, 'a') as f:
+        f.write("2\n")
+    ResultCache(str(tmp_path), "test", {}, "v1").cached(data_file, compute)
+    assert len(calls) == 2
+
+
+def test_content_hash_ignores_touch(data_file, tmp_path):
+    calls, compute = counting(1)
+    ResultCache(str(tmp_path), "test", {}, "v1", hash_contents=True).cached(data_file, compute)
+    os.utime(data_file, ns=(0, 0))
+    ResultCache(str(tmp_path), "test", {}, "v1", hash_contents=True).cached(data_file, compute)
+    assert len(calls) == 1
+
+
+def test_errors_are_not_cached_and_disabled_cache_always_computes(data_file, tmp_path):
+    cache = ResultCache(str(tmp_path), "test", {}, "v1")
+    with pytest.raises(ZeroDivisionError):
+        cache.cached(data_file, lambda: 1 / 0)
+    assert cache.cached(data_file, lambda: 5) == 5
+    calls, compute = counting(1)
+    disabled = ResultCache(str(tmp_path), "test", {}, "v1", enabled=False)
+    disabled.cached(data_file, compute)
+    disabled.cached(data_file, compute)
+    assert len(calls) == 2
+
+
+def test_code_version_follows_source_changes(tmp_path):
+    script = tmp_path / "tool.py"
+    script.write_text("x = 1\n")
+    first = code_version(str(script))
+    assert code_version(str(script)) == first
+    script.write_text("x = 2\n")
+    assert code_version(str(script)) != first
+    # 本地模組與其所在檔案相同
+    assert code_version(str(script), segmentation.Segmentation) == code_version(str(script), segmentation.__file__)
+
+
+def test_code_version_uses_third_party_package_version(tmp_path, monkeypatch):
+    script = tmp_path / "tool.py"
+    script.write_text("x = 1\n")
+    before = code_version(str(script), np, np.fft.fft)
+    assert before != code_version(str(script))
+    monkeypatch.setattr(np, "__version__", "0.0.0")
+    assert code_version(str(script), np) != before
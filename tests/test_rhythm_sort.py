@@ -0,0 +1,48 @@
+import os
+import pandas as pd
+import pytest
+from rhythm_sort import apply_plan, build_plan
+
+
+@pytest.fixture
+def folder(tmp_path):
+    source = tmp_path / "labeled_output"
+    source.mkdir()
+    for name in ("A.csv", "B.csv", "C.CSV"):
+        (source / name).write_text("1\n")
+    pd.DataFrame({'FileName': ["A", "c.csv", "missing", " "]}).to_csv(tmp_path / "SR.csv", index=False)
+    pd.DataFrame({'FileName': ["B.csv", "A.csv", "B"]}).to_csv(tmp_path / "SB.csv", index=False)
+    return tmp_path
+
+
+def config(folder, mode):
+    return {'source_folder': str(folder / "labeled_output"), 'target_folder': str(folder / "sorted"),
+            'file_column': 'FileName', 'extension': '.csv', 'mode': mode,
+            'classes': {'SR': str(folder / "SR.csv"), 'SB': str(folder / "SB.csv")}}
+
+
+def test_build_plan_move(folder):
+    plan = build_plan(config(folder, 'move'))
+    actions = [(c, os.path.basename(src), os.path.relpath(dst, folder)) for c, src, dst in plan['actions']]
+    assert actions == [('SR', 'A.csv', os.path.join('sorted', 'SR', 'A.csv')),
+                       ('SR', 'C.CSV', os.path.join('sorted', 'SR', 'C.CSV')),
+                       ('SB', 'B.csv', os.path.join('sorted', 'SB', 'B.csv'))]
+    assert plan['missing'] == {'SR': ['missing.csv']}
+    assert plan['duplicates'] == {'A.csv': ['SR', 'SB'], 'B.csv': ['SB', 'SB']}
+
+
+def test_build_plan_link_keeps_every_class(folder):
+    plan = build_plan(config(folder, 'hardlink'))
+    assert [(c, os.path.basename(src)) for c, src, _ in plan['actions']] == [
+        ('SR', 'A.csv'), ('SR', 'C.CSV'), ('SB', 'B.csv'), ('SB', 'A.csv')]
+
+
+def test_apply_plan_move_and_hardlink(folder):
+    plan = build_plan(config(folder, 'hardlink'))
+    assert apply_plan(plan, 'hardlink') == {'SR': 2, 'SB': 2}
+    assert os.path.samefile(folder / "labeled_output" / "A.csv", folder / "sorted" / "SB" / "A.csv")
+    # 先前以硬連結分類過的檔案改為移動時，只移除來源
+    plan = build_plan(config(folder, 'move'))
+    assert apply_plan(plan, 'move') == {'SR': 2, 'SB': 1}
+    assert sorted(os.listdir(folder / "labeled_output")) == []
+    assert sorted(os.listdir(folder / "sorted" / "SR")) == ['A.csv', 'C.CSV']
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from scipy.stats import skew
+from rolling_moments import rolling_central_moments, rolling_moments
+from segmentation import window_starts
+
+
+@pytest.mark.parametrize("offset", [0.0, 1e6])
+def test_prefix_matches_direct(offset):
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((5000, 3)) + offset
+    prefix = rolling_central_moments(x, 256, 100, method="prefix")
+    direct = rolling_central_moments(x, 256, 100, method="direct")
+    for a, b in zip(prefix, direct):
+        np.testing.assert_allclose(a, b, rtol=1e-6, atol=1e-9)
+
+
+def test_constant_windows_fall_back_to_direct():
+    x = np.concatenate((np.full(300, 3.0), np.random.default_rng(1).standard_normal(300)))
+    mean, m2, m3, m4 = rolling_central_moments(x, 100, 50)
+    assert np.all(mean[:5] == 3.0)
+    assert np.all(m2[:5] == 0.0)
+
+
+def test_rolling_moments_matches_pandas_and_scipy():
+    x = np.random.default_rng(2).standard_normal(1000)
+    means, stds, skews = rolling_moments(x, 100, 40)
+    starts = window_starts(len(x), 100, 40)
+    windows = [x[s:s + 100] for s in starts]
+    np.testing.assert_allclose(means, [w.mean() for w in windows])
+    np.testing.assert_allclose(stds, [w.std(ddof=1) for w in windows])
+    np.testing.assert_allclose(skews, [skew(w) for w in windows], rtol=1e-7, atol=1e-12)
+
+
+def test_signal_shorter_than_window():
+    mean, m2, m3, m4 = rolling_central_moments(np.arange(5.0), 10, 1)
+    assert mean.shape == (0,)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from segmentation import Segmentation, step_size, strided_windows, to_samples, window_starts
+
+
+def test_to_samples_and_step_size():
+    assert to_samples(2, fs=250, unit="seconds") == 500
+    assert to_samples(10.7) == 10
+    assert step_size(100, 50) == 50
+    assert step_size(100, 0.25, "ratio") == 75
+    assert step_size(100, 30, "samples") == 70
+    with pytest.raises(ValueError):
+        step_size(100, 100)
+    with pytest.raises(ValueError):
+        to_samples(1, unit="seconds")
+
+
+@pytest.mark.parametrize("n, size, step", [(100, 10, 10), (100, 10, 3), (9, 10, 5), (10, 10, 1)])
+def test_window_starts_matches_range(n, size, step):
+    expected = [i * step for i in range((n - size) // step + 1)] if n >= size else []
+    assert window_starts(n, size, step).tolist() == expected
+
+
+def test_view_is_strided_without_copy():
+    x = np.arange(50.0)
+    seg = Segmentation(len(x), 10, overlap=50)
+    windows = seg.view(x)
+    assert windows.shape == (9, 10)
+    assert np.shares_memory(windows, x)
+    assert windows[3].tolist() == x[15:25].tolist()
+
+
+def test_view_multichannel_axis():
+    x = np.arange(60.0).reshape(2, 30)
+    windows = Segmentation(30, 10).view(x, axis=-1)
+    assert windows.shape == (2, 3, 10)
+    assert windows[1, 2].tolist() == x[1, 20:30].tolist()
+
+
+def test_pad_tail_adds_one_padded_window():
+    seg = Segmentation(25, 10, pad_tail=True, pad_value=-1.0)
+    assert seg.starts.tolist() == [0, 10, 20]
+    assert seg.pad_length == 5
+    assert seg.valid_lengths.tolist() == [10, 10, 5]
+    assert seg.view(np.arange(25.0))[-1].tolist() == [20, 21, 22, 23, 24, -1, -1, -1, -1, -1]
+
+
+def test_whole_signal_when_size_is_none():
+    seg = Segmentation(7)
+    assert len(seg) == 1
+    assert seg.view(np.arange(7.0)).tolist() == [list(range(7))]
+
+
+def test_from_events_drops_out_of_range():
+    seg = Segmentation.from_events(100, [50, 5, 95], size=10, pre=2)
+    assert seg.starts.tolist() == [3, 48]
+    assert seg.dropped == 1
+
+
+def test_strided_windows_uneven_starts():
+    x = np.arange(20)
+    assert strided_windows(x, 3, [0, 4, 5]).tolist() == [[0, 1, 2], [4, 5, 6], [5, 6, 7]]
+    assert strided_windows(x, 3, []).shape == (0, 3)
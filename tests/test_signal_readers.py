@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from array_store import save_frame
+from signal_readers import iter_signals, read_signals, reader_for
+
+
+@pytest.fixture
+def frame():
+    n = 1000
+    return pd.DataFrame({'time': np.arange(n) / 500, 'Fp1': np.arange(n, dtype=float), 'Fp2': -np.arange(n, dtype=float)})
+
+
+def test_reader_for_registered_extensions():
+    assert reader_for("a.PARQUET") is not None
+    assert reader_for("a.csv") is None
+
+
+@pytest.mark.parametrize("fmt", ['npy', 'parquet'])
+def test_columns_and_row_range(frame, tmp_path, fmt):
+    path = save_frame(frame, str(tmp_path / "rec"), fmt, index_column='time')
+    assert reader_for(path)[0](path) == ['time', 'Fp1', 'Fp2']
+    # 欄位依檔案中的順序
+    df = read_signals(path, ['Fp2', 'time'], 100, 250)
+    assert list(df.columns) == ['time', 'Fp2']
+    np.testing.assert_allclose(df['Fp2'], frame['Fp2'][100:250])
+    np.testing.assert_array_equal(df['time'], frame['time'][100:250])
+    assert list(read_signals(path, lambda c: c.startswith('Fp')).columns) == ['Fp1', 'Fp2']
+    assert len(read_signals(path, start=990, stop=2000)) == 10
+    with pytest.raises(ValueError):
+        read_signals(path, ['Cz'])
+
+
+def test_parquet_range_spans_row_groups(frame, tmp_path):
+    path = str(tmp_path / "rec.parquet")
+    frame.to_parquet(path, row_group_size=64, index=False)
+    df = read_signals(path, ['Fp1'], 60, 200)
+    np.testing.assert_array_equal(df['Fp1'], frame['Fp1'][60:200])
+    assert read_signals(path, ['Fp1'], 2000, None).empty
+
+
+@pytest.mark.parametrize("fmt", ['npy', 'parquet'])
+def test_iter_signals_covers_whole_file(frame, tmp_path, fmt):
+    path = save_frame(frame, str(tmp_path / "rec"), fmt)
+    chunks = list(iter_signals(path, ['Fp1'], chunk_rows=300))
+    assert all(len(c) <= 300 for c in chunks)
+    np.testing.assert_allclose(pd.concat(chunks)['Fp1'], frame['Fp1'])
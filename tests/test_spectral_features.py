@@ -0,0 +1,66 @@
+import numpy as np
+from scipy.integrate import simpson, trapezoid
+from scipy.signal import welch
+from spectral_features import band_weight_matrix, compute_spectral_features, spectral_entropy
+
+BANDS = {'Delta': (0.5, 4), 'Theta': (4, 8), 'Alpha': (8, 13), 'Beta': (13, 25), 'Gamma': (25, 45)}
+
+
+def band_power(freqs, psd, band):
+    mask = (freqs >= band[0]) & (freqs <= band[1])
+    if np.sum(mask) >= 3:
+        return simpson(psd[mask], x=freqs[mask])
+    return trapezoid(psd[mask], x=freqs[mask])
+
+
+def test_band_weight_matrix_matches_integration():
+    fs = 250
+    x = np.random.default_rng(0).standard_normal((3, 4 * fs))
+    freqs, psd = welch(x, fs=fs, nperseg=2 * fs)
+    powers = psd @ band_weight_matrix(freqs, BANDS)
+    for ch in range(3):
+        expected = [band_power(freqs, psd[ch], band) for band in BANDS.values()]
+        np.testing.assert_allclose(powers[ch], expected)
+
+
+def test_band_with_fewer_than_three_bins():
+    freqs = np.arange(0.0, 10.0)
+    psd = np.random.default_rng(1).random((2, 10))
+    bands = {'narrow': (2, 3), 'empty': (3.2, 3.8)}
+    powers = psd @ band_weight_matrix(freqs, bands)
+    np.testing.assert_allclose(powers[:, 0], trapezoid(psd[:, 2:4], x=freqs[2:4], axis=-1))
+    assert np.all(powers[:, 1] == 0)
+
+
+def test_peak_alpha_and_edge_frequency():
+    freqs = np.arange(0.0, 46.0)
+    psd = np.ones(len(freqs))
+    psd[10] = 100.0
+    features = compute_spectral_features(freqs, psd, {}, names=["Peak Alpha Frequency", "SEF90"])
+    assert features["Peak Alpha Frequency"] == 10
+    cumulative = np.cumsum(psd)
+    assert features["SEF90"] == freqs[np.argmax(cumulative >= 0.9 * cumulative[-1])]
+
+
+def test_spectral_entropy_range():
+    freqs = np.arange(8.0)
+    flat = spectral_entropy(freqs, np.ones((2, 8)), {})
+    peak = spectral_entropy(freqs, np.eye(8)[:2], {})
+    np.testing.assert_allclose(flat, 1.0)
+    np.testing.assert_allclose(peak, 0.0)
+    assert np.isnan(spectral_entropy(freqs[:1], np.ones((2, 1)), {})).all()
+
+
+def test_missing_band_gives_nan_ratio():
+    freqs = np.arange(0.0, 46.0)
+    psd = np.ones((2, len(freqs)))
+    features = compute_spectral_features(freqs, psd, {'theta': np.array([2.0, 1.0]), 'beta': np.array([1.0, 0.0])})
+    np.testing.assert_allclose(features["Theta/Beta"], [2.0, np.nan])
+    assert np.isnan(features["Theta/Alpha"]).all()
+
+
+def test_aperiodic_slope_of_power_law():
+    freqs = np.arange(1.0, 50.0)
+    psd = 1.0 / freqs ** 2
+    slope = compute_spectral_features(freqs, psd, {}, names=["Aperiodic Slope"])["Aperiodic Slope"]
+    np.testing.assert_allclose(slope, -2.0)
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+from edf_convert import StreamResampler, rate_ratio
+
+
+def test_rate_ratio_is_reduced():
+    assert rate_ratio(512, 256) == (1, 2)
+    assert rate_ratio(100, 256) == (64, 25)
+    assert rate_ratio(256.0, 256) == (1, 1)
+
+
+@pytest.mark.parametrize("fs_in", [32, 100, 200, 256, 512])
+@pytest.mark.parametrize("chunk_records", [1, 3, 7])
+def test_chunked_output_matches_whole_signal(fs_in, chunk_records):
+    # 以 1 秒的 data record 分塊，與整段一次 resample_poly 的結果完全相同
+    records = 20
+    x = np.random.default_rng(fs_in).standard_normal(fs_in * records)
+    resampler = StreamResampler(fs_in, 256)
+    step = fs_in * chunk_records
+    chunks = [resampler.process(x[i:i + step], final=i + step >= len(x)) for i in range(0, len(x), step)]
+    expected = x if fs_in == 256 else resample_poly(x, resampler.up, resampler.down)
+    np.testing.assert_array_equal(np.concatenate(chunks), expected)
+    assert len(expected) == 256 * records
@@ -0,0 +1,61 @@
+import gzip
+import numpy as np
+import pandas as pd
+import pytest
+from table_writer import csv_path, excel_sheets, format_floats, parse_float_format, write_csv, write_excel, write_table
+
+
+def test_parse_float_format():
+    assert parse_float_format("") is None
+    assert parse_float_format(" 6 ") == "%.6g"
+    assert parse_float_format("%.4f") == "%.4f"
+    with pytest.raises(ValueError):
+        parse_float_format("abc%")
+
+
+def test_csv_path():
+    assert csv_path("out/a") == "out/a.csv"
+    assert csv_path("out/a", "gzip") == "out/a.csv.gz"
+    with pytest.raises(ValueError):
+        csv_path("out/a", "bz2")
+
+
+def test_excel_sheets_split_at_row_limit():
+    assert excel_sheets(0) == [("Sheet1", 0, 0)]
+    assert excel_sheets(10, max_rows=5) == [("Sheet1", 0, 4), ("Sheet1_2", 4, 8), ("Sheet1_3", 8, 10)]
+    assert excel_sheets(10, header=False, max_rows=5) == [("Sheet1", 0, 5), ("Sheet1_2", 5, 10)]
+    name = excel_sheets(3, sheet_name="x" * 40, max_rows=2)[1][0]
+    assert len(name) <= 31 and name.endswith("_2")
+
+
+def test_write_csv_float_format_and_gzip(tmp_path):
+    df = pd.DataFrame({'a': [1.23456789, 2.0], 'b': [3, 4]})
+    path = write_csv(df, str(tmp_path / "x.csv.gz"), "%.3g", "gzip")
+    with gzip.open(path, 'rt') as f:
+        assert f.read().splitlines() == ["a,b", "1.23,3", "2,4"]
+    path = write_table(df, str(tmp_path / "y"), "csv", header=False)
+    assert open(path).read().splitlines() == ["1.23456789,3", "2.0,4"]
+
+
+def test_write_excel_round_trip(tmp_path):
+    df = pd.DataFrame({'a': np.arange(7) / 3, 'b': list("abcdefg")})
+    path = str(tmp_path / "x.xlsx")
+    sheets = write_excel(df, path, "%.2f", max_rows=4)
+    assert sheets == ["Sheet1", "Sheet1_2", "Sheet1_3"]
+    back = pd.concat(pd.read_excel(path, sheet_name=None).values(), ignore_index=True)
+    np.testing.assert_allclose(back['a'], np.round(df['a'], 2))
+    assert back['b'].tolist() == df['b'].tolist()
+
+
+# "%.Nf" 以數值四捨五入，與字串格式只在剛好進位的邊界差一個最小位數
+@pytest.mark.parametrize("float_format, atol", [("%.3f", 1e-3), ("%.0f", 1), ("%.4g", 0), ("%.2e", 0)])
+def test_format_floats_matches_printf(float_format, atol):
+    values = np.random.default_rng(0).normal(scale=100, size=1000)
+    df = pd.DataFrame({'x': values, 'y': values.astype(np.float32), 'label': 'a', 'n': 1})
+    out = format_floats(df, float_format)
+    expected = np.array([float(float_format % v) for v in values])
+    np.testing.assert_allclose(out['x'], expected, rtol=0, atol=atol)
+    assert out['y'].dtype == np.float32
+    assert out['label'].tolist() == df['label'].tolist() and out['n'].tolist() == df['n'].tolist()
+    assert format_floats(df, None) is df
+    assert format_floats(df[['label']], float_format)['label'].tolist() == df['label'].tolist()
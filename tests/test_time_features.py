@@ -0,0 +1,58 @@
+import numpy as np
+from scipy.stats import kurtosis, skew
+from time_features import TIME_FEATURES, compute_time_features
+
+
+def windows_of(x, size, step):
+    return np.array([x[s:s + size] for s in range(0, len(x) - size + 1, step)])
+
+
+def test_features_match_numpy():
+    x = np.random.default_rng(0).standard_normal(2000)
+    features = compute_time_features(x, 200, 100, names=list(TIME_FEATURES))
+    w = windows_of(x, 200, 100)
+    np.testing.assert_allclose(features["Mean"], w.mean(axis=1))
+    np.testing.assert_allclose(features["Std"], w.std(axis=1, ddof=1))
+    np.testing.assert_allclose(features["Skewness"], skew(w, axis=1), atol=1e-12)
+    np.testing.assert_allclose(features["Median"], np.median(w, axis=1))
+    q75, q25 = np.percentile(w, [75, 25], axis=1)
+    np.testing.assert_allclose(features["IQR"], q75 - q25)
+    np.testing.assert_allclose(features["Peak-to-Peak"], np.ptp(w, axis=1))
+    np.testing.assert_allclose(features["RMS"], np.sqrt(np.mean(w ** 2, axis=1)))
+    np.testing.assert_allclose(features["Kurtosis"], kurtosis(w, axis=1), atol=1e-12)
+    np.testing.assert_allclose(features["Line Length"], np.abs(np.diff(w, axis=1)).sum(axis=1))
+    crossings = np.signbit(w[:, 1:]) != np.signbit(w[:, :-1])
+    np.testing.assert_allclose(features["Zero-Crossing Rate"], crossings.mean(axis=1))
+    dx, ddx = np.diff(w, axis=1), np.diff(w, n=2, axis=1)
+    mobility = np.sqrt(dx.var(axis=1) / w.var(axis=1))
+    np.testing.assert_allclose(features["Hjorth Mobility"], mobility)
+    np.testing.assert_allclose(features["Hjorth Complexity"], np.sqrt(ddx.var(axis=1) / dx.var(axis=1)) / mobility)
+
+
+def test_multichannel_matches_single_channel():
+    x = np.random.default_rng(1).standard_normal((1000, 3))
+    both = compute_time_features(x, 100, 50)
+    for col in range(3):
+        single = compute_time_features(x[:, col], 100, 50)
+        for name in both:
+            np.testing.assert_allclose(both[name][:, col], single[name])
+
+
+def test_whole_signal_and_empty_input():
+    x = np.arange(10.0)
+    assert compute_time_features(x)["Mean"].tolist() == [4.5]
+    assert np.isnan(compute_time_features(np.empty(0))["Mean"][0])
+
+
+def test_column_features_match_per_column():
+    import pandas as pd
+    from time_features import compute_column_features
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.standard_normal((500, 3)), columns=['a', 'b', 'c'])
+    df.loc[[10, 20], 'b'] = np.nan
+    results = compute_column_features(df, ['a', 'b', 'c'], ["Mean", "Std"], 100, 50)
+    assert list(results) == ['a', 'c', 'b']
+    for col in df.columns:
+        expected = compute_time_features(df[col].dropna().to_numpy(), 100, 50, ["Mean", "Std"])
+        for name in expected:
+            np.testing.assert_allclose(results[col][name], expected[name])
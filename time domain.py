@@ -2,10 +2,13 @@ import os
 import threading
 import pandas as pd
 import numpy as np
-from scipy.stats import skew
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 from tkinter import ttk
+from time_features import TIME_FEATURES, DEFAULT_FEATURES, compute_column_features
+from data_loader import read_columns
+from header_index import HeaderIndex, list_data_files
+from result_cache import ResultCache, code_version
 
 class StatisticsApp:
     MAX_COLS = 5
@@ -13,7 +16,7 @@ class StatisticsApp:
     def __init__(self, master):
         self.master = master
         master.title("Statistics Calculator")
-        master.geometry("850x750")
+        master.geometry("850x850")
 
         container = ttk.Frame(master, padding=10)
         container.pack(fill='both', expand=True)
@@ -35,7 +38,7 @@ class StatisticsApp:
 
         input_frame.columnconfigure(1, weight=1)
 
-        column_frame = ttk.Labelframe(container, text="Select Columns (up to 5)", padding=10)
+        column_frame = ttk.Labelframe(container, text="Select Columns (up to 5, or all numeric / regex)", padding=10)
         column_frame.pack(fill='x', pady=5)
         self.combo_cols = []
         for i in range(self.MAX_COLS):
@@ -43,8 +46,21 @@ class StatisticsApp:
             combo = ttk.Combobox(column_frame, state="readonly", width=30)
             combo.grid(row=i, column=1, sticky='w', padx=5, pady=2)
             self.combo_cols.append(combo)
+        self.var_all_cols = tk.BooleanVar(value=False)
+        ttk.Checkbutton(column_frame, text="All numeric columns (ignore selections above)", variable=self.var_all_cols).grid(row=self.MAX_COLS, column=0, columnspan=2, sticky='w', pady=(5, 0))
+        ttk.Label(column_frame, text="Column regex:").grid(row=self.MAX_COLS + 1, column=0, sticky='e')
+        self.entry_regex = ttk.Entry(column_frame, width=30)
+        self.entry_regex.grid(row=self.MAX_COLS + 1, column=1, sticky='w', padx=5, pady=2)
         column_frame.columnconfigure(1, weight=1)
 
+        feature_frame = ttk.Labelframe(container, text="Features", padding=10)
+        feature_frame.pack(fill='x', pady=5)
+        self.feature_vars = {}
+        for i, name in enumerate(TIME_FEATURES):
+            var = tk.BooleanVar(value=name in DEFAULT_FEATURES)
+            ttk.Checkbutton(feature_frame, text=name, variable=var).grid(row=i // 4, column=i % 4, sticky='w', padx=5)
+            self.feature_vars[name] = var
+
         progress_frame = ttk.Frame(container, padding=0)
         progress_frame.pack(fill='both', expand=True, pady=5)
 
@@ -70,14 +86,13 @@ class StatisticsApp:
         if not os.path.isdir(folder):
             messagebox.showerror("Invalid folder", "Please select a valid folder first.")
             return
-        files = [f for f in os.listdir(folder) if f.lower().endswith((".xls", ".xlsx", ".csv"))]
+        index = HeaderIndex(folder)
+        files = index.files
         if not files:
-            messagebox.showwarning("No files found", "No Excel/CSV files in the folder.")
+            messagebox.showwarning("No files found", "No supported data files in the folder.")
             return
         try:
-            path = os.path.join(folder, files[0])
-            df = pd.read_excel(path) if path.endswith(('.xls', '.xlsx')) else pd.read_csv(path)
-            cols = [''] + list(df.columns)
+            cols = [''] + index.columns()
             for combo in self.combo_cols:
                 combo['values'] = cols
                 combo.set('')
@@ -99,43 +114,57 @@ class StatisticsApp:
         folder = self.entry_folder.get()
         output = self.entry_output.get()
         cols = [c.get() for c in self.combo_cols if c.get()]
-        if not os.path.isdir(folder) or not cols or not output:
+        if not os.path.isdir(folder) or not (cols or self.var_all_cols.get()) or not output:
             messagebox.showerror("Missing info", "Ensure folder, columns, and output are set.")
             return
+        if not self.selected_features():
+            messagebox.showerror("Missing info", "Select at least one feature.")
+            return
         threading.Thread(target=self.process_files, args=(folder, output, cols), daemon=True).start()
 
-    def compute_statistics(self, df, column):
-        mean = df[column].mean()
-        std = df[column].std()
-        skewness = skew(df[column].dropna())
-        return mean, std, skewness
+    def selected_features(self):
+        return [name for name, var in self.feature_vars.items() if var.get()]
+
+    def analyze_file(self, file, cols, features):
+        """
+        單一檔案的計算結果，可存入結果快取。
+        :return: (結果列, 紀錄訊息)
+        """
+        df, file_cols = read_columns(file, cols, self.var_all_cols.get(), self.entry_regex.get().strip(),
+                                     self.log_message)
+        col_stats = compute_column_features(df, file_cols, features)
+        row = {'File Name': os.path.basename(file)}
+        logs = []
+        for col in (file_cols if self.var_all_cols.get() else cols):
+            if col in col_stats:
+                for name in features:
+                    row[f"{col} {name}"] = col_stats[col][name][0]
+                logs.append(f"{col} computed")
+            else:
+                logs.append(f"{col} skipped")
+        return row, logs
 
     def process_files(self, folder, output, cols):
-        files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(('.xlsx', '.csv'))]
+        files = list_data_files(folder, exclude=(output,), full_path=True)
         self.progress['maximum'] = len(files)
         self.progress['value'] = 0
         all_results = []
+        features = self.selected_features()
+
+        params = {"columns": cols, "features": features, "all_columns": self.var_all_cols.get(),
+                  "regex": self.entry_regex.get().strip()}
+        cache = ResultCache(folder, "time_domain", params, code_version(__file__))
 
         for file in files:
             basename = os.path.basename(file)
             try:
-                df = pd.read_excel(file) if file.endswith(('.xls', '.xlsx')) else pd.read_csv(file)
-                row = {'File Name': basename}
-                logs = []
-                for col in cols:
-                    if col in df.columns:
-                        mean, std, skewness = self.compute_statistics(df, col)
-                        row[f"{col} Mean"] = mean
-                        row[f"{col} Std"] = std
-                        row[f"{col} Skewness"] = skewness
-                        logs.append(f"{col} computed")
-                    else:
-                        logs.append(f"{col} skipped")
+                row, logs = cache.cached(file, lambda: self.analyze_file(file, cols, features))
                 all_results.append(row)
                 self.log_message(f"{basename}: " + ", ".join(logs))
             except Exception as e:
                 self.log_message(f"Error {basename}: {e}")
             self.progress['value'] += 1
+        self.log_message(f"Result cache: {cache.summary()}")
 
         if all_results:
             pd.DataFrame(all_results).to_excel(output, index=False)
@@ -2,13 +2,21 @@ import os
 import threading
 import pandas as pd
 import numpy as np
-from scipy.stats import skew
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, simpledialog
 from tkinter import ttk
 import matplotlib.pyplot as plt
 import smtplib
 from email.message import EmailMessage
+from time_features import TIME_FEATURES, DEFAULT_FEATURES, compute_column_features
+from data_loader import read_columns
+from header_index import HeaderIndex, list_data_files, register_outputs
+from result_cache import ResultCache, code_version
+from segmentation import step_size
+
+# 寫在結果檔旁（可能是輸入資料夾）的每段結果，掃描輸入時排除
+SEGMENT_FILE = "PerSegment_Output.xlsx"
+register_outputs(SEGMENT_FILE)
 
 class StatisticsApp:
     MAX_COLS = 5
@@ -16,7 +24,7 @@ class StatisticsApp:
     def __init__(self, master):
         self.master = master
         master.title("Statistics Calculator with Window Control")
-        master.geometry("900x800")
+        master.geometry("900x900")
 
         self.recipient_email = None
 
@@ -40,7 +48,7 @@ class StatisticsApp:
 
         input_frame.columnconfigure(1, weight=1)
 
-        column_frame = ttk.Labelframe(container, text="Select Columns (up to 5)", padding=10)
+        column_frame = ttk.Labelframe(container, text="Select Columns (up to 5, or all numeric / regex)", padding=10)
         column_frame.pack(fill='x', pady=5)
         self.combo_cols = []
         for i in range(self.MAX_COLS):
@@ -48,8 +56,21 @@ class StatisticsApp:
             combo = ttk.Combobox(column_frame, state="readonly", width=30)
             combo.grid(row=i, column=1, sticky='w', padx=5, pady=2)
             self.combo_cols.append(combo)
+        self.var_all_cols = tk.BooleanVar(value=False)
+        ttk.Checkbutton(column_frame, text="All numeric columns (ignore selections above)", variable=self.var_all_cols).grid(row=self.MAX_COLS, column=0, columnspan=2, sticky='w', pady=(5, 0))
+        ttk.Label(column_frame, text="Column regex:").grid(row=self.MAX_COLS + 1, column=0, sticky='e')
+        self.entry_regex = ttk.Entry(column_frame, width=30)
+        self.entry_regex.grid(row=self.MAX_COLS + 1, column=1, sticky='w', padx=5, pady=2)
         column_frame.columnconfigure(1, weight=1)
 
+        feature_frame = ttk.Labelframe(container, text="Features", padding=10)
+        feature_frame.pack(fill='x', pady=5)
+        self.feature_vars = {}
+        for i, name in enumerate(TIME_FEATURES):
+            var = tk.BooleanVar(value=name in DEFAULT_FEATURES)
+            ttk.Checkbutton(feature_frame, text=name, variable=var).grid(row=i // 4, column=i % 4, sticky='w', padx=5)
+            self.feature_vars[name] = var
+
         option_frame = ttk.Labelframe(container, text="Options", padding=10)
         option_frame.pack(fill='x', pady=5)
 
@@ -101,14 +122,13 @@ class StatisticsApp:
         if not os.path.isdir(folder):
             messagebox.showerror("Invalid folder", "Please select a valid folder first.")
             return
-        files = [f for f in os.listdir(folder) if f.endswith((".xls", ".xlsx", ".csv"))]
+        index = HeaderIndex(folder)
+        files = index.files
         if not files:
-            messagebox.showwarning("No files found", "No Excel/CSV files in the folder.")
+            messagebox.showwarning("No files found", "No supported data files in the folder.")
             return
         try:
-            path = os.path.join(folder, files[0])
-            df = pd.read_excel(path) if path.endswith(('.xls', '.xlsx')) else pd.read_csv(path)
-            cols = [''] + list(df.columns)
+            cols = [''] + index.columns()
             for combo in self.combo_cols:
                 combo['values'] = cols
                 combo.set('')
@@ -126,22 +146,38 @@ class StatisticsApp:
         self.log.insert(tk.END, msg + "\n")
         self.log.yview(tk.END)
 
-    def compute_statistics(self, series):
-        return series.mean(), series.std(), skew(series.dropna())
+    def selected_features(self):
+        return [name for name, var in self.feature_vars.items() if var.get()]
 
     def start(self):
         folder = self.entry_folder.get()
         output = self.entry_output.get()
         cols = [c.get() for c in self.combo_cols if c.get()]
-        if not os.path.isdir(folder) or not cols or not output:
+        if not os.path.isdir(folder) or not (cols or self.var_all_cols.get()) or not output:
             messagebox.showerror("Missing info", "Ensure folder, columns, and output are set.")
             return
+        if not self.selected_features():
+            messagebox.showerror("Missing info", "Select at least one feature.")
+            return
         if self.var_email.get():
             self.recipient_email = simpledialog.askstring("Email", "Enter recipient email:")
         threading.Thread(target=self.process_files, args=(folder, output, cols), daemon=True).start()
 
+    def analyze_file(self, file, cols, features, window_size=None, step=None):
+        """
+        單一檔案所有欄位、所有視窗的特徵，可存入結果快取。
+        :return: (欄位, {欄位: {特徵名稱: 每個視窗的值}})
+        """
+        df, file_cols = read_columns(file, cols, self.var_all_cols.get(), self.entry_regex.get().strip(),
+                                     self.log_message)
+        return file_cols, compute_column_features(df, file_cols, features, window_size, step)
+
     def process_files(self, folder, output, cols):
-        files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(('.xlsx', '.csv'))]
+        files = list_data_files(folder, exclude=(output,), full_path=True, log=self.log_message)
+        if cols and not self.var_all_cols.get():
+            # 缺少部分欄位的檔案仍會計算其餘欄位，這裡先一次列出
+            for name, lacking in HeaderIndex(folder).missing(cols).items():
+                self.log_message(f"{name}: missing columns {lacking}")
         self.progress['maximum'] = len(files)
         self.progress['value'] = 0
 
@@ -150,68 +186,60 @@ class StatisticsApp:
         full_stats = self.output_mode.get() == "segment"
         plot_segment = self.var_plot.get()
         send_email = self.var_email.get()
+        features = self.selected_features()
 
         window_size = int(self.entry_window.get())
-        overlap = float(self.entry_overlap.get()) / 100
+        overlap = float(self.entry_overlap.get())
 
         summary_results = []
         segment_results = {}
 
+        params = {"columns": cols, "features": features, "all_columns": self.var_all_cols.get(),
+                  "regex": self.entry_regex.get().strip(), "window": use_window,
+                  "window_size": window_size, "overlap": overlap}
+        cache = ResultCache(folder, "time_domain_window", params, code_version(__file__))
+
         for file in files:
             basename = os.path.basename(file)
             try:
-                df = pd.read_excel(file) if file.endswith(('.xls', '.xlsx')) else pd.read_csv(file)
                 row = {"File": basename}
                 seg_rows = []
 
-                for col in cols:
-                    if col not in df.columns:
-                        continue
-                    data = df[col].dropna().reset_index(drop=True)
+                # 所有欄位、所有視窗的特徵一次算完
+                if use_window:
+                    step = step_size(window_size, overlap)
+                    file_cols, col_stats = cache.cached(file, lambda: self.analyze_file(file, cols, features, window_size, step))
+                else:
+                    file_cols, col_stats = cache.cached(file, lambda: self.analyze_file(file, cols, features))
+
+                for col in file_cols:
+                    stats = col_stats[col]
 
                     if use_window:
-                        length = len(data)
-                        step = int(window_size * (1 - overlap))
-                        all_means, all_stds, all_skews = [], [], []
-
-                        for i in range((length - window_size) // step + 1):
-                            start, end = i * step, i * step + window_size
-                            segment = data[start:end]
-                            mean, std, skw = self.compute_statistics(segment)
-                            all_means.append(mean)
-                            all_stds.append(std)
-                            all_skews.append(skw)
-
-                            if full_stats:
-                                seg_rows.append({
-                                    "File": basename,
-                                    "Column": col,
-                                    "Segment": f"Segment{i+1}",
-                                    "Mean": mean,
-                                    "Std": std,
-                                    "Skewness": skw
-                                })
+                        if full_stats:
+                            for i in range(len(stats[features[0]])):
+                                seg = {"File": basename, "Column": col, "Segment": f"Segment{i+1}"}
+                                seg.update({name: stats[name][i] for name in features})
+                                seg_rows.append(seg)
 
                         if only_mean:
-                            row[f"{col} Mean"] = np.mean(all_means)
-                            row[f"{col} Std"] = np.mean(all_stds)
-                            row[f"{col} Skewness"] = np.mean(all_skews)
+                            for name in features:
+                                row[f"{col} {name}"] = np.mean(stats[name])
 
-                        if plot_segment and all_means:
+                        trend_name = "Mean" if "Mean" in stats else features[0]
+                        if plot_segment and len(stats[trend_name]):
                             plt.figure()
-                            plt.plot(all_means, marker='o')
-                            plt.title(f"{basename} - {col} Mean (Sliding)")
+                            plt.plot(stats[trend_name], marker='o')
+                            plt.title(f"{basename} - {col} {trend_name} (Sliding)")
                             plt.xlabel("Segment")
-                            plt.ylabel("Mean")
+                            plt.ylabel(trend_name)
                             plt.grid()
                             plt.tight_layout()
                             plt.show()
 
                     else:
-                        mean, std, skw = self.compute_statistics(data)
-                        row[f"{col} Mean"] = mean
-                        row[f"{col} Std"] = std
-                        row[f"{col} Skewness"] = skw
+                        for name in features:
+                            row[f"{col} {name}"] = stats[name][0]
 
                 if use_window and full_stats:
                     combined_seg_dict = {}
@@ -220,9 +248,8 @@ class StatisticsApp:
                         if seg_id not in combined_seg_dict:
                             combined_seg_dict[seg_id] = {"File": basename, "Segment": seg_id}
                         col = seg["Column"]
-                        combined_seg_dict[seg_id][f"Column_{col}_Mean"] = seg["Mean"]
-                        combined_seg_dict[seg_id][f"Column_{col}_Std"] = seg["Std"]
-                        combined_seg_dict[seg_id][f"Column_{col}_Skewness"] = seg["Skewness"]
+                        for name in features:
+                            combined_seg_dict[seg_id][f"Column_{col}_{name}"] = seg[name]
                     segment_results[basename] = list(combined_seg_dict.values())
                 else:
                     summary_results.append(row)
@@ -230,12 +257,13 @@ class StatisticsApp:
             except Exception as e:
                 self.log_message(f"Error {basename}: {e}")
             self.progress['value'] += 1
+        self.log_message(f"Result cache: {cache.summary()}")
 
         if summary_results:
             pd.DataFrame(summary_results).to_excel(output, index=False)
 
         if segment_results:
-            seg_path = os.path.join(os.path.dirname(output), "PerSegment_Output.xlsx")
+            seg_path = os.path.join(os.path.dirname(output), SEGMENT_FILE)
             with pd.ExcelWriter(seg_path, engine='openpyxl') as writer:
                 for fname, rows in segment_results.items():
                     pd.DataFrame(rows).to_excel(writer, sheet_name=fname[:31], index=False)
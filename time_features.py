@@ -0,0 +1,196 @@
+from functools import cached_property
+import numpy as np
+from rolling_moments import rolling_central_moments
+from segmentation import window_starts, strided_windows
+
+# 時域特徵註冊表：名稱 -> func(ctx)，回傳每個視窗一個值的陣列（多欄位時為 (視窗數, columns)）
+# 動差類特徵共用 ctx.moments 的累加和，順序統計類特徵共用 ctx.quantile 的同一次 partition
+TIME_FEATURES = {}
+
+# 順序統計需要的分位數（0 與 1 即最小值、最大值）
+QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+# 預設輸出，與原本的 Mean / Std / Skewness 相同
+DEFAULT_FEATURES = ("Mean", "Std", "Skewness")
+
+
+def register_feature(name):
+    def decorator(func):
+        TIME_FEATURES[name] = func
+        return func
+    return decorator
+
+
+class WindowContext:
+    """
+    同一個訊號、同一組視窗的共用計算結果，各特徵需要時才計算，且只計算一次。
+    x 可為 (samples,) 或 (samples, columns)；starts 為 None 時依 step 切視窗。
+    """
+
+    def __init__(self, x, window_size, step, starts=None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.window_size = window_size
+        self.step = step
+        self.starts = window_starts(len(self.x), window_size, step) if starts is None else np.asarray(starts)
+
+    @cached_property
+    def windows(self):
+        # (視窗數, [columns,] 視窗長度) 的 strided view，起點等距時不複製
+        return strided_windows(self.x, self.window_size, self.starts)
+
+    @cached_property
+    def moments(self):
+        return rolling_central_moments(self.x, self.window_size, self.step, starts=self.starts)
+
+    @cached_property
+    def diff_moments(self):
+        return rolling_central_moments(np.diff(self.x, axis=0), self.window_size - 1, self.step, starts=self.starts)
+
+    @cached_property
+    def diff2_moments(self):
+        return rolling_central_moments(np.diff(self.x, n=2, axis=0), self.window_size - 2, self.step, starts=self.starts)
+
+    @cached_property
+    def partitioned(self):
+        # 所有分位數需要的位置一次 partition 完
+        last = self.window_size - 1
+        kth = sorted({int(np.floor(q * last)) for q in QUANTILES} | {int(np.ceil(q * last)) for q in QUANTILES})
+        return np.partition(self.windows, kth, axis=-1)
+
+    def quantile(self, q):
+        # 與 np.percentile 預設的 linear 內插相同
+        pos = q * (self.window_size - 1)
+        lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+        frac = pos - lo
+        return self.partitioned[..., lo] * (1 - frac) + self.partitioned[..., hi] * frac
+
+    def window_sum(self, values, length):
+        # values[i] 的視窗和，每個視窗取 starts 起的 length 個值
+        c = np.concatenate((np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)))
+        return c[self.starts + length] - c[self.starts]
+
+    def nan(self):
+        return np.full((len(self.starts),) + self.x.shape[1:], np.nan)
+
+
+def _nan_where(cond, value):
+    return np.where(cond, value, np.nan)
+
+
+@register_feature("Mean")
+def mean(ctx):
+    return ctx.moments[0]
+
+
+@register_feature("Std")
+def std(ctx):
+    w = ctx.window_size
+    if w < 2:
+        return ctx.nan()
+    return np.sqrt(ctx.moments[1] * w / (w - 1))
+
+
+@register_feature("Skewness")
+def skewness(ctx):
+    _, m2, m3, _ = ctx.moments
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _nan_where(m2 > 0, m3 / m2 ** 1.5)
+
+
+@register_feature("Kurtosis")
+def kurtosis(ctx):
+    # 與 scipy.stats.kurtosis 預設相同（Fisher、有偏估計）
+    _, m2, _, m4 = ctx.moments
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _nan_where(m2 > 0, m4 / m2 ** 2 - 3)
+
+
+@register_feature("RMS")
+def rms(ctx):
+    mu, m2, _, _ = ctx.moments
+    return np.sqrt(mu ** 2 + m2)
+
+
+@register_feature("Peak-to-Peak")
+def peak_to_peak(ctx):
+    return ctx.quantile(1.0) - ctx.quantile(0.0)
+
+
+@register_feature("Median")
+def median(ctx):
+    return ctx.quantile(0.5)
+
+
+@register_feature("IQR")
+def iqr(ctx):
+    return ctx.quantile(0.75) - ctx.quantile(0.25)
+
+
+@register_feature("Zero-Crossing Rate")
+def zero_crossing_rate(ctx):
+    if ctx.window_size < 2:
+        return ctx.nan()
+    crossings = np.signbit(ctx.x[1:]) != np.signbit(ctx.x[:-1])
+    return ctx.window_sum(crossings, ctx.window_size - 1) / (ctx.window_size - 1)
+
+
+@register_feature("Line Length")
+def line_length(ctx):
+    if ctx.window_size < 2:
+        return ctx.nan()
+    return ctx.window_sum(np.abs(np.diff(ctx.x, axis=0)), ctx.window_size - 1)
+
+
+@register_feature("Hjorth Mobility")
+def hjorth_mobility(ctx):
+    if ctx.window_size < 2:
+        return ctx.nan()
+    var_x, var_dx = ctx.moments[1], ctx.diff_moments[1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _nan_where(var_x > 0, np.sqrt(var_dx / var_x))
+
+
+@register_feature("Hjorth Complexity")
+def hjorth_complexity(ctx):
+    if ctx.window_size < 3:
+        return ctx.nan()
+    var_dx, var_ddx = ctx.diff_moments[1], ctx.diff2_moments[1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mobility_dx = _nan_where(var_dx > 0, np.sqrt(var_ddx / var_dx))
+        return mobility_dx / hjorth_mobility(ctx)
+
+
+def compute_time_features(x, window_size=None, step=None, names=DEFAULT_FEATURES, starts=None):
+    """
+    計算時域特徵。x 為 (samples,) 或 (samples, columns)，多欄位時一次向量化計算所有欄位。
+    :param window_size: 視窗長度；None 代表整段訊號視為一個視窗
+    :param step: 視窗移動量
+    :param names: 要計算的特徵名稱
+    :param starts: 指定視窗起點（例如 Segmentation.starts），None 時依 step 切
+    :return: {特徵名稱: (視窗數,) 或 (視窗數, columns) 的陣列}
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if window_size is None:
+        if len(x) == 0:
+            return {name: np.full((1,) + x.shape[1:], np.nan) for name in names}
+        window_size, step = len(x), 1
+    ctx = WindowContext(x, window_size, step, starts)
+    return {name: TIME_FEATURES[name](ctx) for name in names}
+
+def compute_column_features(df, columns, names=DEFAULT_FEATURES, window_size=None, step=None):
+    """
+    DataFrame 多個欄位的時域特徵：沒有缺值的欄位組成 2-D 陣列一次向量化計算，有缺值的欄位各自 dropna 後計算。
+    :return: {欄位: {特徵名稱: 每個視窗的值}}
+    """
+    block = df[columns].to_numpy(dtype=float)
+    complete = ~np.isnan(block).any(axis=0)
+    results = {}
+    if complete.any():
+        stats = compute_time_features(block[:, complete], window_size, step, names)
+        full_cols = [c for c, ok in zip(columns, complete) if ok]
+        for j, col in enumerate(full_cols):
+            results[col] = {name: values[:, j] for name, values in stats.items()}
+    for col, ok in zip(columns, complete):
+        if not ok:
+            results[col] = compute_time_features(df[col].dropna().to_numpy(dtype=float), window_size, step, names)
+    return results
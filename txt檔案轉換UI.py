@@ -3,13 +3,15 @@ import glob
 import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
-import pandas as pd
+from table_writer import CSV_COMPRESSIONS, parse_float_format
+from bulk_convert import convert_files, parse_sep
+from conversion_runner import format_summary
 
 class ConverterApp:
     def __init__(self, master):
         self.master = master
         master.title("批次 TXT 轉檔工具")
-        master.geometry("600x400")
+        master.geometry("600x440")
 
         # 選擇資料夾
         self.lbl_folder = tk.Label(master, text="請選擇 TXT 檔案所在資料夾：")
@@ -22,7 +24,7 @@ class ConverterApp:
         self.btn_browse.pack(side='right', padx=5)
 
         # 分隔符設定
-        self.lbl_sep = tk.Label(master, text="請輸入分隔符（如 \\t、空格、, 等）：")
+        self.lbl_sep = tk.Label(master, text="請輸入分隔符（如 \\t、空格、, 等，留白或 auto 為自動判斷分隔符與標題列）：")
         self.lbl_sep.pack(pady=5, anchor='w', padx=10)
         self.entry_sep = tk.Entry(master)
         self.entry_sep.insert(0, "\\t")
@@ -38,6 +40,17 @@ class ConverterApp:
         tk.Radiobutton(frm_fmt, text="XLSX", variable=self.var_format, value="xlsx").pack(side='left', padx=5)
         tk.Radiobutton(frm_fmt, text="CSV + XLSX", variable=self.var_format, value="both").pack(side='left', padx=5)
 
+        # 浮點數格式與 CSV 壓縮
+        frm_opt = tk.Frame(master)
+        frm_opt.pack(anchor='w', padx=10, pady=5)
+        tk.Label(frm_opt, text="浮點數格式（如 6 或 %.4f，留白為完整精度）：").pack(side='left')
+        self.entry_float = tk.Entry(frm_opt, width=8)
+        self.entry_float.pack(side='left', padx=5)
+        tk.Label(frm_opt, text="CSV 壓縮：").pack(side='left')
+        self.var_compression = tk.StringVar(value="none")
+        for value in ["none"] + [c for c in CSV_COMPRESSIONS if c]:
+            tk.Radiobutton(frm_opt, text=value, variable=self.var_compression, value=value).pack(side='left')
+
         # 開始轉檔按鈕
         self.btn_start = tk.Button(master, text="開始轉檔", command=self.start_conversion)
         self.btn_start.pack(pady=10)
@@ -60,45 +73,41 @@ class ConverterApp:
 
     def start_conversion(self):
         folder = self.entry_folder.get().strip()
-        sep = self.entry_sep.get().encode('utf-8').decode('unicode_escape')  # 解析轉義字元
+        sep = parse_sep(self.entry_sep.get())  # 解析轉義字元，留白或 auto 時為 None
         fmt = self.var_format.get()
 
         if not folder or not os.path.isdir(folder):
             messagebox.showerror("錯誤", "請選擇有效的資料夾！")
             return
+        try:
+            float_format = parse_float_format(self.entry_float.get())
+        except ValueError as e:
+            messagebox.showerror("錯誤", str(e))
+            return
+        compression = None if self.var_compression.get() == "none" else self.var_compression.get()
 
         # 禁用按鈕，避免重複點擊
         self.btn_start.config(state='disabled')
-        threading.Thread(target=self.convert_files, args=(folder, sep, fmt), daemon=True).start()
+        threading.Thread(target=self.convert_files, args=(folder, sep, fmt, float_format, compression), daemon=True).start()
 
-    def convert_files(self, folder, sep, fmt):
+    def convert_files(self, folder, sep, fmt, float_format=None, compression=None):
         txt_files = glob.glob(os.path.join(folder, '*.txt'))
         if not txt_files:
             self.log("在指定資料夾中未找到任何 .txt 檔案。")
         else:
-            for txt in txt_files:
-                try:
-                    df = pd.read_csv(txt, sep=sep, header=None, encoding='utf-8')
-                except Exception as e:
-                    self.log(f"[讀取失敗] {os.path.basename(txt)}：{e}")
-                    continue
-
-                basename = os.path.splitext(txt)[0]
-                if fmt in ("csv", "both"):
-                    csv_path = basename + ".csv"
-                    try:
-                        df.to_csv(csv_path, index=False, header=False, encoding='utf-8')
-                        self.log(f"[已產生 CSV] {os.path.basename(csv_path)}")
-                    except Exception as e:
-                        self.log(f"[CSV 寫入失敗] {os.path.basename(csv_path)}：{e}")
-
-                if fmt in ("xlsx", "both"):
-                    xlsx_path = basename + ".xlsx"
-                    try:
-                        df.to_excel(xlsx_path, index=False, header=False, engine='openpyxl')
-                        self.log(f"[已產生 XLSX] {os.path.basename(xlsx_path)}")
-                    except Exception as e:
-                        self.log(f"[XLSX 寫入失敗] {os.path.basename(xlsx_path)}：{e}")
+            def log_result(result):
+                for message in result.messages:
+                    self.log(f"{'[略過]' if message.startswith('Skipped') else '[已產生]'} {message}")
+                if result.error:
+                    self.log(f"[轉檔失敗] {os.path.basename(result.path)}：{result.error}")
+
+            # 輸出到 TXT 所在的資料夾；沒有標題列時輸出也不加標題列。
+            # 指定分隔符時與原本相同，第一列視為資料；自動判斷時一併判斷標題列
+            formats = {"csv": ["csv"], "xlsx": ["xlsx"], "both": ["csv", "xlsx"]}[fmt]
+            header = None if sep is None else False
+            summary = convert_files(sorted(txt_files), None, formats, sep=sep, header=header,
+                                    float_format=float_format, compression=compression, on_result=log_result)
+            self.log(format_summary(summary))
 
         self.log("轉檔完成！")
         self.btn_start.config(state='normal')